@@ -1,13 +1,74 @@
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.database.queries import book_stats as book_stats_queries
 from app.database.queries import books as books_queries
+from app.database.queries import recommendations as recommendations_queries
+from app.database.queries import search as search_queries
+from app.database.queries import versions as versions_queries
+from app.models.books import BookCreate
+from app.models.bulk import BulkResult, bulk_result, validate_rows
 
 def get_book(conn, book_id: int):
     return books_queries.get_book(conn, book_id=book_id)
 
-def list_books(conn):
-    return books_queries.list_books(conn)
+def get_books(conn, book_ids: list[int]):
+    return books_queries.get_books(conn, book_ids=book_ids)
+
+def list_books(conn, *, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return books_queries.list_books(conn, limit=limit, after_id=after_id)
+
+def iter_books(conn, *, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return books_queries.iter_books(conn, after_id=after_id)
+
+def get_books_version(conn):
+    return versions_queries.get_table_version(conn, table_name="books")
+
+def empty_book_stats(book_id: int) -> dict:
+    return {
+        "book_id": book_id,
+        "review_count": 0,
+        "average_rating": None,
+        "ratings": {str(star): 0 for star in range(1, 6)},
+    }
+
+def get_book_stats(conn, book_id: int):
+    """
+    The book's rating aggregate (zeros before its first review), or None if the book doesn't exist.
+    """
+    stats = book_stats_queries.get_book_stats(conn, book_id=book_id)
+    if stats is None and books_queries.get_book(conn, book_id=book_id):
+        stats = empty_book_stats(book_id)
+    return stats
+
+def list_top_rated(conn, *, limit: int = DEFAULT_PAGE_SIZE, min_reviews: int = 1, after: str | None = None):
+    after_key = decode_cursor(after, float, int, int) if after else None
+    return book_stats_queries.list_top_rated(conn, limit=limit, min_reviews=min_reviews, after=after_key)
+
+def get_similar_books(conn, book_id: int, *, limit: int):
+    """
+    Readers who liked this also liked: None for an unknown book.
+    """
+    books = recommendations_queries.get_similar_books(conn, book_id=book_id, limit=limit)
+    if not books and not books_queries.get_book(conn, book_id=book_id):
+        return None
+    return books
+
+def search_books(conn, *, q: str, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None):
+    after_key = decode_cursor(after, float, int) if after else None
+    return search_queries.search_books(conn, q=q, limit=limit, after=after_key)
 
 def insert_book(conn, *, title: str, author: str):
     """
     Insert a new book and return it.
     """
     return books_queries.insert_book(conn, title=title, author=author)
+
+
+def bulk_insert_books(conn, rows: list) -> BulkResult:
+    """
+    Validate rows one by one and COPY the valid ones in a single transaction.
+    """
+    valid, errors = validate_rows(BookCreate, rows)
+    ids = books_queries.copy_books(conn, books=[(book.title, book.author) for _, book in valid]) if valid else []
+    return bulk_result(len(rows), valid, ids, errors)
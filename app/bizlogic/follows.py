@@ -1,4 +1,8 @@
+from datetime import datetime
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
 from app.database.queries import follows as follows_queries
+from app.database.queries import users as users_queries
 from psycopg import Connection
 
 def follow_user(conn: Connection, *, follower_id: int, followee_id: int) -> dict:
@@ -23,8 +27,81 @@ def unfollow_user(conn: Connection, *, follower_id: int, followee_id: int) -> No
     )
 
 
-def get_newsfeed(conn: Connection, user_id: int) -> list[dict]:
+def get_newsfeed(
+        conn: Connection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of the newsfeed for a user (reviews from followed users), newest first.
+    """
+    return follows_queries.get_newsfeed(
+        conn,
+        user_id=user_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def _users_page(conn: Connection, user_id: int, ids: list[int]) -> list[dict] | None:
+    if not ids and not users_queries.get_user(conn, user_id=user_id):
+        return None
+    return users_queries.get_users(conn, user_ids=ids)
+
+
+def list_followers(
+        conn: Connection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict] | None:
+    """
+    One page of the user's followers, by id: None for an unknown user.
+    """
+    after_id = decode_cursor(after, int)[0] if after else None
+    ids = follows_queries.get_follow_graph().followers(user_id, limit=limit, after_id=after_id)
+    return _users_page(conn, user_id, ids)
+
+
+def list_following(
+        conn: Connection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict] | None:
+    """
+    One page of the users the user follows, by id: None for an unknown user.
+    """
+    after_id = decode_cursor(after, int)[0] if after else None
+    ids = follows_queries.get_follow_graph().following(user_id, limit=limit, after_id=after_id)
+    return _users_page(conn, user_id, ids)
+
+
+def get_follow_counts(conn: Connection, user_id: int) -> dict | None:
+    counts = follows_queries.get_follow_graph().counts(user_id)
+    if not any(counts.values()) and not users_queries.get_user(conn, user_id=user_id):
+        return None
+    return counts
+
+
+def get_relationship(conn: Connection, user_id: int, other_id: int) -> dict:
+    """
+    Whether the user follows the other one, and the other way around.
+    """
+    graph = follows_queries.get_follow_graph()
+    following, followed_by = graph.follows(user_id, other_id), graph.follows(other_id, user_id)
+    return {"following": following, "followed_by": followed_by, "mutual": following and followed_by}
+
+
+def suggest_users(conn: Connection, user_id: int, *, limit: int) -> list[dict] | None:
     """
-    Fetch the newsfeed for a user (reviews from followed users).
+    People the user may know: followed by the ones they follow. None for an
+    unknown user.
     """
-    return follows_queries.get_newsfeed(conn, user_id=user_id)
+    suggestions = follows_queries.get_follow_graph().suggestions(user_id, limit=limit)
+    users = _users_page(conn, user_id, [suggestion["id"] for suggestion in suggestions])
+    if users is None:
+        return None
+    by_id = {user["id"]: user for user in users}
+    return [by_id[s["id"]] | s for s in suggestions if s["id"] in by_id]
@@ -1,8 +1,16 @@
+from datetime import datetime
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.database.queries import books as books_queries
 from app.database.queries import reviews as reviews_queries
+from app.database.queries import search as search_queries
+from app.database.queries import users as users_queries
+from app.database.queries import versions as versions_queries
+from app.database.queries.validations import CONSTRAINT_ERRORS
+from app.models.bulk import BulkResult, BulkRowError, bulk_result, validate_rows
+from app.models.reviews import ReviewCreate
 from psycopg import Connection
 
-from app.database.queries.validations import ensure_user_exists, ensure_book_exists
-
 
 def add_review(
         conn: Connection, *,
@@ -13,10 +21,8 @@ def add_review(
 ) -> dict:
     """
     Insert a new review and return the created review as a dict.
+    Unknown users/books are rejected by the insert itself (400), in one round trip.
     """
-    ensure_user_exists(conn, user_id)
-    ensure_book_exists(conn, book_id)
-
     return reviews_queries.insert_review(
         conn,
         user_id=user_id,
@@ -33,15 +39,140 @@ def get_review(conn: Connection, review_id: int) -> dict | None:
     return reviews_queries.get_review(conn, review_id=review_id)
 
 
-def list_reviews_by_user(conn: Connection, user_id: int) -> list[dict]:
+def list_reviews_by_user(
+        conn: Connection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of reviews made by a specific user, newest first.
+    """
+    return reviews_queries.list_reviews_by_user(
+        conn,
+        user_id=user_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def iter_reviews_by_user(conn: Connection, user_id: int, *, after: str | None = None):
+    """
+    Stream every review made by a specific user, newest first.
+    """
+    return reviews_queries.iter_reviews_by_user(
+        conn,
+        user_id=user_id,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def list_reviews_by_book(
+        conn: Connection,
+        book_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
     """
-    Fetch all reviews made by a specific user.
+    Fetch one page of reviews for a specific book, newest first.
     """
-    return reviews_queries.list_reviews_by_user(conn, user_id=user_id)
+    return reviews_queries.list_reviews_by_book(
+        conn,
+        book_id=book_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
 
 
-def list_reviews_by_book(conn: Connection, book_id: int) -> list[dict]:
+def iter_reviews_by_book(conn: Connection, book_id: int, *, after: str | None = None):
     """
-    Fetch all reviews for a specific book.
+    Stream every review for a specific book, newest first.
+    """
+    return reviews_queries.iter_reviews_by_book(
+        conn,
+        book_id=book_id,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def expand_reviews(conn: Connection, reviews: list[dict], expand: frozenset[str]) -> list[dict]:
     """
-    return reviews_queries.list_reviews_by_book(conn, book_id=book_id)
+    Embed each review's user and/or book (None if gone), batch-loaded: at most
+    one query per kind, none for cached rows.
+    """
+    if "user" in expand:
+        user_ids = [review["user_id"] for review in reviews]
+        users = {user["id"]: user for user in users_queries.get_users(conn, user_ids=user_ids)}
+        for review in reviews:
+            review["user"] = users.get(review["user_id"])
+    if "book" in expand:
+        book_ids = [review["book_id"] for review in reviews]
+        books = {book["id"]: book for book in books_queries.get_books(conn, book_ids=book_ids)}
+        for review in reviews:
+            review["book"] = books.get(review["book_id"])
+    return reviews
+
+
+def get_book_reviews_version(conn: Connection, book_id: int) -> dict | None:
+    """
+    Version of the book's review list, for its ETag / Last-Modified.
+    """
+    return versions_queries.get_book_reviews_version(conn, book_id=book_id)
+
+
+def search_reviews(
+        conn: Connection, *,
+        q: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of reviews matching `q`, best match first, with highlighted snippets.
+    """
+    return search_queries.search_reviews(
+        conn,
+        q=q,
+        limit=limit,
+        after=decode_cursor(after, float, int) if after else None,
+    )
+
+
+def review_row_error(review: ReviewCreate, user_ids: set[int], book_ids: set[int]) -> str | None:
+    """
+    The 400 message POST /reviews would return for this row, if any.
+    COPY aborts on the first violation, so bulk rows are checked up front.
+    """
+    if review.user_id not in user_ids:
+        return CONSTRAINT_ERRORS["reviews_user_id_fkey"].format(user_id=review.user_id)
+    if review.book_id not in book_ids:
+        return CONSTRAINT_ERRORS["reviews_book_id_fkey"].format(book_id=review.book_id)
+    if not 1 <= review.rating <= 5:
+        return CONSTRAINT_ERRORS["reviews_rating_check"]
+    return None
+
+
+def bulk_add_reviews(conn: Connection, rows: list) -> BulkResult:
+    """
+    Validate rows (schema, referenced user/book, rating) and COPY the valid
+    ones in a single transaction, fanning them out to timelines.
+    """
+    valid, errors = validate_rows(ReviewCreate, rows)
+    user_ids, book_ids = reviews_queries.existing_review_refs(
+        conn,
+        user_ids=list({review.user_id for _, review in valid}),
+        book_ids=list({review.book_id for _, review in valid}),
+    )
+
+    loadable = []
+    for index, review in valid:
+        detail = review_row_error(review, user_ids, book_ids)
+        if detail:
+            errors.append(BulkRowError(index=index, detail=detail))
+        else:
+            loadable.append((index, review))
+
+    ids = reviews_queries.copy_reviews(
+        conn,
+        reviews=[(r.user_id, r.book_id, r.rating, r.content) for _, r in loadable],
+    ) if loadable else []
+    return bulk_result(len(rows), loadable, ids, errors)
@@ -1,5 +1,12 @@
 # app/bizlogic/users.py
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
 from app.database.queries.users import insert_user as insert_user_query, get_user as get_user_query, list_users as list_users_query
+from app.database.queries.users import copy_users as copy_users_query, iter_users as iter_users_query
+from app.database.queries.users import get_users as get_users_query
+from app.database.queries.recommendations import get_user_recommendations
+from app.database.queries.versions import get_table_version
+from app.models.bulk import BulkResult, bulk_result, validate_rows
+from app.models.users import UserCreate
 
 def insert_user(conn, *, name: str):
     user = insert_user_query(conn, name=name)
@@ -9,5 +16,32 @@ def insert_user(conn, *, name: str):
 def get_user(conn, user_id: int):
     return get_user_query(conn, user_id=user_id)
 
-def list_users(conn):
-    return list_users_query(conn)
+def get_users(conn, user_ids: list[int]):
+    return get_users_query(conn, user_ids=user_ids)
+
+def list_users(conn, *, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return list_users_query(conn, limit=limit, after_id=after_id)
+
+def iter_users(conn, *, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return iter_users_query(conn, after_id=after_id)
+
+def get_users_version(conn):
+    return get_table_version(conn, table_name="users")
+
+
+def get_recommendations(conn, user_id: int, *, limit: int):
+    """
+    Books similar to the ones the user liked lately: None for an unknown user.
+    """
+    books = get_user_recommendations(conn, user_id=user_id, limit=limit)
+    if not books and not get_user_query(conn, user_id=user_id):
+        return None
+    return books
+
+
+def bulk_insert_users(conn, rows: list) -> BulkResult:
+    valid, errors = validate_rows(UserCreate, rows)
+    ids = copy_users_query(conn, names=[user.name for _, user in valid]) if valid else []
+    return bulk_result(len(rows), valid, ids, errors)
@@ -0,0 +1,83 @@
+from psycopg import AsyncConnection
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.bizlogic.books import empty_book_stats
+from app.database.queries_async import book_stats as book_stats_queries
+from app.database.queries_async import books as books_queries
+from app.database.queries_async import recommendations as recommendations_queries
+from app.database.queries_async import search as search_queries
+from app.database.queries_async import versions as versions_queries
+from app.models.books import BookCreate
+from app.models.bulk import BulkResult, bulk_result, validate_rows
+
+
+async def get_book(conn: AsyncConnection, book_id: int) -> dict | None:
+    return await books_queries.get_book(conn, book_id=book_id)
+
+
+async def get_books(conn: AsyncConnection, book_ids: list[int]) -> list[dict]:
+    return await books_queries.get_books(conn, book_ids=book_ids)
+
+
+async def list_books(conn: AsyncConnection, *, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None) -> list[dict]:
+    after_id = decode_cursor(after, int)[0] if after else None
+    return await books_queries.list_books(conn, limit=limit, after_id=after_id)
+
+
+def iter_books(conn: AsyncConnection, *, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return books_queries.iter_books(conn, after_id=after_id)
+
+
+async def get_books_version(conn: AsyncConnection) -> dict | None:
+    return await versions_queries.get_table_version(conn, table_name="books")
+
+
+async def get_book_stats(conn: AsyncConnection, book_id: int) -> dict | None:
+    stats = await book_stats_queries.get_book_stats(conn, book_id=book_id)
+    if stats is None and await books_queries.get_book(conn, book_id=book_id):
+        stats = empty_book_stats(book_id)
+    return stats
+
+
+async def list_top_rated(
+        conn: AsyncConnection, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        min_reviews: int = 1,
+        after: str | None = None
+) -> list[dict]:
+    after_key = decode_cursor(after, float, int, int) if after else None
+    return await book_stats_queries.list_top_rated(conn, limit=limit, min_reviews=min_reviews, after=after_key)
+
+
+async def get_similar_books(conn: AsyncConnection, book_id: int, *, limit: int) -> list[dict] | None:
+    books = await recommendations_queries.get_similar_books(conn, book_id=book_id, limit=limit)
+    if not books and not await books_queries.get_book(conn, book_id=book_id):
+        return None
+    return books
+
+
+async def search_books(
+        conn: AsyncConnection, *,
+        q: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    after_key = decode_cursor(after, float, int) if after else None
+    return await search_queries.search_books(conn, q=q, limit=limit, after=after_key)
+
+
+async def insert_book(conn: AsyncConnection, *, title: str, author: str) -> dict:
+    """
+    Insert a new book and return it.
+    """
+    return await books_queries.insert_book(conn, title=title, author=author)
+
+
+async def bulk_insert_books(conn: AsyncConnection, rows: list) -> BulkResult:
+    """
+    Validate rows one by one and COPY the valid ones in a single transaction.
+    """
+    valid, errors = validate_rows(BookCreate, rows)
+    ids = await books_queries.copy_books(conn, books=[(book.title, book.author) for _, book in valid]) if valid else []
+    return bulk_result(len(rows), valid, ids, errors)
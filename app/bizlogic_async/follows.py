@@ -0,0 +1,97 @@
+from datetime import datetime
+
+from psycopg import AsyncConnection
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.database.queries.follows import get_follow_graph
+from app.database.queries_async import follows as follows_queries
+from app.database.queries_async import users as users_queries
+
+
+async def follow_user(conn: AsyncConnection, *, follower_id: int, followee_id: int) -> dict:
+    """
+    Follow a user.
+    """
+    return await follows_queries.follow_user(
+        conn,
+        follower_id=follower_id,
+        followee_id=followee_id,
+    )
+
+
+async def unfollow_user(conn: AsyncConnection, *, follower_id: int, followee_id: int) -> None:
+    """
+    Unfollow a user.
+    """
+    await follows_queries.unfollow_user(
+        conn,
+        follower_id=follower_id,
+        followee_id=followee_id,
+    )
+
+
+async def get_newsfeed(
+        conn: AsyncConnection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of the newsfeed for a user (reviews from followed users), newest first.
+    """
+    return await follows_queries.get_newsfeed(
+        conn,
+        user_id=user_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+async def _users_page(conn: AsyncConnection, user_id: int, ids: list[int]) -> list[dict] | None:
+    if not ids and not await users_queries.get_user(conn, user_id=user_id):
+        return None
+    return await users_queries.get_users(conn, user_ids=ids)
+
+
+async def list_followers(
+        conn: AsyncConnection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict] | None:
+    after_id = decode_cursor(after, int)[0] if after else None
+    graph = get_follow_graph()
+    return await _users_page(conn, user_id, graph.followers(user_id, limit=limit, after_id=after_id))
+
+
+async def list_following(
+        conn: AsyncConnection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict] | None:
+    after_id = decode_cursor(after, int)[0] if after else None
+    graph = get_follow_graph()
+    return await _users_page(conn, user_id, graph.following(user_id, limit=limit, after_id=after_id))
+
+
+async def get_follow_counts(conn: AsyncConnection, user_id: int) -> dict | None:
+    counts = get_follow_graph().counts(user_id)
+    if not any(counts.values()) and not await users_queries.get_user(conn, user_id=user_id):
+        return None
+    return counts
+
+
+async def get_relationship(conn: AsyncConnection, user_id: int, other_id: int) -> dict:
+    graph = get_follow_graph()
+    following, followed_by = graph.follows(user_id, other_id), graph.follows(other_id, user_id)
+    return {"following": following, "followed_by": followed_by, "mutual": following and followed_by}
+
+
+async def suggest_users(conn: AsyncConnection, user_id: int, *, limit: int) -> list[dict] | None:
+    suggestions = get_follow_graph().suggestions(user_id, limit=limit)
+    users = await _users_page(conn, user_id, [suggestion["id"] for suggestion in suggestions])
+    if users is None:
+        return None
+    by_id = {user["id"]: user for user in users}
+    return [by_id[s["id"]] | s for s in suggestions if s["id"] in by_id]
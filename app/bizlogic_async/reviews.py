@@ -0,0 +1,161 @@
+from datetime import datetime
+
+from psycopg import AsyncConnection
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.bizlogic.reviews import review_row_error
+from app.database.queries_async import books as books_queries
+from app.database.queries_async import reviews as reviews_queries
+from app.database.queries_async import search as search_queries
+from app.database.queries_async import users as users_queries
+from app.database.queries_async import versions as versions_queries
+from app.models.bulk import BulkResult, BulkRowError, bulk_result, validate_rows
+from app.models.reviews import ReviewCreate
+
+
+async def add_review(
+        conn: AsyncConnection, *,
+        user_id: int,
+        book_id: int,
+        rating: int,
+        content: str
+) -> dict:
+    """
+    Insert a new review and return the created review as a dict.
+    Unknown users/books are rejected by the insert itself (400), in one round trip.
+    """
+    return await reviews_queries.insert_review(
+        conn,
+        user_id=user_id,
+        book_id=book_id,
+        rating=rating,
+        content=content,
+    )
+
+
+async def get_review(conn: AsyncConnection, review_id: int) -> dict | None:
+    """
+    Fetch a single review by its ID.
+    """
+    return await reviews_queries.get_review(conn, review_id=review_id)
+
+
+async def list_reviews_by_user(
+        conn: AsyncConnection,
+        user_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of reviews made by a specific user, newest first.
+    """
+    return await reviews_queries.list_reviews_by_user(
+        conn,
+        user_id=user_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def iter_reviews_by_user(conn: AsyncConnection, user_id: int, *, after: str | None = None):
+    """
+    Stream every review made by a specific user, newest first.
+    """
+    return reviews_queries.iter_reviews_by_user(
+        conn,
+        user_id=user_id,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+async def list_reviews_by_book(
+        conn: AsyncConnection,
+        book_id: int, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of reviews for a specific book, newest first.
+    """
+    return await reviews_queries.list_reviews_by_book(
+        conn,
+        book_id=book_id,
+        limit=limit,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+def iter_reviews_by_book(conn: AsyncConnection, book_id: int, *, after: str | None = None):
+    """
+    Stream every review for a specific book, newest first.
+    """
+    return reviews_queries.iter_reviews_by_book(
+        conn,
+        book_id=book_id,
+        after=decode_cursor(after, datetime, int) if after else None,
+    )
+
+
+async def expand_reviews(conn: AsyncConnection, reviews: list[dict], expand: frozenset[str]) -> list[dict]:
+    if "user" in expand:
+        user_ids = [review["user_id"] for review in reviews]
+        users = {user["id"]: user for user in await users_queries.get_users(conn, user_ids=user_ids)}
+        for review in reviews:
+            review["user"] = users.get(review["user_id"])
+    if "book" in expand:
+        book_ids = [review["book_id"] for review in reviews]
+        books = {book["id"]: book for book in await books_queries.get_books(conn, book_ids=book_ids)}
+        for review in reviews:
+            review["book"] = books.get(review["book_id"])
+    return reviews
+
+
+async def get_book_reviews_version(conn: AsyncConnection, book_id: int) -> dict | None:
+    """
+    Version of the book's review list, for its ETag / Last-Modified.
+    """
+    return await versions_queries.get_book_reviews_version(conn, book_id=book_id)
+
+
+async def search_reviews(
+        conn: AsyncConnection, *,
+        q: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: str | None = None
+) -> list[dict]:
+    """
+    Fetch one page of reviews matching `q`, best match first, with highlighted snippets.
+    """
+    return await search_queries.search_reviews(
+        conn,
+        q=q,
+        limit=limit,
+        after=decode_cursor(after, float, int) if after else None,
+    )
+
+
+async def bulk_add_reviews(conn: AsyncConnection, rows: list) -> BulkResult:
+    """
+    Validate rows (schema, referenced user/book, rating) and COPY the valid
+    ones in a single transaction, fanning them out to timelines.
+    """
+    valid, errors = validate_rows(ReviewCreate, rows)
+    user_ids, book_ids = await reviews_queries.existing_review_refs(
+        conn,
+        user_ids=list({review.user_id for _, review in valid}),
+        book_ids=list({review.book_id for _, review in valid}),
+    )
+
+    loadable = []
+    for index, review in valid:
+        detail = review_row_error(review, user_ids, book_ids)
+        if detail:
+            errors.append(BulkRowError(index=index, detail=detail))
+        else:
+            loadable.append((index, review))
+
+    ids = await reviews_queries.copy_reviews(
+        conn,
+        reviews=[(r.user_id, r.book_id, r.rating, r.content) for _, r in loadable],
+    ) if loadable else []
+    return bulk_result(len(rows), loadable, ids, errors)
@@ -0,0 +1,49 @@
+from psycopg import AsyncConnection
+
+from app.database.pagination import DEFAULT_PAGE_SIZE, decode_cursor
+from app.database.queries_async import recommendations as recommendations_queries
+from app.database.queries_async import users as users_queries
+from app.database.queries_async import versions as versions_queries
+from app.models.bulk import BulkResult, bulk_result, validate_rows
+from app.models.users import UserCreate
+
+
+async def insert_user(conn: AsyncConnection, *, name: str) -> dict:
+    user = await users_queries.insert_user(conn, name=name)
+    await conn.commit()
+    return user
+
+
+async def get_user(conn: AsyncConnection, user_id: int) -> dict | None:
+    return await users_queries.get_user(conn, user_id=user_id)
+
+
+async def get_users(conn: AsyncConnection, user_ids: list[int]) -> list[dict]:
+    return await users_queries.get_users(conn, user_ids=user_ids)
+
+
+async def list_users(conn: AsyncConnection, *, limit: int = DEFAULT_PAGE_SIZE, after: str | None = None) -> list[dict]:
+    after_id = decode_cursor(after, int)[0] if after else None
+    return await users_queries.list_users(conn, limit=limit, after_id=after_id)
+
+
+def iter_users(conn: AsyncConnection, *, after: str | None = None):
+    after_id = decode_cursor(after, int)[0] if after else None
+    return users_queries.iter_users(conn, after_id=after_id)
+
+
+async def get_users_version(conn: AsyncConnection) -> dict | None:
+    return await versions_queries.get_table_version(conn, table_name="users")
+
+
+async def get_recommendations(conn: AsyncConnection, user_id: int, *, limit: int) -> list[dict] | None:
+    books = await recommendations_queries.get_user_recommendations(conn, user_id=user_id, limit=limit)
+    if not books and not await users_queries.get_user(conn, user_id=user_id):
+        return None
+    return books
+
+
+async def bulk_insert_users(conn: AsyncConnection, rows: list) -> BulkResult:
+    valid, errors = validate_rows(UserCreate, rows)
+    ids = await users_queries.copy_users(conn, names=[user.name for _, user in valid]) if valid else []
+    return bulk_result(len(rows), valid, ids, errors)
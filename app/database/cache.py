@@ -0,0 +1,131 @@
+import threading
+import time
+from collections import OrderedDict
+
+from app.database.core import (
+    ENTITY_CACHE_ENABLED,
+    ENTITY_CACHE_MAX_SIZE,
+    ENTITY_CACHE_TTL,
+    ENTITY_CACHE_NEGATIVE_TTL,
+)
+
+# ------------------------------
+# In-process entity cache
+# ------------------------------
+# Users and books never change after insert, so the query layer reads them
+# through a per-process LRU. Ids that don't exist are cached too (as None) with
+# a short TTL, which bounds how long another worker's new row can look missing.
+MISSING = object()
+
+
+class EntityCache:
+    """
+    Bounded LRU of rows keyed by id, with per-entry expiry and hit/miss counters.
+    """
+
+    def __init__(self, name: str, *, max_size: int, ttl: float, negative_ttl: float, enabled: bool = True):
+        self.name = name
+        self.max_size = max_size
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.enabled = enabled
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Cached row (a copy), None for a cached 404, or MISSING.
+        """
+        if not self.enabled:
+            return MISSING
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return dict(value) if value is not None else None
+
+    def set(self, key, value: dict | None) -> None:
+        if not self.enabled:
+            return
+        ttl = self.ttl if value is not None else self.negative_ttl
+        value = dict(value) if value is not None else None
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_many(self, keys) -> tuple[dict, list]:
+        """
+        Cached rows of `keys` by key (cached 404s left out), and the keys
+        still to look up.
+        """
+        found, missing = {}, []
+        for key in dict.fromkeys(keys):
+            value = self.get(key)
+            if value is MISSING:
+                missing.append(key)
+            elif value is not None:
+                found[key] = value
+        return found, missing
+
+    def fill(self, found: dict, missing: list, rows: list[dict]) -> None:
+        """
+        Add the rows looked up for `missing` to `found` and the cache; the
+        keys not among them are cached as 404s.
+        """
+        for row in rows:
+            found[row["id"]] = row
+            self.set(row["id"], row)
+        for key in missing:
+            if key not in found:
+                self.set(key, None)
+
+    def invalidate(self, key) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+users_cache = EntityCache(
+    "users",
+    max_size=ENTITY_CACHE_MAX_SIZE,
+    ttl=ENTITY_CACHE_TTL,
+    negative_ttl=ENTITY_CACHE_NEGATIVE_TTL,
+    enabled=ENTITY_CACHE_ENABLED,
+)
+
+books_cache = EntityCache(
+    "books",
+    max_size=ENTITY_CACHE_MAX_SIZE,
+    ttl=ENTITY_CACHE_TTL,
+    negative_ttl=ENTITY_CACHE_NEGATIVE_TTL,
+    enabled=ENTITY_CACHE_ENABLED,
+)
+
+
+def get_cache_stats() -> dict:
+    return {cache.name: cache.stats() for cache in (users_cache, books_cache)}
@@ -1,6 +1,10 @@
 import os
-from psycopg import connect
+import time
+
 from psycopg.rows import dict_row
+from psycopg_pool import AsyncConnectionPool, ConnectionPool
+
+from app.metrics import DB_POOL_WAIT_SECONDS
 
 # ------------------------------
 # Configuration from environment
@@ -11,27 +15,208 @@ DB_NAME = os.getenv("DB_NAME", "goodreads")
 DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "postgres")
 
+# Pool sizing / lifecycle (seconds for the timeouts)
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", 2))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", 10))
+DB_POOL_MAX_IDLE = float(os.getenv("DB_POOL_MAX_IDLE", 300))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 30))
+
+# Newsfeed fan-out: reviews by users with more followers than this are merged
+# into feeds at read time instead of being pushed to every follower's timeline
+FEED_FANOUT_MAX_FOLLOWERS = int(os.getenv("FEED_FANOUT_MAX_FOLLOWERS", 10000))
+# How many of a followee's most recent reviews a new follow copies into the timeline
+FEED_BACKFILL_SIZE = int(os.getenv("FEED_BACKFILL_SIZE", 200))
+# "timeline" reads the materialized timelines; "merge" computes every feed on read
+FEED_STRATEGY = os.getenv("FEED_STRATEGY", "timeline")
+
+# In-process user/book cache (seconds for the TTLs)
+ENTITY_CACHE_ENABLED = os.getenv("ENTITY_CACHE_ENABLED", "1") != "0"
+ENTITY_CACHE_MAX_SIZE = int(os.getenv("ENTITY_CACHE_MAX_SIZE", 10000))
+ENTITY_CACHE_TTL = float(os.getenv("ENTITY_CACHE_TTL", 300))
+ENTITY_CACHE_NEGATIVE_TTL = float(os.getenv("ENTITY_CACHE_NEGATIVE_TTL", 5))
+
+# In-process follow graph (app/database/follow_graph.py): seconds between a worker's
+# background reloads, which pick up follows made through other workers, and how many of its
+# own follows/unfollows it keeps on the side before merging them into the arrays
+FOLLOW_GRAPH_MAX_AGE = float(os.getenv("FOLLOW_GRAPH_MAX_AGE", 60))
+FOLLOW_GRAPH_COMPACT_SIZE = int(os.getenv("FOLLOW_GRAPH_COMPACT_SIZE", 10000))
+
+# Upper bounds on the rows and body bytes accepted by one POST /.../bulk request
+BULK_MAX_ROWS = int(os.getenv("BULK_MAX_ROWS", 100000))
+BULK_MAX_BYTES = int(os.getenv("BULK_MAX_BYTES", 64 * 1024 * 1024))
+
+# Run registered statements prepared and warm them on every new pooled connection
+PREPARED_STATEMENTS = os.getenv("PREPARED_STATEMENTS", "1") != "0"
+
+# Rows fetched per round trip by the server-side cursors behind NDJSON exports
+STREAM_ITERSIZE = int(os.getenv("STREAM_ITERSIZE", 1000))
+
+# Cache-Control max-age (seconds) on read routes with ETag / Last-Modified validators;
+# with 0, clients and CDNs revalidate every time and get a 304 while nothing changed
+HTTP_CACHE_MAX_AGE = int(os.getenv("HTTP_CACHE_MAX_AGE", 0))
+
+# Request, query and pool-wait metrics served at GET /metrics
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") != "0"
+
+# Timed statements slower than this (milliseconds) are logged and kept for
+# GET /admin/slow-queries; negative turns the slow-query log off
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+SLOW_QUERY_LOG_SIZE = int(os.getenv("SLOW_QUERY_LOG_SIZE", 100))
+
+# Shared secret for the /admin routes (X-Admin-Token header); unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
 
 # Read the DB URL from environment, fallback to default
 # Construct the DATABASE_URL dynamically
 DATABASE_URL = f"postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
+# Comma-separated DSNs of streaming replicas serving the read routes (app/database/replicas.py);
+# empty sends everything to DATABASE_URL
+DB_REPLICA_URLS = [url.strip() for url in os.getenv("DB_REPLICA_URLS", "").split(",") if url.strip()]
+# How long (seconds) a write's LSN token keeps that client's reads on caught-up servers
+REPLICA_TOKEN_TTL = int(os.getenv("REPLICA_TOKEN_TTL", 30))
+
+# ------------------------------
+# Connection Pools
+# ------------------------------
+# New connections prepare the registered statements (app/database/statements.py).
+# That module and the query modules filling its registry import this one,
+# hence the imports inside the callbacks.
+def _configure_connection(conn) -> None:
+    from app.database.statements import configure_connection
+    configure_connection(conn)
+
+
+async def _configure_async_connection(conn) -> None:
+    from app.database.statements import configure_async_connection
+    await configure_async_connection(conn)
+
+
+# Both pools are created closed at import time; the FastAPI lifespan opens and closes it,
+# so importing the app (e.g. in unit tests) never touches the database.
+pool = ConnectionPool(
+    DATABASE_URL,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    max_idle=DB_POOL_MAX_IDLE,
+    timeout=DB_POOL_TIMEOUT,
+    kwargs={"row_factory": dict_row},
+    configure=_configure_connection,
+    check=ConnectionPool.check_connection,
+    name="goodreads",
+    open=False,
+)
+
+# Used by the async app (app.main_async); only one of the two pools is opened per process.
+async_pool = AsyncConnectionPool(
+    DATABASE_URL,
+    min_size=DB_POOL_MIN_SIZE,
+    max_size=DB_POOL_MAX_SIZE,
+    max_idle=DB_POOL_MAX_IDLE,
+    timeout=DB_POOL_TIMEOUT,
+    kwargs={"row_factory": dict_row},
+    configure=_configure_async_connection,
+    check=AsyncConnectionPool.check_connection,
+    name="goodreads-async",
+    open=False,
+)
+
+
+# One pool per replica, opened and closed with the primary's
+replica_pools = [
+    ConnectionPool(
+        url,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        max_idle=DB_POOL_MAX_IDLE,
+        timeout=DB_POOL_TIMEOUT,
+        kwargs={"row_factory": dict_row},
+        configure=_configure_connection,
+        check=ConnectionPool.check_connection,
+        name=f"goodreads-replica-{index}",
+        open=False,
+    )
+    for index, url in enumerate(DB_REPLICA_URLS)
+]
+
+async_replica_pools = [
+    AsyncConnectionPool(
+        url,
+        min_size=DB_POOL_MIN_SIZE,
+        max_size=DB_POOL_MAX_SIZE,
+        max_idle=DB_POOL_MAX_IDLE,
+        timeout=DB_POOL_TIMEOUT,
+        kwargs={"row_factory": dict_row},
+        configure=_configure_async_connection,
+        check=AsyncConnectionPool.check_connection,
+        name=f"goodreads-async-replica-{index}",
+        open=False,
+    )
+    for index, url in enumerate(DB_REPLICA_URLS)
+]
+
+
+def open_pool() -> None:
+    """
+    Opens the pool (and the replicas' pools) and waits until min_size connections are ready.
+    """
+    pool.open(wait=True, timeout=DB_POOL_TIMEOUT)
+    for replica_pool in replica_pools:
+        replica_pool.open(wait=True, timeout=DB_POOL_TIMEOUT)
+
+
+def close_pool() -> None:
+    for replica_pool in replica_pools:
+        replica_pool.close()
+    pool.close()
+
+
+def get_pool_stats() -> dict:
+    """
+    Current pool counters (pool_size, pool_available, requests_waiting, ...).
+    """
+    return pool.get_stats()
+
+
+async def open_async_pool() -> None:
+    await async_pool.open(wait=True, timeout=DB_POOL_TIMEOUT)
+    for replica_pool in async_replica_pools:
+        await replica_pool.open(wait=True, timeout=DB_POOL_TIMEOUT)
+
+
+async def close_async_pool() -> None:
+    for replica_pool in async_replica_pools:
+        await replica_pool.close()
+    await async_pool.close()
+
+
+def get_async_pool_stats() -> dict:
+    return async_pool.get_stats()
+
+
 # ------------------------------
 # DB Connection Factory
 # ------------------------------
 def get_connection():
     """
-    Provides a fresh connection. Use it with FastAPI Depends.
+    Borrows a pooled connection. Use it with FastAPI Depends.
+    The connection is checked before being handed out and returned
+    to the pool (committed, or rolled back on error) afterwards.
     """
-    conn = connect(
-        host=DB_HOST,
-        port=DB_PORT,
-        dbname=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-        row_factory=dict_row
-    )
-    try:
+    started = time.perf_counter()
+    with pool.connection() as conn:
+        if METRICS_ENABLED:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        yield conn
+
+
+async def get_async_connection():
+    """
+    Async counterpart of get_connection, yielding an AsyncConnection.
+    """
+    started = time.perf_counter()
+    async with async_pool.connection() as conn:
+        if METRICS_ENABLED:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
         yield conn
-    finally:
-        conn.close()
@@ -0,0 +1,414 @@
+import asyncio
+import contextlib
+import logging
+import threading
+import time
+
+import numpy as np
+
+from app.database.core import FOLLOW_GRAPH_COMPACT_SIZE, FOLLOW_GRAPH_MAX_AGE
+
+# ------------------------------
+# In-process follow graph
+# ------------------------------
+# Follower/following lists, counts, follow checks and "people you may know"
+# are answered from memory instead of multi-hop joins over followers. Each
+# worker loads every edge with one bulk read into two CSR adjacencies (who a
+# user follows, and who follows them). A user's row is a sorted slice of one
+# array, found through indptr[user_id]: ids are dense (BIGSERIAL), so they
+# index the rows directly.
+#
+# CSR arrays are immutable. Follows and unfollows made through this worker are
+# kept as added/removed edges on top of them. Follows made through other
+# workers show up at the next reload. Reloads run in the background every
+# FOLLOW_GRAPH_MAX_AGE seconds (a thread in the sync app, a task in the async
+# one), started by the lifespan after a first load; requests only read. The
+# same thread or task merges the changes into new arrays once there are
+# FOLLOW_GRAPH_COMPACT_SIZE of them, swapping them in like a reload.
+
+logger = logging.getLogger(__name__)
+
+
+class Adjacency:
+    """
+    One direction of the graph in CSR form: the neighbours of user u are
+    indices[indptr[u]:indptr[u + 1]], sorted.
+    """
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        self.indptr = indptr
+        self.indices = indices
+
+    @classmethod
+    def from_edges(cls, sources: np.ndarray, targets: np.ndarray, size: int) -> "Adjacency":
+        order = np.lexsort((targets, sources))
+        indptr = np.zeros(size + 1, np.int64)
+        np.cumsum(np.bincount(sources, minlength=size), out=indptr[1:])
+        # Half the memory while ids fit
+        dtype = np.int32 if size <= np.iinfo(np.int32).max else np.int64
+        return cls(indptr, targets[order].astype(dtype))
+
+    @property
+    def size(self) -> int:
+        return len(self.indptr) - 1
+
+    def row(self, user_id: int) -> np.ndarray:
+        if not 0 <= user_id < self.size:
+            return self.indices[:0]
+        return self.indices[self.indptr[user_id]:self.indptr[user_id + 1]]
+
+    def gather(self, user_ids: np.ndarray) -> np.ndarray:
+        """
+        The rows of `user_ids` (all within size), concatenated.
+        """
+        starts = self.indptr[user_ids]
+        lengths = self.indptr[user_ids + 1] - starts
+        offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        return self.indices[offsets + np.arange(lengths.sum())]
+
+    def edges(self) -> tuple[np.ndarray, np.ndarray]:
+        return np.repeat(np.arange(self.size), np.diff(self.indptr)), self.indices.astype(np.int64)
+
+
+class Changes:
+    """
+    Edges added to or removed from the CSR arrays, indexed by both ends.
+    """
+
+    def __init__(self):
+        self.edges: set[tuple[int, int]] = set()
+        self.by_source: dict[int, set[int]] = {}
+        self.by_target: dict[int, set[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def __contains__(self, edge: tuple[int, int]) -> bool:
+        return edge in self.edges
+
+    def add(self, source: int, target: int) -> None:
+        self.edges.add((source, target))
+        self.by_source.setdefault(source, set()).add(target)
+        self.by_target.setdefault(target, set()).add(source)
+
+    def discard(self, source: int, target: int) -> None:
+        if (source, target) not in self.edges:
+            return
+        self.edges.discard((source, target))
+        for index, key, value in ((self.by_source, source, target), (self.by_target, target, source)):
+            index[key].discard(value)
+            if not index[key]:
+                del index[key]
+
+
+class FollowGraph:
+    """
+    Followers and followees of every user, from a snapshot of the followers
+    table plus this worker's own follows and unfollows since.
+    """
+
+    def __init__(self, *, max_age: float, compact_size: int):
+        self.max_age = max_age
+        self.compact_size = compact_size
+        self._following: Adjacency | None = None
+        self._followers: Adjacency | None = None
+        self._added = Changes()
+        self._removed = Changes()
+        self._lock = threading.Lock()
+        # Changes made while a load runs, replayed onto its snapshot
+        self._journal: list[tuple[bool, int, int]] | None = None
+        self._loaded_at = 0.0
+        self.loads = 0
+        self.failed_loads = 0
+        self.load_seconds = 0.0
+        self.compactions = 0
+        # Background reloads and compactions
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._compaction_due = self._wake.set
+        self._thread: threading.Thread | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._following is not None
+
+    # ------------------------------
+    # Loading
+    # ------------------------------
+    def reload(self, load) -> None:
+        """
+        Swap in a snapshot from load() -> (follower_ids, followee_ids). Reads
+        keep using the current one until then.
+        """
+        started = self._begin_load()
+        try:
+            follower_ids, followee_ids = load()
+        except BaseException:
+            self._abort_load()
+            raise
+        self._finish_load(started, follower_ids, followee_ids)
+
+    async def reload_async(self, load) -> None:
+        started = self._begin_load()
+        try:
+            follower_ids, followee_ids = await load()
+        except BaseException:
+            self._abort_load()
+            raise
+        await asyncio.to_thread(self._finish_load, started, follower_ids, followee_ids)
+
+    def compact(self) -> None:
+        """
+        Merge the pending changes into new arrays. They're built outside the
+        lock, from the current ones, and swapped in like a reload.
+        """
+        self._begin_load()
+        with self._lock:
+            following, added, removed = self._following, list(self._added.edges), list(self._removed.edges)
+        try:
+            follower_ids, followee_ids = self._merged_edges(following, added, removed)
+        except BaseException:
+            self._abort_load()
+            raise
+        self._finish_load(None, follower_ids, followee_ids)
+
+    def start(self, load) -> None:
+        """
+        Load the graph, then reload it every max_age seconds in a daemon thread
+        until stop(). The thread also compacts the graph when it's due.
+        """
+        self.reload(load)
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._reload_every_max_age, args=(load,), name="follow-graph", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def _reload_every_max_age(self, load) -> None:
+        reload_at = time.monotonic() + self.max_age
+        while not self._stop.is_set():
+            self._wake.wait(max(reload_at - time.monotonic(), 0))
+            self._wake.clear()
+            if self._stop.is_set():
+                return
+            if time.monotonic() < reload_at:
+                self._compact_if_due()
+                continue
+            try:
+                self.reload(load)
+            except Exception:
+                self._failed_load()
+            reload_at = time.monotonic() + self.max_age
+
+    async def start_async(self, load) -> None:
+        await self.reload_async(load)
+        wake = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        # Follows may come from the loop's worker threads too
+        self._compaction_due = lambda: wake.is_set() or loop.call_soon_threadsafe(wake.set)
+        self._task = asyncio.create_task(self._reload_every_max_age_async(load, wake), name="follow-graph")
+
+    async def stop_async(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+            self._compaction_due = self._wake.set
+
+    async def _reload_every_max_age_async(self, load, wake: asyncio.Event) -> None:
+        reload_at = time.monotonic() + self.max_age
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(wake.wait(), max(reload_at - time.monotonic(), 0))
+            wake.clear()
+            if time.monotonic() < reload_at:
+                await asyncio.to_thread(self._compact_if_due)
+                continue
+            try:
+                await self.reload_async(load)
+            except Exception:
+                self._failed_load()
+            reload_at = time.monotonic() + self.max_age
+
+    def _compact_if_due(self) -> None:
+        with self._lock:
+            due = self.loaded and self._pending() >= self.compact_size
+        if not due:
+            return
+        try:
+            self.compact()
+        except Exception:
+            # The changes stay on the side; the next one asks again
+            logger.exception("follow graph compaction failed")
+
+    def _failed_load(self) -> None:
+        # The previous snapshot keeps being served; the next reload retries
+        self.failed_loads += 1
+        logger.exception("follow graph reload failed")
+
+    def _begin_load(self) -> float:
+        # Anything committed from here on may be missing from the snapshot
+        with self._lock:
+            self._journal = []
+        return time.monotonic()
+
+    def _abort_load(self) -> None:
+        with self._lock:
+            self._journal = None
+
+    def _finish_load(self, started: float | None, follower_ids: np.ndarray, followee_ids: np.ndarray) -> None:
+        # started is None for a compaction: same edges, so the age is kept
+        size = int(max(follower_ids.max(initial=0), followee_ids.max(initial=0))) + 1
+        following = Adjacency.from_edges(follower_ids, followee_ids, size)
+        followers = Adjacency.from_edges(followee_ids, follower_ids, size)
+        with self._lock:
+            self._following, self._followers = following, followers
+            self._added, self._removed = Changes(), Changes()
+            journal, self._journal = self._journal or [], None
+            for follows, follower_id, followee_id in journal:
+                self._apply(follows, follower_id, followee_id)
+            if started is None:
+                self.compactions += 1
+                return
+            self._loaded_at = started
+            self.loads += 1
+            self.load_seconds = round(time.monotonic() - started, 4)
+
+    # ------------------------------
+    # Changes
+    # ------------------------------
+    def follow(self, follower_id: int, followee_id: int) -> None:
+        self._change(True, follower_id, followee_id)
+
+    def unfollow(self, follower_id: int, followee_id: int) -> None:
+        self._change(False, follower_id, followee_id)
+
+    def _change(self, follows: bool, follower_id: int, followee_id: int) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((follows, follower_id, followee_id))
+            if self.loaded:
+                self._apply(follows, follower_id, followee_id)
+                if self._pending() >= self.compact_size:
+                    self._compaction_due()
+
+    def _apply(self, follows: bool, follower_id: int, followee_id: int) -> None:
+        in_arrays = self._in_arrays(follower_id, followee_id)
+        if follows:
+            self._removed.discard(follower_id, followee_id)
+            if not in_arrays:
+                self._added.add(follower_id, followee_id)
+        else:
+            self._added.discard(follower_id, followee_id)
+            if in_arrays:
+                self._removed.add(follower_id, followee_id)
+
+    def _in_arrays(self, follower_id: int, followee_id: int) -> bool:
+        row = self._following.row(follower_id)
+        position = np.searchsorted(row, followee_id)
+        return position < len(row) and row[position] == followee_id
+
+    def _pending(self) -> int:
+        return len(self._added) + len(self._removed)
+
+    @staticmethod
+    def _merged_edges(following: Adjacency, added: list, removed: list) -> tuple[np.ndarray, np.ndarray]:
+        follower_ids, followee_ids = following.edges()
+        keep = np.ones(len(follower_ids), bool)
+        for follower_id, followee_id in removed:
+            keep[following.indptr[follower_id] + np.searchsorted(following.row(follower_id), followee_id)] = False
+        added = np.array(sorted(added), np.int64).reshape(-1, 2)
+        return np.concatenate([follower_ids[keep], added[:, 0]]), np.concatenate([followee_ids[keep], added[:, 1]])
+
+    # ------------------------------
+    # Reads
+    # ------------------------------
+    def _row(self, adjacency: Adjacency, changes_by_user: str, user_id: int) -> np.ndarray:
+        row = adjacency.row(user_id)
+        removed = getattr(self._removed, changes_by_user).get(user_id)
+        added = getattr(self._added, changes_by_user).get(user_id)
+        if removed:
+            row = np.setdiff1d(row, list(removed), assume_unique=True)
+        if added:
+            row = np.union1d(row, list(added))
+        return row
+
+    def _following_of(self, user_id: int) -> np.ndarray:
+        return self._row(self._following, "by_source", user_id)
+
+    def _followers_of(self, user_id: int) -> np.ndarray:
+        return self._row(self._followers, "by_target", user_id)
+
+    def _page(self, row: np.ndarray, limit: int, after_id: int | None) -> list[int]:
+        start = 0 if after_id is None else np.searchsorted(row, after_id, side="right")
+        return row[start:start + limit].tolist()
+
+    def followers(self, user_id: int, *, limit: int, after_id: int | None = None) -> list[int]:
+        """
+        Ids of the user's followers, ascending, after `after_id`.
+        """
+        with self._lock:
+            return self._page(self._followers_of(user_id), limit, after_id)
+
+    def following(self, user_id: int, *, limit: int, after_id: int | None = None) -> list[int]:
+        with self._lock:
+            return self._page(self._following_of(user_id), limit, after_id)
+
+    def counts(self, user_id: int) -> dict:
+        with self._lock:
+            return {"followers": len(self._followers_of(user_id)), "following": len(self._following_of(user_id))}
+
+    def follows(self, follower_id: int, followee_id: int) -> bool:
+        with self._lock:
+            if (follower_id, followee_id) in self._added:
+                return True
+            return (follower_id, followee_id) not in self._removed and self._in_arrays(follower_id, followee_id)
+
+    def suggestions(self, user_id: int, *, limit: int) -> list[dict]:
+        """
+        Friends of friends: users followed by the ones `user_id` follows, most
+        such connections first, as {"id", "mutual_count"}.
+        """
+        with self._lock:
+            following = self._following_of(user_id).astype(np.int64)
+            # Rows with local changes one by one, the rest in one gather
+            changed = np.isin(following, list(self._added.by_source.keys() | self._removed.by_source.keys()))
+            stored = following[~changed & (following < self._following.size)]
+            candidates = np.concatenate(
+                [self._following.gather(stored)] + [self._following_of(int(f)) for f in following[changed]],
+                dtype=np.int64,
+            )
+        ids, mutual_counts = np.unique(candidates, return_counts=True)
+        keep = (ids != user_id) & ~np.isin(ids, following)
+        ids, mutual_counts = ids[keep], mutual_counts[keep]
+        best = np.lexsort((ids, -mutual_counts))[:limit]
+        return [{"id": int(ids[i]), "mutual_count": int(mutual_counts[i])} for i in best]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "loaded": self.loaded,
+                "edges": len(self._following.indices) + len(self._added) - len(self._removed) if self.loaded else 0,
+                "pending_changes": self._pending(),
+                "age_s": round(time.monotonic() - self._loaded_at, 1) if self.loaded else None,
+                "max_age_s": self.max_age,
+                "loads": self.loads,
+                "failed_loads": self.failed_loads,
+                "last_load_s": self.load_seconds,
+                "compactions": self.compactions,
+            }
+
+
+follow_graph = FollowGraph(max_age=FOLLOW_GRAPH_MAX_AGE, compact_size=FOLLOW_GRAPH_COMPACT_SIZE)
+
+
+def get_follow_graph_stats() -> dict:
+    return follow_graph.stats()
@@ -0,0 +1,292 @@
+"""
+Synthetic dataset generator for performance work.
+
+Streams users, books, reviews and follow edges into an empty database with
+COPY, then derives follower counts, book_stats and (optionally) timelines in
+SQL. Everything is drawn from seeded generators, so the same arguments give
+the same dataset:
+
+- book popularity and reviewer activity are Zipf-distributed, so a few books
+  and users account for most reviews;
+- followees are picked with Zipf weights too, which gives the power-law
+  follower counts of a social graph (a handful of users above
+  FEED_FANOUT_MAX_FOLLOWERS), while out-degrees are exponential around
+  `follows_per_user`;
+- review ids increase with created_at, spread over `days` before a fixed epoch.
+
+    python -m app.database.generate --users 1000000 --books 200000 --reviews 10000000 --truncate
+
+The load runs in one transaction. Keys and indexes on the bulk tables are
+dropped first and rebuilt at the end, since sorting once is far cheaper than
+maintaining btrees and checking foreign keys row by row. Timelines hold one
+row per (reader, review) and dominate the load time on large graphs;
+--no-timelines skips them (serve feeds with FEED_STRATEGY=merge).
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+
+import psycopg
+
+from app.database.core import DATABASE_URL, FEED_FANOUT_MAX_FOLLOWERS
+
+# Generated rows are stamped relative to this, not to now(), to stay reproducible
+EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+# Rows formatted per COPY write
+CHUNK_ROWS = 50_000
+
+BOOK_ZIPF = 1.0
+REVIEWER_ZIPF = 0.8
+FOLLOWEE_ZIPF = 1.1
+
+WORDS = (
+    "book story plot characters writing pace ending chapter author world reader "
+    "slow gripping beautiful predictable moving clever dull brilliant dense light "
+    "recommend loved hated finished again classic series sequel prose dialogue twist"
+).split()
+
+COPY_USERS_SQL = "COPY users (id, name, created_at) FROM STDIN"
+COPY_BOOKS_SQL = "COPY books (id, title, author, created_at) FROM STDIN"
+COPY_REVIEWS_SQL = "COPY reviews (id, user_id, book_id, rating, content, created_at) FROM STDIN"
+COPY_FOLLOWERS_SQL = "COPY followers (follower_id, followee_id, created_at) FROM STDIN"
+
+# Tables whose keys and indexes are rebuilt after the load; users and books
+# keep theirs, since the foreign keys being re-added need them
+BULK_TABLES = ["reviews", "followers", "timelines"]
+
+KEY_CONSTRAINTS_SQL = """
+SELECT conrelid::regclass::text AS table_name, conname, contype, pg_get_constraintdef(oid) AS definition
+FROM pg_constraint
+WHERE contype IN ('p', 'u', 'f') AND conrelid::regclass::text = ANY(%(tables)s)
+ORDER BY conname;
+"""
+
+INDEXES_SQL = """
+SELECT i.indexname, i.indexdef
+FROM pg_indexes i
+WHERE i.schemaname = current_schema()
+  AND i.tablename = ANY(%(tables)s)
+  AND NOT EXISTS (SELECT 1 FROM pg_constraint c WHERE c.conname = i.indexname)
+ORDER BY i.indexname;
+"""
+
+TRUNCATE_SQL = "TRUNCATE users, books RESTART IDENTITY CASCADE;"
+
+SYNC_SEQUENCES_SQL = """
+SELECT setval(pg_get_serial_sequence('users', 'id'), GREATEST((SELECT max(id) FROM users), 1));
+SELECT setval(pg_get_serial_sequence('books', 'id'), GREATEST((SELECT max(id) FROM books), 1));
+SELECT setval(pg_get_serial_sequence('reviews', 'id'), GREATEST((SELECT max(id) FROM reviews), 1));
+"""
+
+FOLLOWER_COUNTS_SQL = """
+UPDATE users u
+SET follower_count = c.n
+FROM (SELECT followee_id, COUNT(*) AS n FROM followers GROUP BY followee_id) c
+WHERE u.id = c.followee_id;
+"""
+
+BOOK_STATS_SQL = """
+INSERT INTO book_stats (book_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT book_id,
+       COUNT(*),
+       COALESCE(SUM(rating), 0),
+       COUNT(*) FILTER (WHERE rating = 1),
+       COUNT(*) FILTER (WHERE rating = 2),
+       COUNT(*) FILTER (WHERE rating = 3),
+       COUNT(*) FILTER (WHERE rating = 4),
+       COUNT(*) FILTER (WHERE rating = 5)
+FROM reviews
+GROUP BY book_id;
+"""
+
+# Same rows the write paths would have pushed: the author's own timeline,
+# plus every follower's unless the author is above the fan-out threshold
+TIMELINES_SQL = """
+INSERT INTO timelines (user_id, review_id, author_id, created_at)
+SELECT r.user_id, r.id, r.user_id, r.created_at
+FROM reviews r
+UNION ALL
+SELECT f.follower_id, r.id, r.user_id, r.created_at
+FROM reviews r
+JOIN users u ON u.id = r.user_id
+JOIN followers f ON f.followee_id = r.user_id
+WHERE u.follower_count <= %(fanout_max_followers)s;
+"""
+
+
+def _zipf_cum_weights(n: int, exponent: float) -> list[float]:
+    return list(accumulate(1 / rank ** exponent for rank in range(1, n + 1)))
+
+
+def _ranked_ids(rng: random.Random, n: int) -> list[int]:
+    """Ids 1..n in popularity order, so popular rows are spread over the id range."""
+    ids = list(range(1, n + 1))
+    rng.shuffle(ids)
+    return ids
+
+
+def _drop_keys(cur) -> list[str]:
+    """
+    Drop the keys and indexes of BULK_TABLES, returning the statements that
+    rebuild them: primary/unique keys, then indexes, then foreign keys.
+    """
+    constraints = cur.execute(KEY_CONSTRAINTS_SQL, {"tables": BULK_TABLES}).fetchall()
+    indexes = cur.execute(INDEXES_SQL, {"tables": BULK_TABLES}).fetchall()
+    foreign = [c for c in constraints if c[2] == "f"]
+    keys = [c for c in constraints if c[2] != "f"]
+
+    for table_name, conname, _, _ in foreign + keys:
+        cur.execute(f'ALTER TABLE {table_name} DROP CONSTRAINT "{conname}"')
+    for indexname, _ in indexes:
+        cur.execute(f'DROP INDEX "{indexname}"')
+
+    return (
+        [f'ALTER TABLE {table_name} ADD CONSTRAINT "{conname}" {definition}' for table_name, conname, _, definition in keys]
+        + [indexdef for _, indexdef in indexes]
+        + [f'ALTER TABLE {table_name} ADD CONSTRAINT "{conname}" {definition}' for table_name, conname, _, definition in foreign]
+    )
+
+
+def _copy_lines(cur, sql: str, lines) -> None:
+    """COPY pre-formatted text lines (no tabs, newlines or backslashes in values), CHUNK_ROWS per write."""
+    with cur.copy(sql) as copy:
+        chunk = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == CHUNK_ROWS:
+                copy.write("".join(chunk))
+                chunk.clear()
+        if chunk:
+            copy.write("".join(chunk))
+
+
+def _user_lines(rng: random.Random, users: int, days: int):
+    start = EPOCH - timedelta(days=days * 2)
+    for user_id in range(1, users + 1):
+        created_at = start + timedelta(seconds=rng.randrange(days * 86400))
+        yield f"{user_id}\tuser {user_id}\t{created_at.isoformat()}\n"
+
+
+def _book_lines(rng: random.Random, books: int, days: int):
+    start = EPOCH - timedelta(days=days * 2)
+    authors = max(books // 8, 1)
+    for book_id in range(1, books + 1):
+        created_at = start + timedelta(seconds=rng.randrange(days * 86400))
+        yield f"{book_id}\tbook {book_id}\tauthor {rng.randrange(authors)}\t{created_at.isoformat()}\n"
+
+
+def _review_lines(rng: random.Random, users: int, books: int, reviews: int, days: int):
+    book_ids, book_weights = _ranked_ids(rng, books), _zipf_cum_weights(books, BOOK_ZIPF)
+    user_ids, user_weights = _ranked_ids(rng, users), _zipf_cum_weights(users, REVIEWER_ZIPF)
+    contents = [" ".join(rng.choices(WORDS, k=rng.randint(5, 60))) for _ in range(4096)]
+    start = EPOCH - timedelta(days=days)
+    step = days * 86400 / reviews
+    for first in range(0, reviews, CHUNK_ROWS):
+        n = min(CHUNK_ROWS, reviews - first)
+        authors = rng.choices(user_ids, cum_weights=user_weights, k=n)
+        reviewed = rng.choices(book_ids, cum_weights=book_weights, k=n)
+        ratings = rng.choices((1, 2, 3, 4, 5), weights=(1, 2, 4, 6, 5), k=n)
+        texts = rng.choices(contents, k=n)
+        for i in range(n):
+            review_id = first + i + 1
+            created_at = start + timedelta(seconds=review_id * step)
+            yield f"{review_id}\t{authors[i]}\t{reviewed[i]}\t{ratings[i]}\t{texts[i]}\t{created_at.isoformat()}\n"
+
+
+def _follow_lines(rng: random.Random, users: int, follows_per_user: float):
+    followee_ids, followee_weights = _ranked_ids(rng, users), _zipf_cum_weights(users, FOLLOWEE_ZIPF)
+    created_at = EPOCH.isoformat()
+    for follower_id in range(1, users + 1):
+        degree = min(int(rng.expovariate(1 / follows_per_user)), users - 1) if follows_per_user else 0
+        followees = set(rng.choices(followee_ids, cum_weights=followee_weights, k=degree))
+        followees.discard(follower_id)
+        for followee_id in sorted(followees):
+            yield f"{follower_id}\t{followee_id}\t{created_at}\n"
+
+
+def generate_dataset(
+        conn, *,
+        users: int,
+        books: int,
+        reviews: int,
+        follows_per_user: float = 10,
+        days: int = 365,
+        seed: int = 42,
+        timelines: bool = True,
+        truncate: bool = False,
+) -> dict[str, float]:
+    """
+    Load a synthetic dataset into the schema on `conn` in one transaction and
+    commit. The tables must be empty unless `truncate` is set. Returns seconds
+    per phase.
+    """
+    timings = {}
+
+    def phase(name, run):
+        started = time.perf_counter()
+        run()
+        timings[name] = round(time.perf_counter() - started, 2)
+        print(f"{name}: {timings[name]}s")
+
+    with conn.cursor() as cur:
+        cur.execute("SET LOCAL synchronous_commit = off")
+        cur.execute("SET LOCAL maintenance_work_mem = '512MB'")
+        if truncate:
+            cur.execute(TRUNCATE_SQL)
+        elif cur.execute("SELECT EXISTS (SELECT 1 FROM users) OR EXISTS (SELECT 1 FROM books)").fetchone()[0]:
+            raise ValueError("users/books are not empty; pass truncate=True (--truncate) to replace them")
+        rebuild = _drop_keys(cur)
+
+        phase("users", lambda: _copy_lines(cur, COPY_USERS_SQL, _user_lines(random.Random(f"{seed}-users"), users, days)))
+        phase("books", lambda: _copy_lines(cur, COPY_BOOKS_SQL, _book_lines(random.Random(f"{seed}-books"), books, days)))
+        phase("reviews", lambda: _copy_lines(
+            cur, COPY_REVIEWS_SQL, _review_lines(random.Random(f"{seed}-reviews"), users, books, reviews, days),
+        ))
+        phase("followers", lambda: _copy_lines(
+            cur, COPY_FOLLOWERS_SQL, _follow_lines(random.Random(f"{seed}-followers"), users, follows_per_user),
+        ))
+        phase("follower_count", lambda: cur.execute(FOLLOWER_COUNTS_SQL))
+        phase("book_stats", lambda: cur.execute(BOOK_STATS_SQL))
+        # Fresh statistics so the fan-out join is planned as the bulk join it is
+        phase("statistics", lambda: cur.execute("ANALYZE users, reviews, followers"))
+        if timelines:
+            phase("timelines", lambda: cur.execute(TIMELINES_SQL, {"fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}))
+        phase("keys and indexes", lambda: [cur.execute(sql) for sql in rebuild])
+        phase("sequences", lambda: [cur.execute(sql) for sql in SYNC_SEQUENCES_SQL.strip().splitlines()])
+        phase("analyze", lambda: cur.execute("ANALYZE"))
+    conn.commit()
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--books", type=int, default=20_000)
+    parser.add_argument("--reviews", type=int, default=1_000_000)
+    parser.add_argument("--follows-per-user", type=float, default=10, help="mean out-degree of the follow graph")
+    parser.add_argument("--days", type=int, default=365, help="reviews are spread over this many days")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--no-timelines", dest="timelines", action="store_false", help="skip the timelines fan-out")
+    parser.add_argument("--truncate", action="store_true", help="empty users, books and everything referencing them first")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with psycopg.connect(DATABASE_URL) as conn:
+        generate_dataset(
+            conn,
+            users=args.users,
+            books=args.books,
+            reviews=args.reviews,
+            follows_per_user=args.follows_per_user,
+            days=args.days,
+            seed=args.seed,
+            timelines=args.timelines,
+            truncate=args.truncate,
+        )
+    print(f"done in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Schema migrations and seeding at startup.
+
+Every process (each uvicorn worker, each container) calls bootstrap() before
+serving. In the steady state that is one connection and one query: every file
+in app/database/schema is recorded in schema_migrations with the checksum it
+was applied with, and the seed has left its marker row. Only when something
+is missing does a process take the migrations advisory lock. It then applies
+new or changed files in name order, each in its own transaction with its
+bookkeeping row, and seeds. Processes that lose the race wait on the lock and
+find nothing left to do.
+
+The schema files are idempotent and edited in place, so a changed checksum
+means "re-apply", not an error.
+
+    python -m app.database.migrations    # what docker-entrypoint.sh runs before uvicorn
+"""
+import hashlib
+import time
+from pathlib import Path
+
+import psycopg
+from psycopg.rows import dict_row
+
+from app.database.core import DATABASE_URL
+
+SCHEMA_DIR = Path(__file__).parent / "schema"
+
+# Not a schema file: its row records that seed_data has run against this database
+SEED_MARKER = "seed"
+
+CREATE_MIGRATIONS_TABLE_SQL = """
+CREATE TABLE IF NOT EXISTS schema_migrations (
+    name TEXT PRIMARY KEY,
+    checksum TEXT NOT NULL,
+    applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+"""
+
+APPLIED_MIGRATIONS_SQL = "SELECT name, checksum FROM schema_migrations;"
+
+RECORD_MIGRATION_SQL = """
+INSERT INTO schema_migrations (name, checksum)
+VALUES (%(name)s, %(checksum)s)
+ON CONFLICT (name) DO UPDATE
+SET checksum = EXCLUDED.checksum,
+    applied_at = now();
+"""
+
+# Session-level lock shared by every process bootstrapping this database
+LOCK_SQL = "SELECT pg_advisory_lock(hashtext('goodreads.migrations'));"
+UNLOCK_SQL = "SELECT pg_advisory_unlock(hashtext('goodreads.migrations'));"
+
+_startup_stats: dict = {}
+
+
+def _checksum(path: Path) -> str:
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def _applied(conn) -> dict[str, str]:
+    try:
+        rows = conn.cursor(row_factory=dict_row).execute(APPLIED_MIGRATIONS_SQL).fetchall()
+        return {row["name"]: row["checksum"] for row in rows}
+    except psycopg.errors.UndefinedTable:
+        return {}
+
+
+def _pending(applied: dict[str, str], force: bool = False) -> list[Path]:
+    return [
+        path for path in sorted(SCHEMA_DIR.glob("*.sql"))
+        if force or applied.get(path.name) != _checksum(path)
+    ]
+
+
+def _apply(conn, paths: list[Path]) -> list[str]:
+    conn.execute(CREATE_MIGRATIONS_TABLE_SQL)
+    for path in paths:
+        with conn.transaction():
+            conn.execute(path.read_text())
+            conn.execute(RECORD_MIGRATION_SQL, {"name": path.name, "checksum": _checksum(path)})
+    return [path.name for path in paths]
+
+
+def migrate(conn, *, force: bool = False) -> list[str]:
+    """
+    Apply new or changed schema files under the advisory lock and return their
+    names. `conn` must be in autocommit mode. With `force`, every file is
+    re-applied, which re-runs their backfills over existing rows.
+    """
+    conn.execute(LOCK_SQL)
+    try:
+        return _apply(conn, _pending(_applied(conn), force))
+    finally:
+        conn.execute(UNLOCK_SQL)
+
+
+def bootstrap() -> dict:
+    """
+    Migrate and seed the database if needed, and return how long each step took.
+    """
+    started = time.perf_counter()
+    stats = {"migrations_applied": [], "seeded": False}
+    with psycopg.connect(DATABASE_URL, autocommit=True, row_factory=dict_row) as conn:
+        applied = _applied(conn)
+        if _pending(applied) or SEED_MARKER not in applied:
+            conn.execute(LOCK_SQL)
+            try:
+                # Another process may have finished while we waited for the lock
+                applied = _applied(conn)
+                stats["migrations_applied"] = _apply(conn, _pending(applied))
+                if SEED_MARKER not in applied:
+                    # Only needed on a fresh database, so imported here
+                    from app.database.seed import seed_data
+                    with conn.transaction():
+                        seed_data(conn)
+                        conn.execute(RECORD_MIGRATION_SQL, {"name": SEED_MARKER, "checksum": ""})
+                    stats["seeded"] = True
+            finally:
+                conn.execute(UNLOCK_SQL)
+    stats["bootstrap_s"] = round(time.perf_counter() - started, 4)
+    return stats
+
+
+def record_startup(stats: dict) -> None:
+    """Keep this process's startup timings for GET /health/startup and log them."""
+    _startup_stats.clear()
+    _startup_stats.update(stats)
+    print(f"ready in {stats['ready_s']}s: {stats}")
+
+
+def get_startup_stats() -> dict:
+    return dict(_startup_stats)
+
+
+if __name__ == "__main__":
+    print(bootstrap())
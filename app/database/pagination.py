@@ -0,0 +1,58 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, Response
+
+# ------------------------------
+# Keyset pagination helpers
+# ------------------------------
+# List endpoints take `limit` + an opaque `after` token and return the token
+# for the following page in the X-Next-Cursor response header. The token is
+# the sort key of the last row of the page (id, or (created_at, id)), so every
+# page is an index range scan starting right after it, whatever its depth.
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values) -> str:
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(token: str, *kinds: type) -> tuple:
+    """
+    Decode a token produced by encode_cursor, converting each value
+    to the matching type in `kinds` (int or datetime).
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(kinds):
+            raise ValueError(token)
+        return tuple(
+            datetime.fromisoformat(value) if kind is datetime else kind(value)
+            for kind, value in zip(kinds, values)
+        )
+    except (ValueError, TypeError, binascii.Error) as exc:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from exc
+
+
+def next_cursor(rows: list[dict], limit: int, *keys: str) -> str | None:
+    """
+    Cursor for the page after `rows`, or None when this was the last page.
+    """
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(*(last[key] for key in keys))
+
+
+def set_next_cursor(response: Response, rows: list[dict], limit: int, *keys: str) -> None:
+    cursor = next_cursor(rows, limit, *keys)
+    if cursor:
+        response.headers[NEXT_CURSOR_HEADER] = cursor
@@ -0,0 +1,75 @@
+import sys
+import time
+from contextlib import AsyncExitStack, ExitStack
+
+from psycopg import pq
+from psycopg.rows import dict_row
+
+from app.database.statements import execute, record_query, record_query_error
+
+# ------------------------------
+# Pipelined batches
+# ------------------------------
+# Without pipeline mode every statement waits for its reply, and a write on an
+# idle connection costs three round trips: BEGIN, the statement, COMMIT.
+# execute_pipelined sends a whole batch at once instead. On an idle connection
+# it runs in autocommit + pipeline mode, where Postgres treats everything up to
+# the Sync as one implicit transaction: the batch commits or rolls back as a
+# unit, in a single round trip. If a transaction is already open the batch
+# joins it and the COMMIT is queued behind it. A batch is timed as one query,
+# labelled with the function that sent it.
+
+
+def _is_idle(conn) -> bool:
+    return conn.info.transaction_status == pq.TransactionStatus.IDLE
+
+
+def execute_pipelined(conn, statements: list[tuple[str, dict | None]]) -> list[list[dict]]:
+    """
+    Run (sql, params) pairs as one committed batch and return each one's rows
+    ([] for statements without a result). The first failing statement raises
+    and nothing is committed.
+    """
+    name = sys._getframe(1).f_code.co_name
+    started = time.perf_counter()
+    idle = _is_idle(conn)
+    try:
+        with ExitStack() as stack:
+            cursors = [stack.enter_context(conn.cursor(row_factory=dict_row)) for _ in statements]
+            if idle:
+                conn.autocommit = True
+                stack.callback(setattr, conn, "autocommit", False)
+            with conn.pipeline():
+                for cur, (sql, params) in zip(cursors, statements):
+                    execute(cur, sql, params)
+                if not idle:
+                    conn.commit()
+            results = [cur.fetchall() if cur.description else [] for cur in cursors]
+    except Exception:
+        record_query_error(name)
+        raise
+    record_query(name, started, sum(len(rows) for rows in results), [params for _, params in statements])
+    return results
+
+
+async def execute_pipelined_async(conn, statements: list[tuple[str, dict | None]]) -> list[list[dict]]:
+    name = sys._getframe(1).f_code.co_name
+    started = time.perf_counter()
+    idle = _is_idle(conn)
+    try:
+        async with AsyncExitStack() as stack:
+            cursors = [await stack.enter_async_context(conn.cursor(row_factory=dict_row)) for _ in statements]
+            if idle:
+                await conn.set_autocommit(True)
+                stack.push_async_callback(conn.set_autocommit, False)
+            async with conn.pipeline():
+                for cur, (sql, params) in zip(cursors, statements):
+                    await execute(cur, sql, params)
+                if not idle:
+                    await conn.commit()
+            results = [await cur.fetchall() if cur.description else [] for cur in cursors]
+    except Exception:
+        record_query_error(name)
+        raise
+    record_query(name, started, sum(len(rows) for rows in results), [params for _, params in statements])
+    return results
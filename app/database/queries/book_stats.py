@@ -0,0 +1,110 @@
+from psycopg.rows import dict_row
+
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.statements import execute, register
+
+# ------------------------------
+# Book rating aggregates
+# ------------------------------
+# book_stats keeps a count, a rating sum and a per-star histogram per book.
+# INSERT_REVIEW_SQL bumps it in the same statement as the review insert; the
+# helper below does the same for writers that COPY reviews in directly. Like
+# the timeline helpers it doesn't commit.
+
+ADD_REVIEWS_TO_BOOK_STATS_SQL = """
+INSERT INTO book_stats (book_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT book_id,
+       COUNT(*),
+       COALESCE(SUM(rating), 0),
+       COUNT(*) FILTER (WHERE rating = 1),
+       COUNT(*) FILTER (WHERE rating = 2),
+       COUNT(*) FILTER (WHERE rating = 3),
+       COUNT(*) FILTER (WHERE rating = 4),
+       COUNT(*) FILTER (WHERE rating = 5)
+FROM reviews
+WHERE id = ANY(%(review_ids)s)
+GROUP BY book_id
+ON CONFLICT (book_id) DO UPDATE SET
+    review_count = book_stats.review_count + EXCLUDED.review_count,
+    rating_sum = book_stats.rating_sum + EXCLUDED.rating_sum,
+    rating_1 = book_stats.rating_1 + EXCLUDED.rating_1,
+    rating_2 = book_stats.rating_2 + EXCLUDED.rating_2,
+    rating_3 = book_stats.rating_3 + EXCLUDED.rating_3,
+    rating_4 = book_stats.rating_4 + EXCLUDED.rating_4,
+    rating_5 = book_stats.rating_5 + EXCLUDED.rating_5;
+"""
+
+
+def add_reviews_to_book_stats(conn, *, review_ids: list[int]) -> None:
+    """
+    Fold already-inserted reviews into their books' aggregates, in one statement.
+    """
+    with conn.cursor() as cur:
+        cur.execute(ADD_REVIEWS_TO_BOOK_STATS_SQL, {"review_ids": review_ids})
+
+
+GET_BOOK_STATS_SQL = """
+SELECT book_id,
+       review_count,
+       average_rating,
+       json_build_object('1', rating_1, '2', rating_2, '3', rating_3, '4', rating_4, '5', rating_5) AS ratings
+FROM book_stats
+WHERE book_id = %(book_id)s;
+"""
+register("get_book_stats", GET_BOOK_STATS_SQL, warm={"book_id": 0})
+
+
+def get_book_stats(conn, *, book_id: int) -> dict | None:
+    """
+    The book's aggregate, or None if it has no reviews yet.
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, GET_BOOK_STATS_SQL, {"book_id": book_id})
+        return cur.fetchone()
+
+
+# Range scan of idx_book_stats_top_rated; the keyset is (average_rating, review_count, id)
+LIST_TOP_RATED_SQL = """
+SELECT b.id, b.title, b.author, b.created_at, s.review_count, s.average_rating
+FROM book_stats s
+JOIN books b ON b.id = s.book_id
+WHERE s.average_rating IS NOT NULL
+  AND s.review_count >= %(min_reviews)s
+ORDER BY s.average_rating DESC, s.review_count DESC, s.book_id DESC
+LIMIT %(limit)s;
+"""
+register("list_top_rated", LIST_TOP_RATED_SQL, warm={"min_reviews": 0, "limit": 0})
+
+LIST_TOP_RATED_AFTER_SQL = """
+SELECT b.id, b.title, b.author, b.created_at, s.review_count, s.average_rating
+FROM book_stats s
+JOIN books b ON b.id = s.book_id
+WHERE s.average_rating IS NOT NULL
+  AND s.review_count >= %(min_reviews)s
+  AND (s.average_rating, s.review_count, s.book_id) < (%(after_rating)s, %(after_count)s, %(after_id)s)
+ORDER BY s.average_rating DESC, s.review_count DESC, s.book_id DESC
+LIMIT %(limit)s;
+"""
+register("list_top_rated_after", LIST_TOP_RATED_AFTER_SQL, warm={
+    "min_reviews": 0,
+    "limit": 0,
+    "after_rating": 0.0,
+    "after_count": 0,
+    "after_id": 0,
+})
+
+
+def list_top_rated(
+        conn, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        min_reviews: int = 1,
+        after: tuple[float, int, int] | None = None
+) -> list[dict]:
+    params = {"limit": limit, "min_reviews": min_reviews}
+    with conn.cursor(row_factory=dict_row) as cur:
+        if after is None:
+            execute(cur, LIST_TOP_RATED_SQL, params)
+        else:
+            params["after_rating"], params["after_count"], params["after_id"] = after
+            execute(cur, LIST_TOP_RATED_AFTER_SQL, params)
+        return cur.fetchall()
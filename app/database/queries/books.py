@@ -1,36 +1,145 @@
-from fastapi import HTTPException
+from typing import Iterator
+
 from psycopg.rows import dict_row
 
+from app.database.cache import MISSING, books_cache
+from app.database.core import STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined
+from app.database.statements import execute, register
+
+
+GET_BOOK_SQL = """
+SELECT id, title, author, created_at
+FROM books
+WHERE id = %(book_id)s;
+"""
+register("get_book", GET_BOOK_SQL, warm={"book_id": 0})
+
 
 def get_book(conn, *, book_id: int) -> dict | None:
-    sql = """
-    SELECT id, title, author, created_at
-    FROM books
-    WHERE id = %(book_id)s;
-    """
+    book = books_cache.get(book_id)
+    if book is not MISSING:
+        return book
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"book_id": book_id})
-        return cur.fetchone()
+        execute(cur, GET_BOOK_SQL, {"book_id": book_id})
+        book = cur.fetchone()
+    books_cache.set(book_id, book)
+    return book
+
 
+GET_BOOKS_SQL = """
+SELECT id, title, author, created_at
+FROM books
+WHERE id = ANY(%(book_ids)s);
+"""
+register("get_books", GET_BOOKS_SQL)
 
-def list_books(conn) -> list[dict]:
-    sql = """
-    SELECT id, title, author, created_at
-    FROM books
-    ORDER BY id;
+
+def get_books(conn, *, book_ids: list[int]) -> list[dict]:
+    """
+    The books of `book_ids` in that order, skipping unknown ids. Only the ones
+    not cached are read, with one query.
     """
+    found, missing = books_cache.get_many(book_ids)
+    if missing:
+        with conn.cursor(row_factory=dict_row) as cur:
+            execute(cur, GET_BOOKS_SQL, {"book_ids": missing})
+            books_cache.fill(found, missing, cur.fetchall())
+    return [found[book_id] for book_id in book_ids if book_id in found]
+
+
+LIST_BOOKS_SQL = """
+SELECT id, title, author, created_at
+FROM books
+ORDER BY id
+LIMIT %(limit)s;
+"""
+register("list_books", LIST_BOOKS_SQL, warm={"limit": 0})
+
+LIST_BOOKS_AFTER_SQL = """
+SELECT id, title, author, created_at
+FROM books
+WHERE id > %(after_id)s
+ORDER BY id
+LIMIT %(limit)s;
+"""
+register("list_books_after", LIST_BOOKS_AFTER_SQL, warm={"limit": 0, "after_id": 0})
+
+
+def list_books(conn, *, limit: int = DEFAULT_PAGE_SIZE, after_id: int | None = None) -> list[dict]:
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql)
+        if after_id is None:
+            execute(cur, LIST_BOOKS_SQL, {"limit": limit})
+        else:
+            execute(cur, LIST_BOOKS_AFTER_SQL, {"limit": limit, "after_id": after_id})
         return cur.fetchall()
 
 
+def iter_books(conn, *, after_id: int | None = None, itersize: int = STREAM_ITERSIZE) -> Iterator[dict]:
+    """
+    Every book (after `after_id`) through a server-side cursor, `itersize` rows
+    per round trip, for NDJSON exports. LIMIT NULL means no limit.
+    """
+    with conn.cursor("export_books", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after_id is None:
+            cur.execute(LIST_BOOKS_SQL, {"limit": None})
+        else:
+            cur.execute(LIST_BOOKS_AFTER_SQL, {"limit": None, "after_id": after_id})
+        yield from cur
+
+
+INSERT_BOOK_SQL = """
+INSERT INTO books (title, author)
+VALUES (%(title)s, %(author)s)
+RETURNING id, title, author, created_at;
+"""
+register("insert_book", INSERT_BOOK_SQL)
+
+
 def insert_book(conn, *, title: str, author: str) -> dict:
-    sql = """
-    INSERT INTO books (title, author)
-    VALUES (%(title)s, %(author)s)
-    RETURNING id, title, author, created_at;
+    [[book]] = execute_pipelined(conn, [(INSERT_BOOK_SQL, {"title": title, "author": author})])
+    books_cache.set(book["id"], book)
+    return book
+
+
+# ------------------------------
+# Bulk ingest
+# ------------------------------
+RESERVE_BOOK_IDS_SQL = """
+SELECT nextval(pg_get_serial_sequence('books', 'id')) AS id
+FROM generate_series(1, %(count)s);
+"""
+
+COPY_BOOKS_SQL = "COPY books (id, title, author) FROM STDIN"
+
+
+def copy_books(conn, *, books: list[tuple[str, str]]) -> list[int]:
+    """
+    Load (title, author) rows with COPY in one transaction; returns ids in input order.
     """
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"title": title, "author": author})
+        cur.execute(RESERVE_BOOK_IDS_SQL, {"count": len(books)})
+        ids = [row["id"] for row in cur.fetchall()]
+        with cur.copy(COPY_BOOKS_SQL) as copy:
+            for book_id, (title, author) in zip(ids, books):
+                copy.write_row((book_id, title, author))
         conn.commit()
-        return cur.fetchone()
+    for book_id in ids:
+        books_cache.invalidate(book_id)
+    return ids
+
+
+EXISTING_BOOK_IDS_SQL = """
+SELECT id
+FROM books
+WHERE id = ANY(%(ids)s);
+"""
+register("existing_book_ids", EXISTING_BOOK_IDS_SQL)
+
+
+def existing_book_ids(conn, *, ids: list[int]) -> set[int]:
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, EXISTING_BOOK_IDS_SQL, {"ids": ids})
+        return {row["id"] for row in cur.fetchall()}
@@ -1,48 +1,239 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from fastapi import HTTPException
 from psycopg.rows import dict_row
 
-from app.database.queries.validations import ensure_user_exists
+from app.database.core import FEED_FANOUT_MAX_FOLLOWERS, FEED_BACKFILL_SIZE, FEED_STRATEGY, pool
+from app.database.follow_graph import FollowGraph, follow_graph
+from app.database.id_pairs import load_id_pairs
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined
+from app.database.queries.validations import constraint_errors_as_400
+from app.database.statements import execute, register
 
+# Sort key above any real (created_at, id); used as the cursor of the first feed page
+FEED_HEAD = (datetime.max.replace(tzinfo=timezone.utc), 2 ** 63 - 1)
+
+_WARM_FEED = {
+    "user_id": 0,
+    "limit": 0,
+    "after_created_at": FEED_HEAD[0],
+    "after_id": FEED_HEAD[1],
+    "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+}
 
-def follow_user(conn, *, follower_id: int, followee_id: int) -> dict | None:
-    # Validate users first
-    ensure_user_exists(conn, follower_id)
-    ensure_user_exists(conn, followee_id)
 
-    sql = """
+# Follow and unfollow are single statements: the edge, the followee's
+# follower_count and the follower's timeline change together in one round trip.
+# Both set the followee's fanout_on_read once they count more followers than
+# the fan-out threshold (before an unfollow, after a follow), so an author
+# dropping back under it stays merged on read: their reviews from above it
+# were never pushed.
+# Unknown users and self-follows are rejected by the schema's constraints.
+FOLLOW_USER_SQL = """
+WITH new_follow AS (
     INSERT INTO followers (follower_id, followee_id)
     VALUES (%(follower_id)s, %(followee_id)s)
     ON CONFLICT DO NOTHING
-    RETURNING follower_id, followee_id, created_at;
-    """
-    with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"follower_id": follower_id, "followee_id": followee_id})
-        conn.commit()
-        return cur.fetchone()
+    RETURNING follower_id, followee_id, created_at
+), followee AS (
+    UPDATE users
+    SET follower_count = follower_count + 1,
+        fanout_on_read = fanout_on_read OR follower_count + 1 > %(fanout_max_followers)s
+    FROM new_follow
+    WHERE users.id = new_follow.followee_id
+    RETURNING users.id, users.fanout_on_read
+), backfill AS (
+    INSERT INTO timelines (user_id, review_id, author_id, created_at)
+    SELECT nf.follower_id, r.id, r.user_id, r.created_at
+    FROM new_follow nf
+    JOIN followee u ON u.id = nf.followee_id
+    CROSS JOIN LATERAL (
+        SELECT id, user_id, created_at
+        FROM reviews
+        WHERE user_id = nf.followee_id
+        ORDER BY created_at DESC, id DESC
+        LIMIT %(backfill_size)s
+    ) r
+    WHERE NOT u.fanout_on_read
+    ON CONFLICT DO NOTHING
+)
+SELECT follower_id, followee_id, created_at
+FROM new_follow;
+"""
+register("follow_user", FOLLOW_USER_SQL)
 
 
-def unfollow_user(conn, *, follower_id: int, followee_id: int) -> None:
-    sql = """
+def follow_user(conn, *, follower_id: int, followee_id: int) -> dict | None:
+    params = {
+        "follower_id": follower_id,
+        "followee_id": followee_id,
+        "backfill_size": FEED_BACKFILL_SIZE,
+        "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+    }
+    with constraint_errors_as_400(conn, params):
+        [follows] = execute_pipelined(conn, [(FOLLOW_USER_SQL, params)])
+    follow_graph.follow(follower_id, followee_id)
+    # Empty when the edge already existed
+    return follows[0] if follows else None
+
+
+UNFOLLOW_USER_SQL = """
+WITH removed AS (
     DELETE FROM followers
     WHERE follower_id = %(follower_id)s
-      AND followee_id = %(followee_id)s;
+      AND followee_id = %(followee_id)s
+    RETURNING follower_id, followee_id
+), followee AS (
+    UPDATE users
+    SET follower_count = follower_count - 1,
+        fanout_on_read = fanout_on_read OR follower_count > %(fanout_max_followers)s
+    FROM removed
+    WHERE users.id = removed.followee_id
+)
+DELETE FROM timelines t
+USING removed
+WHERE t.user_id = removed.follower_id
+  AND t.author_id = removed.followee_id;
+"""
+register("unfollow_user", UNFOLLOW_USER_SQL)
+
+
+def unfollow_user(conn, *, follower_id: int, followee_id: int) -> None:
+    params = {"follower_id": follower_id, "followee_id": followee_id, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}
+    execute_pipelined(conn, [(UNFOLLOW_USER_SQL, params)])
+    follow_graph.unfollow(follower_id, followee_id)
+
+
+# ------------------------------
+# Follow graph
+# ------------------------------
+# Follower lists, counts, follow checks and suggestions are answered by the
+# in-process graph (app/database/follow_graph.py), loaded with one bulk read
+# at startup and reloaded in the background, each time on a pooled connection.
+FOLLOWS_SQL = "SELECT follower_id, followee_id FROM followers"
+
+
+def load_follows(conn) -> tuple[np.ndarray, np.ndarray]:
+    return load_id_pairs(conn, FOLLOWS_SQL)
+
+
+def _load_pooled_follows() -> tuple[np.ndarray, np.ndarray]:
+    with pool.connection() as conn:
+        return load_follows(conn)
+
+
+def start_follow_graph() -> None:
+    """
+    Loads the graph, then keeps reloading it every FOLLOW_GRAPH_MAX_AGE
+    seconds. Call once the pool is open.
     """
-    with conn.cursor() as cur:
-        cur.execute(sql, {"follower_id": follower_id, "followee_id": followee_id})
-        conn.commit()
+    follow_graph.start(_load_pooled_follows)
 
 
-def get_newsfeed(conn, *, user_id: int) -> list[dict]:
-    sql = """
-    SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at
-    FROM reviews r
-    JOIN followers f ON r.user_id = f.followee_id
-    WHERE f.follower_id = %(user_id)s
-    UNION
-    SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at
-    FROM reviews r
-    WHERE r.user_id = %(user_id)s
-    ORDER BY created_at DESC;
+def stop_follow_graph() -> None:
+    follow_graph.stop()
+
+
+def get_follow_graph() -> FollowGraph:
     """
+    The current snapshot; never loads. 503 before the first load is done.
+    """
+    if not follow_graph.loaded:
+        raise HTTPException(status_code=503, detail="Follow graph is loading")
+    return follow_graph
+
+
+# Materialized timeline, plus fan-out-on-read for followees who are or were
+# above the fan-out threshold (their reviews are not pushed). UNION drops
+# reviews present in both, e.g. pushed before the author crossed the threshold.
+GET_NEWSFEED_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM (
+    (
+        SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at
+        FROM timelines t
+        JOIN reviews r ON r.id = t.review_id
+        WHERE t.user_id = %(user_id)s
+          AND (t.created_at, t.review_id) < (%(after_created_at)s, %(after_id)s)
+        ORDER BY t.created_at DESC, t.review_id DESC
+        LIMIT %(limit)s
+    )
+    UNION
+    (
+        SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at
+        FROM followers f
+        JOIN users u ON u.id = f.followee_id
+        CROSS JOIN LATERAL (
+            SELECT id, user_id, book_id, rating, content, created_at
+            FROM reviews
+            WHERE user_id = f.followee_id
+              AND (created_at, id) < (%(after_created_at)s, %(after_id)s)
+            ORDER BY created_at DESC, id DESC
+            LIMIT %(limit)s
+        ) r
+        WHERE f.follower_id = %(user_id)s
+          AND (u.fanout_on_read OR u.follower_count > %(fanout_max_followers)s)
+    )
+) feed
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("get_newsfeed", GET_NEWSFEED_SQL, warm=_WARM_FEED)
+
+# Fan-out-on-read: a bounded k-way merge. Each followee (and the reader) contributes
+# at most `limit` reviews from a backward range scan of idx_reviews_user_created_id,
+# so the final sort sees at most (followees + 1) * limit rows, whatever the history size.
+# EXPLAIN ANALYZE (400k reviews, 400k follows, reader with 39 followees, 3ms):
+#
+#   Limit
+#     -> Sort (top-N heapsort)
+#          -> Nested Loop
+#               -> Append
+#                    -> Index Only Scan using uq_follow on followers f
+#                    -> Result
+#               -> Limit (per author)
+#                    -> Index / Bitmap Index Scan on idx_reviews_user_created_id
+#
+# Followees are distinct and nobody follows themselves, so no dedup step is needed.
+GET_NEWSFEED_MERGE_SQL = """
+SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at
+FROM (
+    SELECT f.followee_id AS author_id
+    FROM followers f
+    WHERE f.follower_id = %(user_id)s
+    UNION ALL
+    SELECT %(user_id)s
+) authors
+CROSS JOIN LATERAL (
+    SELECT id, user_id, book_id, rating, content, created_at
+    FROM reviews
+    WHERE user_id = authors.author_id
+      AND (created_at, id) < (%(after_created_at)s, %(after_id)s)
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(limit)s
+) r
+ORDER BY r.created_at DESC, r.id DESC
+LIMIT %(limit)s;
+"""
+register("get_newsfeed_merge", GET_NEWSFEED_MERGE_SQL, warm=_WARM_FEED)
+
+
+def get_newsfeed(
+        conn, *,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    after_created_at, after_id = after or FEED_HEAD
+    sql = GET_NEWSFEED_MERGE_SQL if FEED_STRATEGY == "merge" else GET_NEWSFEED_SQL
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"user_id": user_id})
+        execute(cur, sql, {
+            "user_id": user_id,
+            "limit": limit,
+            "after_created_at": after_created_at,
+            "after_id": after_id,
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        })
         return cur.fetchall()
@@ -0,0 +1,63 @@
+from psycopg.rows import dict_row
+
+from app.database.statements import execute, register
+
+# A review at or above this rating counts as the reader liking the book
+LIKED_RATING = 4
+# A reader's recommendations start from this many of their latest liked books
+RECOMMENDATION_HISTORY = 50
+
+GET_SIMILAR_BOOKS_SQL = """
+SELECT b.id, b.title, b.author, b.created_at, r.score, r.common_readers
+FROM book_recommendations r
+JOIN books b ON b.id = r.similar_book_id
+WHERE r.book_id = %(book_id)s
+ORDER BY r.rank
+LIMIT %(limit)s;
+"""
+register("get_similar_books", GET_SIMILAR_BOOKS_SQL, warm={"book_id": 0, "limit": 0})
+
+
+def get_similar_books(conn, *, book_id: int, limit: int) -> list[dict]:
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, GET_SIMILAR_BOOKS_SQL, {"book_id": book_id, "limit": limit})
+        return cur.fetchall()
+
+
+# The neighbours of the reader's latest liked books, scored by their summed
+# similarity, minus the books the reader has already reviewed
+GET_USER_RECOMMENDATIONS_SQL = """
+WITH liked AS (
+    SELECT book_id
+    FROM reviews
+    WHERE user_id = %(user_id)s AND rating >= %(liked_rating)s
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(history)s
+)
+SELECT b.id, b.title, b.author, b.created_at, s.score
+FROM (
+    SELECT r.similar_book_id, sum(r.score) AS score
+    FROM liked
+    JOIN book_recommendations r ON r.book_id = liked.book_id
+    WHERE NOT EXISTS (
+        SELECT 1 FROM reviews seen WHERE seen.user_id = %(user_id)s AND seen.book_id = r.similar_book_id
+    )
+    GROUP BY r.similar_book_id
+    ORDER BY score DESC, r.similar_book_id
+    LIMIT %(limit)s
+) s
+JOIN books b ON b.id = s.similar_book_id
+ORDER BY s.score DESC, b.id;
+"""
+register(
+    "get_user_recommendations",
+    GET_USER_RECOMMENDATIONS_SQL,
+    warm={"user_id": 0, "liked_rating": LIKED_RATING, "history": 0, "limit": 0},
+)
+
+
+def get_user_recommendations(conn, *, user_id: int, limit: int) -> list[dict]:
+    params = {"user_id": user_id, "liked_rating": LIKED_RATING, "history": RECOMMENDATION_HISTORY, "limit": limit}
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, GET_USER_RECOMMENDATIONS_SQL, params)
+        return cur.fetchall()
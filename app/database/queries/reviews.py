@@ -1,52 +1,239 @@
+from datetime import datetime
+from typing import Iterator
+
 from psycopg.rows import dict_row
 
-def insert_review(conn, *, user_id: int, book_id: int, rating: int, content: str) -> dict:
-    sql = """
+from app.database.core import FEED_FANOUT_MAX_FOLLOWERS, STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined
+from app.database.queries.book_stats import ADD_REVIEWS_TO_BOOK_STATS_SQL
+from app.database.queries.books import EXISTING_BOOK_IDS_SQL
+from app.database.queries.timelines import FAN_OUT_REVIEW_SQL
+from app.database.queries.users import EXISTING_USER_IDS_SQL
+from app.database.queries.validations import constraint_errors_as_400
+from app.database.statements import WARM_TIMESTAMP, execute, register
+
+# One round trip: the insert, the timeline fan-out and the book's rating
+# aggregate run as a single statement.
+# Unknown user/book ids and bad ratings are rejected by the schema's constraints.
+INSERT_REVIEW_SQL = """
+WITH new_review AS (
     INSERT INTO reviews (user_id, book_id, rating, content)
     VALUES (%(user_id)s, %(book_id)s, %(rating)s, %(content)s)
-    RETURNING id, user_id, book_id, rating, content, created_at;
-    """
-    with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {
-            "user_id": user_id,
-            "book_id": book_id,
-            "rating": rating,
-            "content": content
-        })
-        conn.commit()
-        return cur.fetchone()
+    RETURNING id, user_id, book_id, rating, content, created_at
+), fan_out AS (
+    INSERT INTO timelines (user_id, review_id, author_id, created_at)
+    SELECT r.user_id, r.id, r.user_id, r.created_at
+    FROM new_review r
+    UNION ALL
+    SELECT f.follower_id, r.id, r.user_id, r.created_at
+    FROM new_review r
+    JOIN users u ON u.id = r.user_id
+    JOIN followers f ON f.followee_id = r.user_id
+    WHERE NOT u.fanout_on_read
+      AND u.follower_count <= %(fanout_max_followers)s
+), stats AS (
+    INSERT INTO book_stats (book_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+    SELECT book_id,
+           1,
+           COALESCE(rating, 0),
+           COALESCE((rating = 1)::int, 0),
+           COALESCE((rating = 2)::int, 0),
+           COALESCE((rating = 3)::int, 0),
+           COALESCE((rating = 4)::int, 0),
+           COALESCE((rating = 5)::int, 0)
+    FROM new_review
+    ON CONFLICT (book_id) DO UPDATE SET
+        review_count = book_stats.review_count + 1,
+        rating_sum = book_stats.rating_sum + EXCLUDED.rating_sum,
+        rating_1 = book_stats.rating_1 + EXCLUDED.rating_1,
+        rating_2 = book_stats.rating_2 + EXCLUDED.rating_2,
+        rating_3 = book_stats.rating_3 + EXCLUDED.rating_3,
+        rating_4 = book_stats.rating_4 + EXCLUDED.rating_4,
+        rating_5 = book_stats.rating_5 + EXCLUDED.rating_5
+)
+SELECT id, user_id, book_id, rating, content, created_at
+FROM new_review;
+"""
+register("insert_review", INSERT_REVIEW_SQL)
+
+
+def insert_review(conn, *, user_id: int, book_id: int, rating: int, content: str) -> dict:
+    params = {
+        "user_id": user_id,
+        "book_id": book_id,
+        "rating": rating,
+        "content": content,
+        "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+    }
+    with constraint_errors_as_400(conn, params):
+        [[review]] = execute_pipelined(conn, [(INSERT_REVIEW_SQL, params)])
+    return review
+
+
+GET_REVIEW_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM reviews
+WHERE id = %(review_id)s;
+"""
+register("get_review", GET_REVIEW_SQL, warm={"review_id": 0})
 
 
 def get_review(conn, *, review_id: int) -> dict | None:
-    sql = """
-    SELECT id, user_id, book_id, rating, content, created_at
-    FROM reviews
-    WHERE id = %(review_id)s;
-    """
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"review_id": review_id})
+        execute(cur, GET_REVIEW_SQL, {"review_id": review_id})
         return cur.fetchone()
 
 
-def list_reviews_by_user(conn, *, user_id: int) -> list[dict]:
-    sql = """
-    SELECT id, user_id, book_id, rating, content, created_at
-    FROM reviews
-    WHERE user_id = %(user_id)s
-    ORDER BY created_at DESC;
-    """
+LIST_REVIEWS_BY_USER_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM reviews
+WHERE user_id = %(user_id)s
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("list_reviews_by_user", LIST_REVIEWS_BY_USER_SQL, warm={"user_id": 0, "limit": 0})
+
+LIST_REVIEWS_BY_USER_AFTER_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM reviews
+WHERE user_id = %(user_id)s
+  AND (created_at, id) < (%(after_created_at)s, %(after_id)s)
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("list_reviews_by_user_after", LIST_REVIEWS_BY_USER_AFTER_SQL, warm={"user_id": 0, "limit": 0, "after_created_at": WARM_TIMESTAMP, "after_id": 0})
+
+
+def list_reviews_by_user(
+        conn, *,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    params = {"user_id": user_id, "limit": limit}
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"user_id": user_id})
+        if after is None:
+            execute(cur, LIST_REVIEWS_BY_USER_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            execute(cur, LIST_REVIEWS_BY_USER_AFTER_SQL, params)
         return cur.fetchall()
 
 
-def list_reviews_by_book(conn, *, book_id: int) -> list[dict]:
-    sql = """
-    SELECT id, user_id, book_id, rating, content, created_at
-    FROM reviews
-    WHERE book_id = %(book_id)s
-    ORDER BY created_at DESC;
+def iter_reviews_by_user(
+        conn, *,
+        user_id: int,
+        after: tuple[datetime, int] | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> Iterator[dict]:
+    """
+    Every review of the user (after `after`) through a server-side cursor, for NDJSON exports.
     """
+    params = {"user_id": user_id, "limit": None}
+    with conn.cursor("export_reviews_by_user", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after is None:
+            cur.execute(LIST_REVIEWS_BY_USER_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            cur.execute(LIST_REVIEWS_BY_USER_AFTER_SQL, params)
+        yield from cur
+
+
+LIST_REVIEWS_BY_BOOK_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM reviews
+WHERE book_id = %(book_id)s
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("list_reviews_by_book", LIST_REVIEWS_BY_BOOK_SQL, warm={"book_id": 0, "limit": 0})
+
+LIST_REVIEWS_BY_BOOK_AFTER_SQL = """
+SELECT id, user_id, book_id, rating, content, created_at
+FROM reviews
+WHERE book_id = %(book_id)s
+  AND (created_at, id) < (%(after_created_at)s, %(after_id)s)
+ORDER BY created_at DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("list_reviews_by_book_after", LIST_REVIEWS_BY_BOOK_AFTER_SQL, warm={"book_id": 0, "limit": 0, "after_created_at": WARM_TIMESTAMP, "after_id": 0})
+
+
+def list_reviews_by_book(
+        conn, *,
+        book_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    params = {"book_id": book_id, "limit": limit}
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"book_id": book_id})
+        if after is None:
+            execute(cur, LIST_REVIEWS_BY_BOOK_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            execute(cur, LIST_REVIEWS_BY_BOOK_AFTER_SQL, params)
         return cur.fetchall()
+
+
+def iter_reviews_by_book(
+        conn, *,
+        book_id: int,
+        after: tuple[datetime, int] | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> Iterator[dict]:
+    """
+    Every review of the book (after `after`) through a server-side cursor, for NDJSON exports.
+    """
+    params = {"book_id": book_id, "limit": None}
+    with conn.cursor("export_reviews_by_book", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after is None:
+            cur.execute(LIST_REVIEWS_BY_BOOK_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            cur.execute(LIST_REVIEWS_BY_BOOK_AFTER_SQL, params)
+        yield from cur
+
+
+# ------------------------------
+# Bulk ingest
+# ------------------------------
+RESERVE_REVIEW_IDS_SQL = """
+SELECT nextval(pg_get_serial_sequence('reviews', 'id')) AS id
+FROM generate_series(1, %(count)s);
+"""
+
+COPY_REVIEWS_SQL = "COPY reviews (id, user_id, book_id, rating, content) FROM STDIN"
+
+
+def copy_reviews(conn, *, reviews: list[tuple[int, int, int, str]]) -> list[int]:
+    """
+    Load (user_id, book_id, rating, content) rows with COPY, fan them out to
+    timelines and fold them into book_stats, in one transaction; returns ids
+    in input order.
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
+        cur.execute(RESERVE_REVIEW_IDS_SQL, {"count": len(reviews)})
+        ids = [row["id"] for row in cur.fetchall()]
+        with cur.copy(COPY_REVIEWS_SQL) as copy:
+            for review_id, review in zip(ids, reviews):
+                copy.write_row((review_id, *review))
+    # The fan-out, the aggregates and the COMMIT go out in one round trip
+    execute_pipelined(conn, [
+        (FAN_OUT_REVIEW_SQL, {"review_ids": ids, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}),
+        (ADD_REVIEWS_TO_BOOK_STATS_SQL, {"review_ids": ids}),
+    ])
+    return ids
+
+
+def existing_review_refs(conn, *, user_ids: list[int], book_ids: list[int]) -> tuple[set[int], set[int]]:
+    """
+    Which of the user and book ids exist, both looked up in one round trip.
+    """
+    users, books = execute_pipelined(conn, [
+        (EXISTING_USER_IDS_SQL, {"ids": user_ids}),
+        (EXISTING_BOOK_IDS_SQL, {"ids": book_ids}),
+    ])
+    return {row["id"] for row in users}, {row["id"] for row in books}
@@ -0,0 +1,99 @@
+from psycopg.rows import dict_row
+
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.statements import execute, register
+
+# ------------------------------
+# Full-text search
+# ------------------------------
+# Matches come from the GIN indexes on the generated search_vector columns
+# (and, with pg_trgm, the trigram index on books.author), so their cost
+# depends on how many rows match, not on the size of the table. Every match is
+# ranked, then the page is the best `limit` of those after the keyset cursor
+# (rank, id). Snippets are only built for the rows of the page: Postgres
+# evaluates ts_headline, an expensive function, after the LIMIT.
+#
+# Queries use web search syntax: words, "quoted phrases", OR, -excluded.
+
+# Highlighted terms in snippets
+HIGHLIGHT = "StartSel=<mark>, StopSel=</mark>"
+# Sorts before every rank: the cursor of the first page. Ranks are float8, whose
+# text form round-trips exactly through the cursor; ts_rank's float4 doesn't.
+FIRST_PAGE = (float("inf"), 2 ** 63 - 1)
+
+SEARCH_BOOKS_SQL = f"""
+SELECT id, title, author, created_at, rank,
+       ts_headline('english', title, query, 'HighlightAll=true, {HIGHLIGHT}') AS snippet
+FROM (
+    SELECT b.id, b.title, b.author, b.created_at, q.query, ts_rank(b.search_vector, q.query)::float8 AS rank
+    FROM books b, websearch_to_tsquery('english', %(q)s) AS q(query)
+    WHERE b.search_vector @@ q.query
+) matches
+WHERE (rank, id) < (%(after_rank)s, %(after_id)s)
+ORDER BY rank DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("search_books", SEARCH_BOOKS_SQL, warm={"q": "warm", "limit": 0, "after_rank": 0.0, "after_id": 0})
+
+# With pg_trgm: also authors that contain a close match of the query
+# ("tolkein" finds "J.R.R. Tolkien"), ranked by how close it is. Not warmed:
+# it can't be prepared on databases without pg_trgm.
+SEARCH_BOOKS_FUZZY_SQL = f"""
+SELECT id, title, author, created_at, rank,
+       ts_headline('english', title, query, 'HighlightAll=true, {HIGHLIGHT}') AS snippet
+FROM (
+    SELECT b.id, b.title, b.author, b.created_at, q.query,
+           (ts_rank(b.search_vector, q.query) + word_similarity(%(q)s, b.author))::float8 AS rank
+    FROM books b, websearch_to_tsquery('english', %(q)s) AS q(query)
+    WHERE b.search_vector @@ q.query OR %(q)s <%% b.author
+) matches
+WHERE (rank, id) < (%(after_rank)s, %(after_id)s)
+ORDER BY rank DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("search_books_fuzzy", SEARCH_BOOKS_FUZZY_SQL)
+
+SEARCH_REVIEWS_SQL = f"""
+SELECT id, user_id, book_id, rating, content, created_at, rank,
+       ts_headline('english', content, query, 'MaxFragments=2, MinWords=10, MaxWords=30, {HIGHLIGHT}') AS snippet
+FROM (
+    SELECT r.id, r.user_id, r.book_id, r.rating, r.content, r.created_at, q.query,
+           ts_rank(r.search_vector, q.query)::float8 AS rank
+    FROM reviews r, websearch_to_tsquery('english', %(q)s) AS q(query)
+    WHERE r.search_vector @@ q.query
+) matches
+WHERE (rank, id) < (%(after_rank)s, %(after_id)s)
+ORDER BY rank DESC, id DESC
+LIMIT %(limit)s;
+"""
+register("search_reviews", SEARCH_REVIEWS_SQL, warm={"q": "warm", "limit": 0, "after_rank": 0.0, "after_id": 0})
+
+HAS_TRIGRAM_SQL = "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm') AS installed;"
+
+# Whether the database has pg_trgm, looked up on the first book search
+_trigram: bool | None = None
+
+
+def has_trigram(conn) -> bool:
+    global _trigram
+    if _trigram is None:
+        _trigram = conn.execute(HAS_TRIGRAM_SQL).fetchone()["installed"]
+    return _trigram
+
+
+def search_params(q: str, limit: int, after: tuple[float, int] | None) -> dict:
+    after_rank, after_id = after or FIRST_PAGE
+    return {"q": q, "limit": limit, "after_rank": after_rank, "after_id": after_id}
+
+
+def search_books(conn, *, q: str, limit: int = DEFAULT_PAGE_SIZE, after: tuple[float, int] | None = None) -> list[dict]:
+    sql = SEARCH_BOOKS_FUZZY_SQL if has_trigram(conn) else SEARCH_BOOKS_SQL
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, sql, search_params(q, limit, after))
+        return cur.fetchall()
+
+
+def search_reviews(conn, *, q: str, limit: int = DEFAULT_PAGE_SIZE, after: tuple[float, int] | None = None) -> list[dict]:
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, SEARCH_REVIEWS_SQL, search_params(q, limit, after))
+        return cur.fetchall()
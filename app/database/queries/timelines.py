@@ -0,0 +1,68 @@
+from app.database.core import FEED_FANOUT_MAX_FOLLOWERS, FEED_BACKFILL_SIZE
+
+# ------------------------------
+# Materialized newsfeed timelines
+# ------------------------------
+# The API write paths fan out inside their own single statements (see
+# INSERT_REVIEW_SQL / FOLLOW_USER_SQL); these standalone helpers serve writers
+# that insert rows directly, like the seed and the COPY-based bulk ingest. None of them commit: they run inside
+# the caller's transaction so the timeline never disagrees with reviews/followers.
+
+FAN_OUT_REVIEW_SQL = """
+INSERT INTO timelines (user_id, review_id, author_id, created_at)
+SELECT r.user_id, r.id, r.user_id, r.created_at
+FROM reviews r
+WHERE r.id = ANY(%(review_ids)s)
+UNION ALL
+SELECT f.follower_id, r.id, r.user_id, r.created_at
+FROM reviews r
+JOIN users u ON u.id = r.user_id
+JOIN followers f ON f.followee_id = r.user_id
+WHERE r.id = ANY(%(review_ids)s)
+  AND NOT u.fanout_on_read
+  AND u.follower_count <= %(fanout_max_followers)s
+ON CONFLICT DO NOTHING;
+"""
+
+
+def fan_out_reviews(conn, *, review_ids: list[int]) -> None:
+    """
+    Push new reviews to their authors' and every follower's timeline, in one statement.
+    Authors served on read (above FEED_FANOUT_MAX_FOLLOWERS, now or before) are skipped.
+    """
+    with conn.cursor() as cur:
+        cur.execute(FAN_OUT_REVIEW_SQL, {
+            "review_ids": review_ids,
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        })
+
+
+BACKFILL_TIMELINE_SQL = """
+INSERT INTO timelines (user_id, review_id, author_id, created_at)
+SELECT %(follower_id)s, r.id, r.user_id, r.created_at
+FROM users u
+CROSS JOIN LATERAL (
+    SELECT id, user_id, created_at
+    FROM reviews
+    WHERE user_id = u.id
+    ORDER BY created_at DESC, id DESC
+    LIMIT %(backfill_size)s
+) r
+WHERE u.id = %(followee_id)s
+  AND NOT u.fanout_on_read
+  AND u.follower_count <= %(fanout_max_followers)s
+ON CONFLICT DO NOTHING;
+"""
+
+
+def backfill_timeline(conn, *, follower_id: int, followee_id: int) -> None:
+    """
+    Copy the followee's most recent reviews into a new follower's timeline.
+    """
+    with conn.cursor() as cur:
+        cur.execute(BACKFILL_TIMELINE_SQL, {
+            "follower_id": follower_id,
+            "followee_id": followee_id,
+            "backfill_size": FEED_BACKFILL_SIZE,
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        })
@@ -1,36 +1,147 @@
-from fastapi import HTTPException
+from typing import Iterator
+
 from psycopg.rows import dict_row
 
+from app.database.cache import MISSING, users_cache
+from app.database.core import STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined
+from app.database.statements import execute, register
+
+
+GET_USER_SQL = """
+SELECT id, name, created_at
+FROM users
+WHERE id = %(user_id)s;
+"""
+register("get_user", GET_USER_SQL, warm={"user_id": 0})
+
 
 def get_user(conn, *, user_id: int) -> dict | None:
-    sql = """
-    SELECT id, name, created_at
-    FROM users
-    WHERE id = %(user_id)s;
-    """
+    user = users_cache.get(user_id)
+    if user is not MISSING:
+        return user
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"user_id": user_id})
-        return cur.fetchone()
+        execute(cur, GET_USER_SQL, {"user_id": user_id})
+        user = cur.fetchone()
+    users_cache.set(user_id, user)
+    return user
+
 
+GET_USERS_SQL = """
+SELECT id, name, created_at
+FROM users
+WHERE id = ANY(%(user_ids)s);
+"""
+register("get_users", GET_USERS_SQL)
 
-def list_users(conn) -> list[dict]:
-    sql = """
-    SELECT id, name, created_at
-    FROM users
-    ORDER BY id;
+
+def get_users(conn, *, user_ids: list[int]) -> list[dict]:
+    """
+    The users of `user_ids` in that order, skipping unknown ids. Only the ones
+    not cached are read, with one query.
     """
+    found, missing = users_cache.get_many(user_ids)
+    if missing:
+        with conn.cursor(row_factory=dict_row) as cur:
+            execute(cur, GET_USERS_SQL, {"user_ids": missing})
+            users_cache.fill(found, missing, cur.fetchall())
+    return [found[user_id] for user_id in user_ids if user_id in found]
+
+
+LIST_USERS_SQL = """
+SELECT id, name, created_at
+FROM users
+ORDER BY id
+LIMIT %(limit)s;
+"""
+register("list_users", LIST_USERS_SQL, warm={"limit": 0})
+
+LIST_USERS_AFTER_SQL = """
+SELECT id, name, created_at
+FROM users
+WHERE id > %(after_id)s
+ORDER BY id
+LIMIT %(limit)s;
+"""
+register("list_users_after", LIST_USERS_AFTER_SQL, warm={"limit": 0, "after_id": 0})
+
+
+def list_users(conn, *, limit: int = DEFAULT_PAGE_SIZE, after_id: int | None = None) -> list[dict]:
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql)
+        if after_id is None:
+            execute(cur, LIST_USERS_SQL, {"limit": limit})
+        else:
+            execute(cur, LIST_USERS_AFTER_SQL, {"limit": limit, "after_id": after_id})
         return cur.fetchall()
 
 
+def iter_users(conn, *, after_id: int | None = None, itersize: int = STREAM_ITERSIZE) -> Iterator[dict]:
+    """
+    Every user (after `after_id`) through a server-side cursor, `itersize` rows
+    per round trip, for NDJSON exports. LIMIT NULL means no limit.
+    """
+    with conn.cursor("export_users", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after_id is None:
+            cur.execute(LIST_USERS_SQL, {"limit": None})
+        else:
+            cur.execute(LIST_USERS_AFTER_SQL, {"limit": None, "after_id": after_id})
+        yield from cur
+
+
+INSERT_USER_SQL = """
+INSERT INTO users (name)
+VALUES (%(name)s)
+RETURNING id, name, created_at;
+"""
+register("insert_user", INSERT_USER_SQL)
+
+
 def insert_user(conn, *, name: str) -> dict:
-    sql = """
-    INSERT INTO users (name)
-    VALUES (%(name)s)
-    RETURNING id, name, created_at;
+    [[user]] = execute_pipelined(conn, [(INSERT_USER_SQL, {"name": name})])
+    users_cache.set(user["id"], user)
+    return user
+
+
+# ------------------------------
+# Bulk ingest
+# ------------------------------
+# Ids are reserved from the sequence first so rows can be COPY'd straight
+# into the table and the caller still learns every generated id.
+RESERVE_USER_IDS_SQL = """
+SELECT nextval(pg_get_serial_sequence('users', 'id')) AS id
+FROM generate_series(1, %(count)s);
+"""
+
+COPY_USERS_SQL = "COPY users (id, name) FROM STDIN"
+
+
+def copy_users(conn, *, names: list[str]) -> list[int]:
+    """
+    Load users with COPY in one transaction; returns ids in input order.
     """
     with conn.cursor(row_factory=dict_row) as cur:
-        cur.execute(sql, {"name": name})
+        cur.execute(RESERVE_USER_IDS_SQL, {"count": len(names)})
+        ids = [row["id"] for row in cur.fetchall()]
+        with cur.copy(COPY_USERS_SQL) as copy:
+            for user_id, name in zip(ids, names):
+                copy.write_row((user_id, name))
         conn.commit()
-        return cur.fetchone()
+    for user_id in ids:
+        users_cache.invalidate(user_id)
+    return ids
+
+
+EXISTING_USER_IDS_SQL = """
+SELECT id
+FROM users
+WHERE id = ANY(%(ids)s);
+"""
+register("existing_user_ids", EXISTING_USER_IDS_SQL)
+
+
+def existing_user_ids(conn, *, ids: list[int]) -> set[int]:
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, EXISTING_USER_IDS_SQL, {"ids": ids})
+        return {row["id"] for row in cur.fetchall()}
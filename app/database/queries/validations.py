@@ -1,15 +1,37 @@
+from contextlib import contextmanager
+
 from fastapi import HTTPException
+from psycopg.errors import CheckViolation, ForeignKeyViolation
+
+# Write paths rely on the schema's foreign keys and CHECKs instead of
+# validating up front; violations map to 400s by constraint name,
+# formatted with the statement's parameters.
+CONSTRAINT_ERRORS = {
+    "reviews_user_id_fkey": "User {user_id} does not exist",
+    "reviews_book_id_fkey": "Book {book_id} does not exist",
+    "reviews_rating_check": "Rating must be between 1 and 5",
+    "book_stats_book_id_fkey": "Book {book_id} does not exist",
+    "followers_follower_id_fkey": "User {follower_id} does not exist",
+    "followers_followee_id_fkey": "User {followee_id} does not exist",
+    "chk_not_self_follow": "Users cannot follow themselves",
+}
 
 
-def ensure_user_exists(conn, user_id: int):
-    with conn.cursor() as cur:
-        cur.execute("SELECT 1 FROM users WHERE id = %s", (user_id,))
-        if not cur.fetchone():
-            raise HTTPException(status_code=400, detail=f"User {user_id} does not exist")
+def constraint_error_detail(exc: ForeignKeyViolation | CheckViolation, params: dict) -> str | None:
+    detail = CONSTRAINT_ERRORS.get(exc.diag.constraint_name)
+    return detail.format(**params) if detail else None
 
 
-def ensure_book_exists(conn, book_id: int):
-    with conn.cursor() as cur:
-        cur.execute("SELECT 1 FROM books WHERE id = %s", (book_id,))
-        if not cur.fetchone():
-            raise HTTPException(status_code=400, detail=f"Book {book_id} does not exist")
+@contextmanager
+def constraint_errors_as_400(conn, params: dict):
+    """
+    Roll back and raise a 400 when the wrapped statement violates a known constraint.
+    """
+    try:
+        yield
+    except (ForeignKeyViolation, CheckViolation) as exc:
+        conn.rollback()
+        detail = constraint_error_detail(exc, params)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail) from exc
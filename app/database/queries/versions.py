@@ -0,0 +1,43 @@
+from psycopg.rows import dict_row
+
+from app.database.statements import execute, register
+
+# ------------------------------
+# Collection versions
+# ------------------------------
+# Validators for conditional GETs, each a primary-key lookup. Triggers on
+# users and books bump one of their table_versions shards
+# (schema/07_table_versions.sql), summed here; a book's review list is
+# versioned by its book_stats row, which every review write already updates.
+# Both return {"version"} or None.
+
+GET_TABLE_VERSION_SQL = """
+SELECT sum(version)::bigint AS version
+FROM table_versions
+WHERE table_name = %(table_name)s
+HAVING count(*) > 0;
+"""
+register("get_table_version", GET_TABLE_VERSION_SQL, warm={"table_name": "users"})
+
+
+def get_table_version(conn, *, table_name: str) -> dict | None:
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, GET_TABLE_VERSION_SQL, {"table_name": table_name})
+        return cur.fetchone()
+
+
+GET_BOOK_REVIEWS_VERSION_SQL = """
+SELECT review_count AS version
+FROM book_stats
+WHERE book_id = %(book_id)s;
+"""
+register("get_book_reviews_version", GET_BOOK_REVIEWS_VERSION_SQL, warm={"book_id": 0})
+
+
+def get_book_reviews_version(conn, *, book_id: int) -> dict | None:
+    """
+    None until the book's first review.
+    """
+    with conn.cursor(row_factory=dict_row) as cur:
+        execute(cur, GET_BOOK_REVIEWS_VERSION_SQL, {"book_id": book_id})
+        return cur.fetchone()
@@ -0,0 +1,32 @@
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.queries.book_stats import (
+    GET_BOOK_STATS_SQL,
+    LIST_TOP_RATED_SQL,
+    LIST_TOP_RATED_AFTER_SQL,
+)
+from app.database.statements import execute
+
+
+async def get_book_stats(conn: AsyncConnection, *, book_id: int) -> dict | None:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_BOOK_STATS_SQL, {"book_id": book_id})
+        return await cur.fetchone()
+
+
+async def list_top_rated(
+        conn: AsyncConnection, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        min_reviews: int = 1,
+        after: tuple[float, int, int] | None = None
+) -> list[dict]:
+    params = {"limit": limit, "min_reviews": min_reviews}
+    async with conn.cursor(row_factory=dict_row) as cur:
+        if after is None:
+            await execute(cur, LIST_TOP_RATED_SQL, params)
+        else:
+            params["after_rating"], params["after_count"], params["after_id"] = after
+            await execute(cur, LIST_TOP_RATED_AFTER_SQL, params)
+        return await cur.fetchall()
@@ -0,0 +1,93 @@
+from typing import AsyncIterator
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.cache import MISSING, books_cache
+from app.database.core import STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined_async
+from app.database.queries.books import (
+    GET_BOOK_SQL,
+    GET_BOOKS_SQL,
+    LIST_BOOKS_SQL,
+    LIST_BOOKS_AFTER_SQL,
+    INSERT_BOOK_SQL,
+    RESERVE_BOOK_IDS_SQL,
+    COPY_BOOKS_SQL,
+    EXISTING_BOOK_IDS_SQL,
+)
+from app.database.statements import execute
+
+
+async def get_book(conn: AsyncConnection, *, book_id: int) -> dict | None:
+    book = books_cache.get(book_id)
+    if book is not MISSING:
+        return book
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_BOOK_SQL, {"book_id": book_id})
+        book = await cur.fetchone()
+    books_cache.set(book_id, book)
+    return book
+
+
+async def get_books(conn: AsyncConnection, *, book_ids: list[int]) -> list[dict]:
+    found, missing = books_cache.get_many(book_ids)
+    if missing:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await execute(cur, GET_BOOKS_SQL, {"book_ids": missing})
+            books_cache.fill(found, missing, await cur.fetchall())
+    return [found[book_id] for book_id in book_ids if book_id in found]
+
+
+async def list_books(
+        conn: AsyncConnection, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after_id: int | None = None
+) -> list[dict]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        if after_id is None:
+            await execute(cur, LIST_BOOKS_SQL, {"limit": limit})
+        else:
+            await execute(cur, LIST_BOOKS_AFTER_SQL, {"limit": limit, "after_id": after_id})
+        return await cur.fetchall()
+
+
+async def iter_books(
+        conn: AsyncConnection, *,
+        after_id: int | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> AsyncIterator[dict]:
+    async with conn.cursor("export_books", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after_id is None:
+            await cur.execute(LIST_BOOKS_SQL, {"limit": None})
+        else:
+            await cur.execute(LIST_BOOKS_AFTER_SQL, {"limit": None, "after_id": after_id})
+        async for row in cur:
+            yield row
+
+
+async def insert_book(conn: AsyncConnection, *, title: str, author: str) -> dict:
+    [[book]] = await execute_pipelined_async(conn, [(INSERT_BOOK_SQL, {"title": title, "author": author})])
+    books_cache.set(book["id"], book)
+    return book
+
+
+async def copy_books(conn: AsyncConnection, *, books: list[tuple[str, str]]) -> list[int]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(RESERVE_BOOK_IDS_SQL, {"count": len(books)})
+        ids = [row["id"] for row in await cur.fetchall()]
+        async with cur.copy(COPY_BOOKS_SQL) as copy:
+            for book_id, (title, author) in zip(ids, books):
+                await copy.write_row((book_id, title, author))
+        await conn.commit()
+    for book_id in ids:
+        books_cache.invalidate(book_id)
+    return ids
+
+
+async def existing_book_ids(conn: AsyncConnection, *, ids: list[int]) -> set[int]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, EXISTING_BOOK_IDS_SQL, {"ids": ids})
+        return {row["id"] for row in await cur.fetchall()}
@@ -0,0 +1,76 @@
+from datetime import datetime
+
+import numpy as np
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.core import FEED_FANOUT_MAX_FOLLOWERS, FEED_BACKFILL_SIZE, FEED_STRATEGY, async_pool
+from app.database.follow_graph import follow_graph
+from app.database.id_pairs import load_id_pairs_async
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined_async
+from app.database.queries.follows import (
+    FOLLOW_USER_SQL,
+    FOLLOWS_SQL,
+    UNFOLLOW_USER_SQL,
+    GET_NEWSFEED_SQL,
+    GET_NEWSFEED_MERGE_SQL,
+    FEED_HEAD,
+)
+from app.database.queries_async.validations import constraint_errors_as_400
+from app.database.statements import execute
+
+
+async def follow_user(conn: AsyncConnection, *, follower_id: int, followee_id: int) -> dict | None:
+    params = {
+        "follower_id": follower_id,
+        "followee_id": followee_id,
+        "backfill_size": FEED_BACKFILL_SIZE,
+        "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+    }
+    async with constraint_errors_as_400(conn, params):
+        [follows] = await execute_pipelined_async(conn, [(FOLLOW_USER_SQL, params)])
+    follow_graph.follow(follower_id, followee_id)
+    return follows[0] if follows else None
+
+
+async def unfollow_user(conn: AsyncConnection, *, follower_id: int, followee_id: int) -> None:
+    params = {"follower_id": follower_id, "followee_id": followee_id, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}
+    await execute_pipelined_async(conn, [(UNFOLLOW_USER_SQL, params)])
+    follow_graph.unfollow(follower_id, followee_id)
+
+
+async def load_follows(conn: AsyncConnection) -> tuple[np.ndarray, np.ndarray]:
+    return await load_id_pairs_async(conn, FOLLOWS_SQL)
+
+
+async def _load_pooled_follows() -> tuple[np.ndarray, np.ndarray]:
+    async with async_pool.connection() as conn:
+        return await load_follows(conn)
+
+
+async def start_follow_graph() -> None:
+    await follow_graph.start_async(_load_pooled_follows)
+
+
+async def stop_follow_graph() -> None:
+    await follow_graph.stop_async()
+
+
+async def get_newsfeed(
+        conn: AsyncConnection, *,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    after_created_at, after_id = after or FEED_HEAD
+    sql = GET_NEWSFEED_MERGE_SQL if FEED_STRATEGY == "merge" else GET_NEWSFEED_SQL
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, sql, {
+            "user_id": user_id,
+            "limit": limit,
+            "after_created_at": after_created_at,
+            "after_id": after_id,
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        })
+        return await cur.fetchall()
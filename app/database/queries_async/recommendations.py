@@ -0,0 +1,23 @@
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.queries.recommendations import (
+    GET_SIMILAR_BOOKS_SQL,
+    GET_USER_RECOMMENDATIONS_SQL,
+    LIKED_RATING,
+    RECOMMENDATION_HISTORY,
+)
+from app.database.statements import execute
+
+
+async def get_similar_books(conn: AsyncConnection, *, book_id: int, limit: int) -> list[dict]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_SIMILAR_BOOKS_SQL, {"book_id": book_id, "limit": limit})
+        return await cur.fetchall()
+
+
+async def get_user_recommendations(conn: AsyncConnection, *, user_id: int, limit: int) -> list[dict]:
+    params = {"user_id": user_id, "liked_rating": LIKED_RATING, "history": RECOMMENDATION_HISTORY, "limit": limit}
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_USER_RECOMMENDATIONS_SQL, params)
+        return await cur.fetchall()
@@ -0,0 +1,134 @@
+from datetime import datetime
+from typing import AsyncIterator
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.core import FEED_FANOUT_MAX_FOLLOWERS, STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined_async
+from app.database.queries.book_stats import ADD_REVIEWS_TO_BOOK_STATS_SQL
+from app.database.queries.books import EXISTING_BOOK_IDS_SQL
+from app.database.queries.reviews import (
+    INSERT_REVIEW_SQL,
+    GET_REVIEW_SQL,
+    LIST_REVIEWS_BY_USER_SQL,
+    LIST_REVIEWS_BY_USER_AFTER_SQL,
+    LIST_REVIEWS_BY_BOOK_SQL,
+    LIST_REVIEWS_BY_BOOK_AFTER_SQL,
+    RESERVE_REVIEW_IDS_SQL,
+    COPY_REVIEWS_SQL,
+)
+from app.database.queries.timelines import FAN_OUT_REVIEW_SQL
+from app.database.queries.users import EXISTING_USER_IDS_SQL
+from app.database.queries_async.validations import constraint_errors_as_400
+from app.database.statements import execute
+
+
+async def insert_review(conn: AsyncConnection, *, user_id: int, book_id: int, rating: int, content: str) -> dict:
+    params = {
+        "user_id": user_id,
+        "book_id": book_id,
+        "rating": rating,
+        "content": content,
+        "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+    }
+    async with constraint_errors_as_400(conn, params):
+        [[review]] = await execute_pipelined_async(conn, [(INSERT_REVIEW_SQL, params)])
+    return review
+
+
+async def get_review(conn: AsyncConnection, *, review_id: int) -> dict | None:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_REVIEW_SQL, {"review_id": review_id})
+        return await cur.fetchone()
+
+
+async def list_reviews_by_user(
+        conn: AsyncConnection, *,
+        user_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    params = {"user_id": user_id, "limit": limit}
+    async with conn.cursor(row_factory=dict_row) as cur:
+        if after is None:
+            await execute(cur, LIST_REVIEWS_BY_USER_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            await execute(cur, LIST_REVIEWS_BY_USER_AFTER_SQL, params)
+        return await cur.fetchall()
+
+
+async def iter_reviews_by_user(
+        conn: AsyncConnection, *,
+        user_id: int,
+        after: tuple[datetime, int] | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> AsyncIterator[dict]:
+    params = {"user_id": user_id, "limit": None}
+    async with conn.cursor("export_reviews_by_user", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after is None:
+            await cur.execute(LIST_REVIEWS_BY_USER_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            await cur.execute(LIST_REVIEWS_BY_USER_AFTER_SQL, params)
+        async for row in cur:
+            yield row
+
+
+async def list_reviews_by_book(
+        conn: AsyncConnection, *,
+        book_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[datetime, int] | None = None
+) -> list[dict]:
+    params = {"book_id": book_id, "limit": limit}
+    async with conn.cursor(row_factory=dict_row) as cur:
+        if after is None:
+            await execute(cur, LIST_REVIEWS_BY_BOOK_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            await execute(cur, LIST_REVIEWS_BY_BOOK_AFTER_SQL, params)
+        return await cur.fetchall()
+
+
+async def iter_reviews_by_book(
+        conn: AsyncConnection, *,
+        book_id: int,
+        after: tuple[datetime, int] | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> AsyncIterator[dict]:
+    params = {"book_id": book_id, "limit": None}
+    async with conn.cursor("export_reviews_by_book", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after is None:
+            await cur.execute(LIST_REVIEWS_BY_BOOK_SQL, params)
+        else:
+            params["after_created_at"], params["after_id"] = after
+            await cur.execute(LIST_REVIEWS_BY_BOOK_AFTER_SQL, params)
+        async for row in cur:
+            yield row
+
+
+async def copy_reviews(conn: AsyncConnection, *, reviews: list[tuple[int, int, int, str]]) -> list[int]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(RESERVE_REVIEW_IDS_SQL, {"count": len(reviews)})
+        ids = [row["id"] for row in await cur.fetchall()]
+        async with cur.copy(COPY_REVIEWS_SQL) as copy:
+            for review_id, review in zip(ids, reviews):
+                await copy.write_row((review_id, *review))
+    await execute_pipelined_async(conn, [
+        (FAN_OUT_REVIEW_SQL, {"review_ids": ids, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}),
+        (ADD_REVIEWS_TO_BOOK_STATS_SQL, {"review_ids": ids}),
+    ])
+    return ids
+
+
+async def existing_review_refs(conn: AsyncConnection, *, user_ids: list[int], book_ids: list[int]) -> tuple[set[int], set[int]]:
+    users, books = await execute_pipelined_async(conn, [
+        (EXISTING_USER_IDS_SQL, {"ids": user_ids}),
+        (EXISTING_BOOK_IDS_SQL, {"ids": book_ids}),
+    ])
+    return {row["id"] for row in users}, {row["id"] for row in books}
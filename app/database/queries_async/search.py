@@ -0,0 +1,44 @@
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.queries import search
+from app.database.queries.search import (
+    HAS_TRIGRAM_SQL,
+    SEARCH_BOOKS_SQL,
+    SEARCH_BOOKS_FUZZY_SQL,
+    SEARCH_REVIEWS_SQL,
+    search_params,
+)
+from app.database.statements import execute
+
+
+async def has_trigram(conn: AsyncConnection) -> bool:
+    # Shares the sync module's answer: it's the same database
+    if search._trigram is None:
+        cur = await conn.execute(HAS_TRIGRAM_SQL)
+        search._trigram = (await cur.fetchone())["installed"]
+    return search._trigram
+
+
+async def search_books(
+        conn: AsyncConnection, *,
+        q: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[float, int] | None = None
+) -> list[dict]:
+    sql = SEARCH_BOOKS_FUZZY_SQL if await has_trigram(conn) else SEARCH_BOOKS_SQL
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, sql, search_params(q, limit, after))
+        return await cur.fetchall()
+
+
+async def search_reviews(
+        conn: AsyncConnection, *,
+        q: str,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: tuple[float, int] | None = None
+) -> list[dict]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, SEARCH_REVIEWS_SQL, search_params(q, limit, after))
+        return await cur.fetchall()
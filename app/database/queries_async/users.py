@@ -0,0 +1,93 @@
+from typing import AsyncIterator
+
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.cache import MISSING, users_cache
+from app.database.core import STREAM_ITERSIZE
+from app.database.pagination import DEFAULT_PAGE_SIZE
+from app.database.pipeline import execute_pipelined_async
+from app.database.queries.users import (
+    GET_USER_SQL,
+    GET_USERS_SQL,
+    LIST_USERS_SQL,
+    LIST_USERS_AFTER_SQL,
+    INSERT_USER_SQL,
+    RESERVE_USER_IDS_SQL,
+    COPY_USERS_SQL,
+    EXISTING_USER_IDS_SQL,
+)
+from app.database.statements import execute
+
+
+async def get_user(conn: AsyncConnection, *, user_id: int) -> dict | None:
+    user = users_cache.get(user_id)
+    if user is not MISSING:
+        return user
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_USER_SQL, {"user_id": user_id})
+        user = await cur.fetchone()
+    users_cache.set(user_id, user)
+    return user
+
+
+async def get_users(conn: AsyncConnection, *, user_ids: list[int]) -> list[dict]:
+    found, missing = users_cache.get_many(user_ids)
+    if missing:
+        async with conn.cursor(row_factory=dict_row) as cur:
+            await execute(cur, GET_USERS_SQL, {"user_ids": missing})
+            users_cache.fill(found, missing, await cur.fetchall())
+    return [found[user_id] for user_id in user_ids if user_id in found]
+
+
+async def list_users(
+        conn: AsyncConnection, *,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after_id: int | None = None
+) -> list[dict]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        if after_id is None:
+            await execute(cur, LIST_USERS_SQL, {"limit": limit})
+        else:
+            await execute(cur, LIST_USERS_AFTER_SQL, {"limit": limit, "after_id": after_id})
+        return await cur.fetchall()
+
+
+async def iter_users(
+        conn: AsyncConnection, *,
+        after_id: int | None = None,
+        itersize: int = STREAM_ITERSIZE
+) -> AsyncIterator[dict]:
+    async with conn.cursor("export_users", row_factory=dict_row) as cur:
+        cur.itersize = itersize
+        if after_id is None:
+            await cur.execute(LIST_USERS_SQL, {"limit": None})
+        else:
+            await cur.execute(LIST_USERS_AFTER_SQL, {"limit": None, "after_id": after_id})
+        async for row in cur:
+            yield row
+
+
+async def insert_user(conn: AsyncConnection, *, name: str) -> dict:
+    [[user]] = await execute_pipelined_async(conn, [(INSERT_USER_SQL, {"name": name})])
+    users_cache.set(user["id"], user)
+    return user
+
+
+async def copy_users(conn: AsyncConnection, *, names: list[str]) -> list[int]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await cur.execute(RESERVE_USER_IDS_SQL, {"count": len(names)})
+        ids = [row["id"] for row in await cur.fetchall()]
+        async with cur.copy(COPY_USERS_SQL) as copy:
+            for user_id, name in zip(ids, names):
+                await copy.write_row((user_id, name))
+        await conn.commit()
+    for user_id in ids:
+        users_cache.invalidate(user_id)
+    return ids
+
+
+async def existing_user_ids(conn: AsyncConnection, *, ids: list[int]) -> set[int]:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, EXISTING_USER_IDS_SQL, {"ids": ids})
+        return {row["id"] for row in await cur.fetchall()}
@@ -0,0 +1,19 @@
+from contextlib import asynccontextmanager
+
+from fastapi import HTTPException
+from psycopg import AsyncConnection
+from psycopg.errors import CheckViolation, ForeignKeyViolation
+
+from app.database.queries.validations import constraint_error_detail
+
+
+@asynccontextmanager
+async def constraint_errors_as_400(conn: AsyncConnection, params: dict):
+    try:
+        yield
+    except (ForeignKeyViolation, CheckViolation) as exc:
+        await conn.rollback()
+        detail = constraint_error_detail(exc, params)
+        if detail is None:
+            raise
+        raise HTTPException(status_code=400, detail=detail) from exc
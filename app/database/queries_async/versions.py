@@ -0,0 +1,17 @@
+from psycopg import AsyncConnection
+from psycopg.rows import dict_row
+
+from app.database.queries.versions import GET_BOOK_REVIEWS_VERSION_SQL, GET_TABLE_VERSION_SQL
+from app.database.statements import execute
+
+
+async def get_table_version(conn: AsyncConnection, *, table_name: str) -> dict | None:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_TABLE_VERSION_SQL, {"table_name": table_name})
+        return await cur.fetchone()
+
+
+async def get_book_reviews_version(conn: AsyncConnection, *, book_id: int) -> dict | None:
+    async with conn.cursor(row_factory=dict_row) as cur:
+        await execute(cur, GET_BOOK_REVIEWS_VERSION_SQL, {"book_id": book_id})
+        return await cur.fetchone()
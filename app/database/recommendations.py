@@ -0,0 +1,212 @@
+"""
+Offline item-to-item recommendations ("readers who liked this also liked").
+
+Pulls every liked review (rating >= LIKED_RATING) into NumPy arrays with one
+bulk read (app/database/id_pairs.py) and builds the sparse user x book matrix
+X of who liked what. The similarity of two books is the cosine of their
+reader sets: readers who liked both, over the geometric mean of their reader
+counts. Book pairs with fewer than `min_common` common readers are ignored as
+noise.
+
+X^T X holds every pair's common readers, but it can be far denser than X, so
+it is computed for a range of books at a time. Each range is sized from an
+upper bound of its nonzeros, so no product holds more than `max_pairs` of
+them. The top `top_k` neighbours of each book in the range are then kept.
+
+The results are streamed into a fresh table with binary COPY and swapped in
+for book_recommendations in the same transaction. Readers keep the previous
+results until it commits.
+
+    python -m app.database.recommendations --top-k 20
+"""
+import argparse
+import time
+
+import numpy as np
+import psycopg
+import scipy.sparse as sp
+
+from app.database.core import DATABASE_URL
+from app.database.id_pairs import load_id_pairs
+from app.database.queries.recommendations import LIKED_RATING
+
+# Binary COPY framing: header (signature, flags, no extension) and trailer
+COPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + (0).to_bytes(4, "big") + (0).to_bytes(4, "big")
+COPY_TRAILER = (-1).to_bytes(2, "big", signed=True)
+
+# A book_recommendations row in binary
+RECOMMENDATION_TUPLE = np.dtype([
+    ("fields", ">i2"),
+    ("book_len", ">i4"), ("book_id", ">i8"),
+    ("rank_len", ">i4"), ("rank", ">i2"),
+    ("similar_len", ">i4"), ("similar_book_id", ">i8"),
+    ("score_len", ">i4"), ("score", ">f4"),
+    ("common_len", ">i4"), ("common_readers", ">i4"),
+])
+
+LIKES_SQL = """
+SELECT user_id, book_id
+FROM reviews
+WHERE rating >= %(liked_rating)s
+"""
+
+CREATE_NEXT_SQL = """
+DROP TABLE IF EXISTS book_recommendations_next;
+CREATE TABLE book_recommendations_next (LIKE book_recommendations);
+"""
+
+COPY_NEXT_SQL = "COPY book_recommendations_next FROM STDIN (FORMAT binary)"
+
+# The key is built once, after the load
+SWAP_SQL = """
+ALTER TABLE book_recommendations_next ADD CONSTRAINT book_recommendations_next_pkey PRIMARY KEY (book_id, rank);
+ANALYZE book_recommendations_next;
+DROP TABLE book_recommendations;
+ALTER TABLE book_recommendations_next RENAME TO book_recommendations;
+ALTER TABLE book_recommendations RENAME CONSTRAINT book_recommendations_next_pkey TO book_recommendations_pkey;
+"""
+
+
+def load_likes(conn) -> tuple[np.ndarray, np.ndarray]:
+    """
+    (user_ids, book_ids) of every liked review.
+    """
+    return load_id_pairs(conn, LIKES_SQL, {"liked_rating": LIKED_RATING})
+
+
+def likes_matrix(users: np.ndarray, books: np.ndarray) -> tuple[sp.csr_matrix, np.ndarray]:
+    """
+    The 0/1 user x book matrix of likes (a book reviewed twice counts once),
+    and the book id of each column.
+    """
+    _, rows = np.unique(users, return_inverse=True)
+    book_ids, cols = np.unique(books, return_inverse=True)
+    matrix = sp.csr_matrix(
+        (np.ones(len(rows), np.float32), (rows, cols)),
+        shape=(rows.max(initial=-1) + 1, len(book_ids)),
+    )
+    matrix.sum_duplicates()
+    matrix.data[:] = 1
+    return matrix, book_ids
+
+
+def book_ranges(bound: np.ndarray, max_pairs: int):
+    """
+    Consecutive [start, stop) ranges of books whose summed `bound` stays
+    within max_pairs; a book above it on its own gets a range of its own.
+    """
+    ends = np.cumsum(bound)
+    start = 0
+    while start < len(bound):
+        before = ends[start] - bound[start]
+        stop = max(start + 1, int(np.searchsorted(ends, before + max_pairs, side="right")))
+        yield start, stop
+        start = stop
+
+
+def top_neighbours(
+        pairs: sp.csr_matrix,
+        start: int,
+        readers: np.ndarray, *,
+        top_k: int,
+        min_common: int,
+) -> tuple[np.ndarray, ...]:
+    """
+    Best `top_k` neighbours of books start.. from their rows of X^T X, as
+    (book, rank, neighbour, score, common readers) columns, best first.
+    """
+    books = np.repeat(np.arange(start, start + pairs.shape[0]), np.diff(pairs.indptr))
+    neighbours = pairs.indices
+    common = pairs.data
+    keep = (neighbours != books) & (common >= min_common)
+    books, neighbours, common = books[keep], neighbours[keep], common[keep]
+    # float32, as stored
+    scores = (common / np.sqrt(readers[books].astype(np.float64) * readers[neighbours])).astype(np.float32)
+
+    # Per book, best score first: one sort on (book, descending score) packed
+    # into a uint64, several times faster than np.lexsort. A positive float32
+    # orders like its bits; ties keep the product's column order.
+    key = (books.astype(np.uint64) << np.uint64(32)) | (~scores.view(np.uint32)).astype(np.uint64)
+    order = np.argsort(key, kind="stable")
+    books, neighbours, common, scores = books[order], neighbours[order], common[order], scores[order]
+    # Position within the book
+    ranks = np.arange(len(books)) - np.searchsorted(books, books)
+    best = ranks < top_k
+    return books[best], ranks[best] + 1, neighbours[best], scores[best], common[best]
+
+
+def recommendation_tuples(book_ids: np.ndarray, books, ranks, neighbours, scores, common) -> bytes:
+    tuples = np.empty(len(books), RECOMMENDATION_TUPLE)
+    tuples["fields"] = 5
+    tuples["book_len"], tuples["book_id"] = 8, book_ids[books]
+    tuples["rank_len"], tuples["rank"] = 2, ranks
+    tuples["similar_len"], tuples["similar_book_id"] = 8, book_ids[neighbours]
+    tuples["score_len"], tuples["score"] = 4, scores
+    tuples["common_len"], tuples["common_readers"] = 4, common
+    return tuples.tobytes()
+
+
+def compute_recommendations(
+        conn, *,
+        top_k: int = 20,
+        min_common: int = 2,
+        max_pairs: int = 20_000_000,
+) -> dict[str, float]:
+    """
+    Recompute book_recommendations on `conn` in one transaction and commit.
+    Returns seconds per phase, plus the books and rows written.
+    """
+    if not 1 <= top_k <= 32767:
+        raise ValueError("top_k must be between 1 and 32767")
+    timings = {}
+
+    def phase(name, run, *args):
+        started = time.perf_counter()
+        result = run(*args)
+        timings[name] = round(time.perf_counter() - started, 2)
+        print(f"{name}: {timings[name]}s")
+        return result
+
+    with conn.transaction(), conn.cursor() as cur:
+        cur.execute("SET LOCAL synchronous_commit = off")
+        users, books = phase("load", load_likes, conn)
+        matrix, book_ids = phase("matrix", likes_matrix, users, books)
+        del users, books
+        by_book = matrix.T.tocsr()
+        readers = np.diff(by_book.indptr)
+        # Nonzeros of a book's row of X^T X: at most its readers' summed likes
+        bound = np.minimum(by_book @ np.diff(matrix.indptr).astype(np.int64), len(book_ids))
+
+        cur.execute(CREATE_NEXT_SQL)
+        rows = 0
+        started = time.perf_counter()
+        with cur.copy(COPY_NEXT_SQL) as copy:
+            copy.write(COPY_HEADER)
+            for start, stop in book_ranges(bound, max_pairs):
+                pairs = by_book[start:stop] @ matrix
+                found = top_neighbours(pairs, start, readers, top_k=top_k, min_common=min_common)
+                copy.write(recommendation_tuples(book_ids, *found))
+                rows += len(found[0])
+            copy.write(COPY_TRAILER)
+        timings["similarities"] = round(time.perf_counter() - started, 2)
+        print(f"similarities: {timings['similarities']}s")
+        phase("swap", cur.execute, SWAP_SQL)
+    timings.update(books=len(book_ids), rows=rows)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=20, help="neighbours kept per book")
+    parser.add_argument("--min-common", type=int, default=2, help="fewest common readers for a pair to count")
+    parser.add_argument("--max-pairs", type=int, default=20_000_000, help="bound on the book pairs held in memory at once")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with psycopg.connect(DATABASE_URL) as conn:
+        stats = compute_recommendations(conn, top_k=args.top_k, min_common=args.min_common, max_pairs=args.max_pairs)
+    print(f"{stats['rows']} neighbours of {stats['books']} books in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import itertools
+import threading
+import time
+
+from fastapi import Request, Response
+
+from app.database.core import (
+    DB_REPLICA_URLS,
+    METRICS_ENABLED,
+    REPLICA_TOKEN_TTL,
+    async_replica_pools,
+    get_async_connection,
+    get_connection,
+    replica_pools,
+)
+from app.database.statements import register
+from app.metrics import DB_POOL_WAIT_SECONDS
+
+# ------------------------------
+# Read-replica routing
+# ------------------------------
+# Read routes borrow their connection from get_read_connection, which takes
+# the replicas (DB_REPLICA_URLS) in turn. Writes stay on the primary. Replicas
+# lag behind the primary, so a write route hands the client the primary's WAL
+# position after its commit, as a short-lived cookie (and response header).
+# Reads carrying that token go to a replica only once it has replayed up to
+# that point, and to the primary otherwise, so a client always sees its own
+# writes. Every replica's last known replay LSN is cached: it only moves
+# forward, so a replica that has caught up with a token once needs no further
+# check for it.
+#
+# Without replicas, get_read_connection *is* get_connection and tokens are
+# never issued: nothing changes.
+
+LSN_COOKIE = "db_lsn"
+LSN_HEADER = "X-DB-LSN"
+
+CURRENT_WAL_LSN_SQL = "SELECT pg_current_wal_lsn()::text AS lsn;"
+register("current_wal_lsn", CURRENT_WAL_LSN_SQL)
+
+REPLAY_LSN_SQL = "SELECT pg_last_wal_replay_lsn()::text AS lsn;"
+register("replay_lsn", REPLAY_LSN_SQL)
+
+_next_replica = itertools.cycle(range(len(DB_REPLICA_URLS)))
+_replayed = [0] * len(DB_REPLICA_URLS)
+_stats = {"replica_reads": [0] * len(DB_REPLICA_URLS), "primary_fallbacks": 0, "lsn_checks": 0}
+_lock = threading.Lock()
+
+
+def parse_lsn(text: str | None) -> int | None:
+    """'16/B374D848' -> its position as an int; None for anything else."""
+    if not text:
+        return None
+    high, _, low = text.partition("/")
+    try:
+        return (int(high, 16) << 32) | int(low, 16)
+    except ValueError:
+        return None
+
+
+def _min_lsn(request: Request) -> int | None:
+    return parse_lsn(request.headers.get(LSN_HEADER) or request.cookies.get(LSN_COOKIE))
+
+
+def _count(index: int | None) -> None:
+    with _lock:
+        if index is None:
+            _stats["primary_fallbacks"] += 1
+        else:
+            _stats["replica_reads"][index] += 1
+
+
+def _caught_up(index: int, row: dict | None) -> None:
+    with _lock:
+        _stats["lsn_checks"] += 1
+        _replayed[index] = max(_replayed[index], parse_lsn(row["lsn"] if row else None) or 0)
+
+
+def _get_replica_connection(request: Request):
+    """
+    Borrows a connection for a read route: the next replica's, unless the
+    request's LSN token is ahead of what that replica has replayed.
+    """
+    min_lsn = _min_lsn(request)
+    index = next(_next_replica)
+    started = time.perf_counter()
+    with replica_pools[index].connection() as conn:
+        if METRICS_ENABLED:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        if min_lsn is not None and _replayed[index] < min_lsn:
+            _caught_up(index, conn.execute(REPLAY_LSN_SQL, prepare=True).fetchone())
+        if min_lsn is None or _replayed[index] >= min_lsn:
+            _count(index)
+            yield conn
+            return
+    _count(None)
+    yield from get_connection()
+
+
+async def _get_async_replica_connection(request: Request):
+    min_lsn = _min_lsn(request)
+    index = next(_next_replica)
+    started = time.perf_counter()
+    async with async_replica_pools[index].connection() as conn:
+        if METRICS_ENABLED:
+            DB_POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+        if min_lsn is not None and _replayed[index] < min_lsn:
+            cur = await conn.execute(REPLAY_LSN_SQL, prepare=True)
+            _caught_up(index, await cur.fetchone())
+        if min_lsn is None or _replayed[index] >= min_lsn:
+            _count(index)
+            yield conn
+            return
+    _count(None)
+    async for conn in get_async_connection():
+        yield conn
+
+
+# Use with FastAPI Depends on read-only routes
+get_read_connection = _get_replica_connection if DB_REPLICA_URLS else get_connection
+get_async_read_connection = _get_async_replica_connection if DB_REPLICA_URLS else get_async_connection
+
+
+def _issue_token(response: Response, row: dict) -> None:
+    response.set_cookie(LSN_COOKIE, row["lsn"], max_age=REPLICA_TOKEN_TTL, httponly=True, samesite="lax")
+    response.headers[LSN_HEADER] = row["lsn"]
+
+
+def set_read_your_writes(response: Response, conn) -> None:
+    """
+    After a committed write on `conn` (the primary), hand the client the
+    primary's WAL position so its next reads wait for a caught-up replica.
+    """
+    if DB_REPLICA_URLS:
+        _issue_token(response, conn.execute(CURRENT_WAL_LSN_SQL, prepare=True).fetchone())
+
+
+async def set_read_your_writes_async(response: Response, conn) -> None:
+    if DB_REPLICA_URLS:
+        cur = await conn.execute(CURRENT_WAL_LSN_SQL, prepare=True)
+        _issue_token(response, await cur.fetchone())
+
+
+def get_replica_stats() -> dict:
+    """
+    Reads served per replica, reads sent back to the primary for a token the
+    replica hadn't replayed yet, and the replay LSN last seen on each replica.
+    """
+    with _lock:
+        return {
+            "replicas": len(DB_REPLICA_URLS),
+            "replica_reads": list(_stats["replica_reads"]),
+            "primary_fallbacks": _stats["primary_fallbacks"],
+            "lsn_checks": _stats["lsn_checks"],
+            "replayed_lsn": [f"{lsn >> 32:X}/{lsn & 0xFFFFFFFF:X}" for lsn in _replayed],
+        }
@@ -3,3 +3,7 @@ CREATE TABLE IF NOT EXISTS users (
     name VARCHAR(120) NOT NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
+
+-- Only the seed's idempotency checks looked users up by name. They run once,
+-- on a fresh database, and can scan the table: not worth an index on every insert
+DROP INDEX IF EXISTS idx_users_name;
@@ -4,3 +4,7 @@ CREATE TABLE IF NOT EXISTS books (
     author VARCHAR(255) NOT NULL,
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
+
+-- Only the seed's idempotency checks looked books up by title. They run once,
+-- on a fresh database, and can scan the table: not worth an index on every insert
+DROP INDEX IF EXISTS idx_books_title;
@@ -7,4 +7,7 @@ CREATE TABLE IF NOT EXISTS reviews (
     created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
 );
 
-CREATE INDEX IF NOT EXISTS idx_reviews_user_created ON reviews(user_id, created_at DESC);
+-- Keyset pagination indexes: match ORDER BY created_at DESC, id DESC exactly
+DROP INDEX IF EXISTS idx_reviews_user_created;
+CREATE INDEX IF NOT EXISTS idx_reviews_user_created_id ON reviews(user_id, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_reviews_book_created_id ON reviews(book_id, created_at DESC, id DESC);
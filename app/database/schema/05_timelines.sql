@@ -0,0 +1,39 @@
+-- Materialized newsfeed: one row per (reader, review) pushed on write
+ALTER TABLE users ADD COLUMN IF NOT EXISTS follower_count BIGINT NOT NULL DEFAULT 0;
+-- Set once the user has had more followers than the fan-out threshold: from then
+-- on their reviews are merged into feeds on read instead of pushed. Sticky, since
+-- the reviews they posted meanwhile are in no follower's timeline.
+ALTER TABLE users ADD COLUMN IF NOT EXISTS fanout_on_read BOOLEAN NOT NULL DEFAULT false;
+
+CREATE TABLE IF NOT EXISTS timelines (
+    user_id BIGINT NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    review_id BIGINT NOT NULL REFERENCES reviews(id) ON DELETE CASCADE,
+    author_id BIGINT NOT NULL,
+    created_at TIMESTAMPTZ NOT NULL,
+    PRIMARY KEY (user_id, review_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_timelines_user_created ON timelines(user_id, created_at DESC, review_id DESC);
+CREATE INDEX IF NOT EXISTS idx_timelines_user_author ON timelines(user_id, author_id);
+
+-- One-off backfills for databases created before timelines existed
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM followers) AND NOT EXISTS (SELECT 1 FROM users WHERE follower_count > 0) THEN
+        UPDATE users u
+        SET follower_count = c.n
+        FROM (SELECT followee_id, COUNT(*) AS n FROM followers GROUP BY followee_id) c
+        WHERE u.id = c.followee_id;
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM reviews) AND NOT EXISTS (SELECT 1 FROM timelines) THEN
+        INSERT INTO timelines (user_id, review_id, author_id, created_at)
+        SELECT r.user_id, r.id, r.user_id, r.created_at
+        FROM reviews r
+        UNION ALL
+        SELECT f.follower_id, r.id, r.user_id, r.created_at
+        FROM followers f
+        JOIN reviews r ON r.user_id = f.followee_id
+        ON CONFLICT DO NOTHING;
+    END IF;
+END $$;
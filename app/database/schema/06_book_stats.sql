@@ -0,0 +1,38 @@
+-- Per-book rating aggregate, updated by every review write (see INSERT_REVIEW_SQL)
+CREATE TABLE IF NOT EXISTS book_stats (
+    book_id BIGINT PRIMARY KEY REFERENCES books(id) ON DELETE CASCADE,
+    review_count BIGINT NOT NULL DEFAULT 0,
+    rating_sum BIGINT NOT NULL DEFAULT 0,
+    rating_1 BIGINT NOT NULL DEFAULT 0,
+    rating_2 BIGINT NOT NULL DEFAULT 0,
+    rating_3 BIGINT NOT NULL DEFAULT 0,
+    rating_4 BIGINT NOT NULL DEFAULT 0,
+    rating_5 BIGINT NOT NULL DEFAULT 0,
+    -- NULL until the book has a rated review
+    average_rating DOUBLE PRECISION GENERATED ALWAYS AS (
+        rating_sum::double precision / NULLIF(rating_1 + rating_2 + rating_3 + rating_4 + rating_5, 0)
+    ) STORED
+);
+
+-- Top-rated leaderboard: matches ORDER BY average_rating DESC, review_count DESC, book_id DESC
+CREATE INDEX IF NOT EXISTS idx_book_stats_top_rated
+    ON book_stats(average_rating DESC, review_count DESC, book_id DESC)
+    WHERE average_rating IS NOT NULL;
+
+-- One-off backfill for databases created before book_stats existed
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM reviews) AND NOT EXISTS (SELECT 1 FROM book_stats) THEN
+        INSERT INTO book_stats (book_id, review_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        SELECT book_id,
+               COUNT(*),
+               COALESCE(SUM(rating), 0),
+               COUNT(*) FILTER (WHERE rating = 1),
+               COUNT(*) FILTER (WHERE rating = 2),
+               COUNT(*) FILTER (WHERE rating = 3),
+               COUNT(*) FILTER (WHERE rating = 4),
+               COUNT(*) FILTER (WHERE rating = 5)
+        FROM reviews
+        GROUP BY book_id;
+    END IF;
+END $$;
@@ -0,0 +1,22 @@
+-- Full-text search: a weighted tsvector per row, kept up to date by Postgres itself
+ALTER TABLE books ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', title), 'A') || setweight(to_tsvector('english', author), 'B')
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_books_search ON books USING GIN (search_vector);
+
+ALTER TABLE reviews ADD COLUMN IF NOT EXISTS search_vector TSVECTOR GENERATED ALWAYS AS (
+    to_tsvector('english', content)
+) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_reviews_search ON reviews USING GIN (search_vector);
+
+-- Fuzzy (misspelled) author matches need the pg_trgm contrib extension, which the
+-- official postgres images ship. Without it book search matches whole words only.
+DO $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm') THEN
+        CREATE EXTENSION IF NOT EXISTS pg_trgm;
+        CREATE INDEX IF NOT EXISTS idx_books_author_trgm ON books USING GIN (author gin_trgm_ops);
+    END IF;
+END $$;
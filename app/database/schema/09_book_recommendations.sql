@@ -0,0 +1,12 @@
+-- Top-K most similar books per book, written by the offline job in
+-- app/database/recommendations.py (which replaces the whole table per run).
+-- No foreign keys: a row naming a deleted book is dropped by the join with books.
+CREATE TABLE IF NOT EXISTS book_recommendations (
+    book_id BIGINT NOT NULL,
+    rank SMALLINT NOT NULL,
+    similar_book_id BIGINT NOT NULL,
+    -- Cosine similarity of the two books' sets of readers who liked them
+    score REAL NOT NULL,
+    common_readers INT NOT NULL,
+    CONSTRAINT book_recommendations_pkey PRIMARY KEY (book_id, rank)
+);
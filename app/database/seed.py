@@ -1,100 +1,101 @@
-from app.database.core import get_connection
+from psycopg.rows import dict_row
 
-def seed_data():
+from app.database.queries.book_stats import add_reviews_to_book_stats
+from app.database.queries.timelines import fan_out_reviews, backfill_timeline
+
+# Module-level so the query-plan suite (tests/query_plans) can EXPLAIN them
+SEED_USER_SQL = """
+INSERT INTO users (name)
+SELECT %s
+WHERE NOT EXISTS (
+    SELECT 1 FROM users WHERE name = %s
+);
+"""
+
+SEED_BOOK_SQL = """
+INSERT INTO books (title, author)
+SELECT %s, %s
+WHERE NOT EXISTS (
+    SELECT 1 FROM books WHERE title = %s
+);
+"""
+
+SEED_REVIEW_SQL = """
+INSERT INTO reviews (user_id, book_id, rating, content)
+SELECT
+    u.id,
+    b.id,
+    5,
+    'Amazing tutorial seed review!'
+FROM users u, books b
+WHERE u.name = %s
+  AND b.title = %s
+  AND NOT EXISTS (
+      SELECT 1 FROM reviews r
+      WHERE r.user_id = u.id
+        AND r.book_id = b.id
+  )
+RETURNING id;
+"""
+
+SEED_FOLLOW_SQL = """
+WITH new_follow AS (
+    INSERT INTO followers (follower_id, followee_id)
+    SELECT uf.id, ut.id
+    FROM users uf, users ut
+    WHERE uf.name = %s
+      AND ut.name = %s
+      AND NOT EXISTS (
+          SELECT 1 FROM followers f
+          WHERE f.follower_id = uf.id
+            AND f.followee_id = ut.id
+      )
+    RETURNING follower_id, followee_id
+), counted AS (
+    UPDATE users
+    SET follower_count = follower_count + 1
+    FROM new_follow
+    WHERE users.id = new_follow.followee_id
+)
+SELECT follower_id, followee_id FROM new_follow;
+"""
+
+
+def seed_data(conn):
     """
     Seeds initial demo data idempotently.
     Each record checks by name/title before inserting,
     so seeds never duplicate across restarts.
+    Runs in the caller's transaction (see migrations.bootstrap,
+    which records the seed marker in the same one).
     """
 
-    conn_gen = get_connection()
-    conn = next(conn_gen)
-
-    try:
-        with conn.cursor() as cur:
-
-            # ---------------- USERS ----------------
-            users = ["Alice", "Bob", "Charlie"]
-
-            for username in users:
-                cur.execute(
-                    """
-                    INSERT INTO users (name)
-                    SELECT %s
-                    WHERE NOT EXISTS (
-                        SELECT 1 FROM users WHERE name = %s
-                    );
-                    """,
-                    (username, username),
-                )
-
-            # ---------------- BOOKS ----------------
-            books = [
-                ("The Seed Book", "John Seeder"),
-                ("Docker Magic", "Tariq Hasan"),
-            ]
+    with conn.cursor(row_factory=dict_row) as cur:
 
-            for (title, author) in books:
-                cur.execute(
-                    """
-                    INSERT INTO books (title, author)
-                    SELECT %s, %s
-                    WHERE NOT EXISTS (
-                        SELECT 1 FROM books WHERE title = %s
-                    );
-                    """,
-                    (title, author, title),
-                )
+        # ---------------- USERS ----------------
+        users = ["Alice", "Bob", "Charlie"]
 
-            # ---------------- REVIEWS ----------------
-            # Only insert if the specific user-book combination doesn't have a review
-            cur.execute(
-                """
-                INSERT INTO reviews (user_id, book_id, rating, content)
-                SELECT
-                    u.id,
-                    b.id,
-                    5,
-                    'Amazing tutorial seed review!'
-                FROM users u, books b
-                WHERE u.name = %s
-                  AND b.title = %s
-                  AND NOT EXISTS (
-                      SELECT 1 FROM reviews r
-                      WHERE r.user_id = u.id
-                        AND r.book_id = b.id
-                  );
-                """,
-                ("Alice", "The Seed Book"),
-            )
+        for username in users:
+            cur.execute(SEED_USER_SQL, (username, username))
 
-            # ---------------- FOLLOWERS ----------------
-            # Only insert if the specific follower-followee relationship doesn't exist
-            cur.execute(
-                """
-                INSERT INTO followers (follower_id, followee_id)
-                SELECT uf.id, ut.id
-                FROM users uf, users ut
-                WHERE uf.name = %s
-                  AND ut.name = %s
-                  AND NOT EXISTS (
-                      SELECT 1 FROM followers f
-                      WHERE f.follower_id = uf.id
-                        AND f.followee_id = ut.id
-                  );
-                """,
-                ("Alice", "Bob"),
-            )
+        # ---------------- BOOKS ----------------
+        books = [
+            ("The Seed Book", "John Seeder"),
+            ("Docker Magic", "Tariq Hasan"),
+        ]
 
-            conn.commit()
+        for (title, author) in books:
+            cur.execute(SEED_BOOK_SQL, (title, author, title))
 
-    finally:
-        try:
-            conn.close()
-        except:
-            pass
+        # ---------------- REVIEWS ----------------
+        # Only insert if the specific user-book combination doesn't have a review
+        cur.execute(SEED_REVIEW_SQL, ("Alice", "The Seed Book"))
+        review_ids = [review["id"] for review in cur.fetchall()]
+        fan_out_reviews(conn, review_ids=review_ids)
+        add_reviews_to_book_stats(conn, review_ids=review_ids)
 
-        try:
-            next(conn_gen)
-        except StopIteration:
-            pass
\ No newline at end of file
+        # ---------------- FOLLOWERS ----------------
+        # Only insert if the specific follower-followee relationship doesn't exist
+        cur.execute(SEED_FOLLOW_SQL, ("Alice", "Bob"))
+        for follow in cur.fetchall():
+            backfill_timeline(conn, **follow)
@@ -0,0 +1,233 @@
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+
+from psycopg import AsyncCursor, Cursor, pq
+from psycopg.types.numeric import Int8BinaryDumper, Int8Dumper
+
+from app.database.core import METRICS_ENABLED, PREPARED_STATEMENTS, SLOW_QUERY_LOG_SIZE, SLOW_QUERY_MS
+from app.metrics import DB_QUERY_ERRORS, DB_QUERY_ROWS, DB_QUERY_SECONDS
+
+# ------------------------------
+# Prepared statement registry
+# ------------------------------
+# Query modules register their hot SQL here under a name. Registered statements
+# run with psycopg's prepare=True, so each pooled connection parses and plans
+# them once and afterwards only sends Bind/Execute. Statements registered with
+# `warm` params are prepared when the pool opens a connection, before it serves
+# a request; writes can't be run safely at that point and prepare on first use.
+#
+# psycopg keys its prepared statements on the SQL text and the parameter types,
+# and dumps a Python int as int2, int4 or int8 depending on its value. Pooled
+# connections dump every int as int8 (all ids are BIGINT), so one prepared
+# statement serves every id.
+
+# Any timezone-aware datetime: keyset cursors bind created_at as timestamptz
+WARM_TIMESTAMP = datetime(2000, 1, 1, tzinfo=timezone.utc)
+
+
+class Statement:
+
+    def __init__(self, name: str, sql: str, warm: dict | None = None):
+        self.name = name
+        self.sql = sql
+        self.warm = warm
+        self.executions = 0
+
+
+STATEMENTS: dict[str, Statement] = {}
+_by_sql: dict[str, Statement] = {}
+_lock = threading.Lock()
+_connections_warmed = 0
+
+
+def register(name: str, sql: str, *, warm: dict | None = None) -> Statement:
+    """
+    Register `sql` under `name`. `warm` are parameters that make the statement
+    cheap to run (e.g. limit 0), used to prepare it on every new connection.
+    """
+    if name in STATEMENTS and STATEMENTS[name].sql != sql:
+        raise ValueError(f"Statement {name!r} is already registered with different SQL")
+    statement = Statement(name, sql, warm)
+    STATEMENTS[name] = statement
+    _by_sql[sql] = statement
+    return statement
+
+
+def execute(cur, sql: str, params=None):
+    """
+    cur.execute() for query modules: registered statements are counted and run
+    prepared. Returns whatever cur.execute returns, so async callers await it.
+    """
+    statement = _by_sql.get(sql)
+    if statement is None or not PREPARED_STATEMENTS:
+        return cur.execute(sql, params)
+    with _lock:
+        statement.executions += 1
+    return cur.execute(sql, params, prepare=True)
+
+
+# ------------------------------
+# Timed cursors
+# ------------------------------
+# Pooled connections create these instead of plain cursors (METRICS_ENABLED),
+# so every statement the query layer runs is timed. A statement is labelled
+# with its registered name, or else with the function that ran it. Statements
+# queued in pipeline mode return before their results arrive; execute_pipelined
+# times the whole batch instead.
+
+def _is_psycopg(frame) -> bool:
+    module = frame.f_globals.get("__name__", "")
+    return module == "psycopg" or module.startswith("psycopg.")
+
+
+def _query_name(sql, caller) -> str:
+    statement = _by_sql.get(sql) if isinstance(sql, str) else None
+    if statement is not None:
+        return statement.name
+    # Skip execute() above and psycopg's own frames (conn.execute)
+    while caller.f_code is execute.__code__ or _is_psycopg(caller):
+        caller = caller.f_back
+    return caller.f_code.co_name
+
+
+# ------------------------------
+# Slow-query log
+# ------------------------------
+# Timed statements above SLOW_QUERY_MS are logged with the shape of their
+# parameters (types and list lengths, never values) and kept in a ring buffer.
+logger = logging.getLogger(__name__)
+_slow_queries: deque = deque(maxlen=SLOW_QUERY_LOG_SIZE)
+
+
+def _shape(value):
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def params_shape(params):
+    """{"review_ids": "list[120]", "limit": "int"} for the given params; tuples and batches item by item."""
+    if isinstance(params, (list, tuple)):
+        return [_shape(item) for item in params]
+    return _shape(params) if params is not None else None
+
+
+def _log_slow_query(name: str, elapsed: float, rowcount: int, params) -> None:
+    entry = {
+        "query": name,
+        "duration_ms": round(elapsed * 1000, 2),
+        "rows": rowcount,
+        "params": params_shape(params),
+        "at": datetime.now(timezone.utc).isoformat(),
+    }
+    _slow_queries.append(entry)
+    logger.warning("slow query %s: %.1fms, %d rows, params %s", name, entry["duration_ms"], rowcount, entry["params"])
+
+
+def get_slow_queries() -> list[dict]:
+    """The most recent slow statements, newest first."""
+    return list(reversed(_slow_queries))
+
+
+def record_query(name: str, started: float, rowcount: int, params=None) -> None:
+    """Observe one statement or batch that started at perf_counter() `started`."""
+    if not METRICS_ENABLED:
+        return
+    elapsed = time.perf_counter() - started
+    DB_QUERY_SECONDS.observe(elapsed, name)
+    if rowcount > 0:
+        DB_QUERY_ROWS.inc(name, amount=rowcount)
+    if 0 <= SLOW_QUERY_MS <= elapsed * 1000:
+        _log_slow_query(name, elapsed, rowcount, params)
+
+
+def record_query_error(name: str) -> None:
+    if METRICS_ENABLED:
+        DB_QUERY_ERRORS.inc(name)
+
+
+class TimedCursor(Cursor):
+
+    def execute(self, query, params=None, **kwargs):
+        if self.connection.pgconn.pipeline_status != pq.PipelineStatus.OFF:
+            return super().execute(query, params, **kwargs)
+        name = _query_name(query, sys._getframe(1))
+        started = time.perf_counter()
+        try:
+            super().execute(query, params, **kwargs)
+        except Exception:
+            record_query_error(name)
+            raise
+        record_query(name, started, self.rowcount, params)
+        return self
+
+
+class AsyncTimedCursor(AsyncCursor):
+
+    async def execute(self, query, params=None, **kwargs):
+        if self.connection.pgconn.pipeline_status != pq.PipelineStatus.OFF:
+            return await super().execute(query, params, **kwargs)
+        name = _query_name(query, sys._getframe(1))
+        started = time.perf_counter()
+        try:
+            await super().execute(query, params, **kwargs)
+        except Exception:
+            record_query_error(name)
+            raise
+        record_query(name, started, self.rowcount, params)
+        return self
+
+
+def _use_int8_params(conn) -> None:
+    conn.adapters.register_dumper(int, Int8Dumper)
+    conn.adapters.register_dumper(int, Int8BinaryDumper)
+
+
+def _warmable() -> list[Statement]:
+    global _connections_warmed
+    with _lock:
+        _connections_warmed += 1
+        return [statement for statement in STATEMENTS.values() if statement.warm is not None]
+
+
+def configure_connection(conn) -> None:
+    """
+    Pool `configure` callback: prepares the warmable statements on a new
+    connection, then times its cursors.
+    """
+    if PREPARED_STATEMENTS:
+        _use_int8_params(conn)
+        with conn.cursor() as cur:
+            for statement in _warmable():
+                cur.execute(statement.sql, statement.warm, prepare=True)
+        conn.commit()
+    if METRICS_ENABLED:
+        conn.cursor_factory = TimedCursor
+
+
+async def configure_async_connection(conn) -> None:
+    if PREPARED_STATEMENTS:
+        _use_int8_params(conn)
+        async with conn.cursor() as cur:
+            for statement in _warmable():
+                await cur.execute(statement.sql, statement.warm, prepare=True)
+        await conn.commit()
+    if METRICS_ENABLED:
+        conn.cursor_factory = AsyncTimedCursor
+
+
+def get_statement_stats() -> dict:
+    """
+    Executions per registered statement, for /health/statements.
+    """
+    return {
+        "enabled": PREPARED_STATEMENTS,
+        "connections_warmed": _connections_warmed,
+        "statements": {name: statement.executions for name, statement in STATEMENTS.items()},
+    }
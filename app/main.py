@@ -1,110 +1,447 @@
 import asyncio
+import time
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 
 from app.bizlogic import books as books_bl
 from app.bizlogic import follows as follows_bl
 from app.bizlogic import reviews as reviews_bl
 from app.bizlogic import users as users_bl
-from app.database.core import get_connection
-from app.database.seed import seed_data
-from app.models.books import BookCreate
-from app.models.reviews import ReviewCreate
-from app.models.users import UserCreate
+from app.database.core import METRICS_ENABLED, get_connection, open_pool, close_pool, get_pool_stats
+from app.database.cache import get_cache_stats
+from app.database.follow_graph import get_follow_graph_stats
+from app.database.migrations import bootstrap, get_startup_stats, record_startup
+from app.database.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, set_next_cursor
+from app.database.queries.follows import start_follow_graph, stop_follow_graph
+from app.database.replicas import get_read_connection, get_replica_stats, set_read_your_writes
+from app.database.statements import get_slow_queries, get_statement_stats
+from app.metrics import CONTENT_TYPE, MetricsMiddleware, render_metrics
+from app.models.admin import require_admin
+from app.models.batch import requested_ids, review_expansions
+from app.models.books import (
+    BookCreate,
+    BookOut,
+    BookSearchOut,
+    BookStatsOut,
+    RecommendedBookOut,
+    SimilarBookOut,
+    TopRatedBookOut,
+)
+from app.models.bulk import BulkResult, read_bulk_rows
+from app.models.conditional import collection_validators, entity_validators, is_not_modified, not_modified_response
+from app.models.export import ndjson_response, wants_ndjson
+from app.models.responses import rows_response
+from app.models.reviews import ExpandedReviewOut, ReviewCreate, ReviewSearchOut
+from app.models.users import FollowCountsOut, RelationshipOut, SuggestedUserOut, UserCreate, UserOut
+from app.profiling import MAX_PROFILE_SECONDS, ProfilerBusy, sample_profile
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Run the synchronous seeding in a threadpool and wait for it to finish
-    print("seeding data from fastapi hook")
-    await asyncio.to_thread(seed_data)
+    started = time.perf_counter()
+    # Migrate and seed if this database needs it; one query when it doesn't
+    stats = await asyncio.to_thread(bootstrap)
+    # Fill the connection pool before serving so the first requests don't pay the connect cost
+    await asyncio.to_thread(open_pool)
+    # Load the follow graph before serving; a daemon thread reloads it from then on
+    await asyncio.to_thread(start_follow_graph)
+    stats["ready_s"] = round(time.perf_counter() - started, 4)
+    record_startup(stats)
     yield  # after this, FastAPI starts handling requests
+    await asyncio.to_thread(stop_follow_graph)
+    await asyncio.to_thread(close_pool)
 
 
 app = FastAPI(title="Goodreads Clone Backend", lifespan=lifespan)
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
 
 
 # ------------------------------
 # User Routes
 # ------------------------------
-@app.get("/users")
-def api_list_users(conn=Depends(get_connection)):
-    return users_bl.list_users(conn)
+@app.get("/users", response_model=list[UserOut])
+def api_list_users(
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        stream: bool = False,
+        ids: list[int] | None = Depends(requested_ids),
+        conn=Depends(get_read_connection),
+):
+    if ids is not None:
+        return rows_response(users_bl.get_users(conn, ids))
+    if wants_ndjson(request, stream):
+        return ndjson_response(users_bl.iter_users(conn, after=after))
+    validators = collection_validators("users", users_bl.get_users_version(conn))
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    users = users_bl.list_users(conn, limit=limit, after=after)
+    set_next_cursor(response, users, limit, "id")
+    response.headers.update(validators)
+    return rows_response(users, response)
 
 
-@app.get("/users/{user_id}")
-def api_get_user(user_id: int, conn=Depends(get_connection)):
+@app.get("/users/{user_id}", response_model=UserOut)
+def api_get_user(user_id: int, request: Request, response: Response, conn=Depends(get_read_connection)):
     user = users_bl.get_user(conn, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    return user
+    validators = entity_validators("user", user)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators)
+    return rows_response(user, response)
 
 
 @app.post("/users")
-def api_create_user(user: UserCreate, conn=Depends(get_connection)):
-    return users_bl.insert_user(conn, name=user.name)
+def api_create_user(user: UserCreate, response: Response, conn=Depends(get_connection)):
+    result = users_bl.insert_user(conn, name=user.name)
+    set_read_your_writes(response, conn)
+    return result
+
+
+@app.post("/users/bulk", response_model=BulkResult)
+def api_bulk_create_users(response: Response, rows: list = Depends(read_bulk_rows), conn=Depends(get_connection)):
+    result = users_bl.bulk_insert_users(conn, rows)
+    set_read_your_writes(response, conn)
+    return result
 
 
 # ------------------------------
 # Book Routes
 # ------------------------------
-@app.get("/books")
-def api_list_books(conn=Depends(get_connection)):
-    return books_bl.list_books(conn)
+@app.get("/books", response_model=list[BookOut])
+def api_list_books(
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        stream: bool = False,
+        ids: list[int] | None = Depends(requested_ids),
+        conn=Depends(get_read_connection),
+):
+    if ids is not None:
+        return rows_response(books_bl.get_books(conn, ids))
+    if wants_ndjson(request, stream):
+        return ndjson_response(books_bl.iter_books(conn, after=after))
+    validators = collection_validators("books", books_bl.get_books_version(conn))
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    books = books_bl.list_books(conn, limit=limit, after=after)
+    set_next_cursor(response, books, limit, "id")
+    response.headers.update(validators)
+    return rows_response(books, response)
+
+
+# Declared before /books/{book_id} so "search" isn't parsed as an id
+@app.get("/books/search", response_model=list[BookSearchOut])
+def api_search_books(
+        response: Response,
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        conn=Depends(get_read_connection),
+):
+    books = books_bl.search_books(conn, q=q, limit=limit, after=after)
+    set_next_cursor(response, books, limit, "rank", "id")
+    return rows_response(books, response)
 
 
-@app.get("/books/{book_id}")
-def api_get_book(book_id: int, conn=Depends(get_connection)):
+# Declared before /books/{book_id} so "top-rated" isn't parsed as an id
+@app.get("/books/top-rated", response_model=list[TopRatedBookOut])
+def api_list_top_rated_books(
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        min_reviews: int = Query(1, ge=1),
+        after: str | None = None,
+        conn=Depends(get_read_connection),
+):
+    books = books_bl.list_top_rated(conn, limit=limit, min_reviews=min_reviews, after=after)
+    set_next_cursor(response, books, limit, "average_rating", "review_count", "id")
+    return rows_response(books, response)
+
+
+@app.get("/books/{book_id}", response_model=BookOut)
+def api_get_book(book_id: int, request: Request, response: Response, conn=Depends(get_read_connection)):
     book = books_bl.get_book(conn, book_id)
     if not book:
         raise HTTPException(status_code=404, detail="Book not found")
-    return book
+    validators = entity_validators("book", book)
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    response.headers.update(validators)
+    return rows_response(book, response)
+
+
+@app.get("/books/{book_id}/stats", response_model=BookStatsOut)
+def api_get_book_stats(book_id: int, conn=Depends(get_read_connection)):
+    stats = books_bl.get_book_stats(conn, book_id)
+    if not stats:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return rows_response(stats)
+
+
+@app.get("/books/{book_id}/similar", response_model=list[SimilarBookOut])
+def api_get_similar_books(
+        book_id: int,
+        limit: int = Query(10, ge=1, le=100),
+        conn=Depends(get_read_connection),
+):
+    books = books_bl.get_similar_books(conn, book_id, limit=limit)
+    if books is None:
+        raise HTTPException(status_code=404, detail="Book not found")
+    return rows_response(books)
 
 
 @app.post("/books")
-def api_create_book(book: BookCreate, conn=Depends(get_connection)):
-    return books_bl.insert_book(conn, title=book.title, author=book.author)
+def api_create_book(book: BookCreate, response: Response, conn=Depends(get_connection)):
+    result = books_bl.insert_book(conn, title=book.title, author=book.author)
+    set_read_your_writes(response, conn)
+    return result
+
+
+@app.post("/books/bulk", response_model=BulkResult)
+def api_bulk_create_books(response: Response, rows: list = Depends(read_bulk_rows), conn=Depends(get_connection)):
+    result = books_bl.bulk_insert_books(conn, rows)
+    set_read_your_writes(response, conn)
+    return result
 
 
 # ------------------------------
 # Review Routes
 # ------------------------------
 @app.post("/reviews")
-def api_add_review(review: ReviewCreate, conn=Depends(get_connection)):
-    return reviews_bl.add_review(
+def api_add_review(review: ReviewCreate, response: Response, conn=Depends(get_connection)):
+    result = reviews_bl.add_review(
         conn,
         user_id=review.user_id,
         book_id=review.book_id,
         rating=review.rating,
         content=review.content,
     )
+    set_read_your_writes(response, conn)
+    return result
+
 
+@app.post("/reviews/bulk", response_model=BulkResult)
+def api_bulk_add_reviews(response: Response, rows: list = Depends(read_bulk_rows), conn=Depends(get_connection)):
+    result = reviews_bl.bulk_add_reviews(conn, rows)
+    set_read_your_writes(response, conn)
+    return result
 
-@app.get("/users/{user_id}/reviews")
-def api_list_reviews_by_user(user_id: int, conn=Depends(get_connection)):
-    return reviews_bl.list_reviews_by_user(conn, user_id)
 
+@app.get("/reviews/search", response_model=list[ReviewSearchOut])
+def api_search_reviews(
+        response: Response,
+        q: str = Query(..., min_length=1, max_length=200),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        conn=Depends(get_read_connection),
+):
+    reviews = reviews_bl.search_reviews(conn, q=q, limit=limit, after=after)
+    set_next_cursor(response, reviews, limit, "rank", "id")
+    return rows_response(reviews, response)
 
-@app.get("/books/{book_id}/reviews")
-def api_list_reviews_by_book(book_id: int, conn=Depends(get_connection)):
-    return reviews_bl.list_reviews_by_book(conn, book_id)
+
+@app.get("/users/{user_id}/reviews", response_model=list[ExpandedReviewOut])
+def api_list_reviews_by_user(
+        user_id: int,
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        stream: bool = False,
+        expand: frozenset[str] = Depends(review_expansions),
+        conn=Depends(get_read_connection),
+):
+    if wants_ndjson(request, stream):
+        return ndjson_response(reviews_bl.iter_reviews_by_user(conn, user_id, after=after))
+    reviews = reviews_bl.list_reviews_by_user(conn, user_id, limit=limit, after=after)
+    set_next_cursor(response, reviews, limit, "created_at", "id")
+    if expand:
+        reviews = reviews_bl.expand_reviews(conn, reviews, expand)
+    return rows_response(reviews, response)
+
+
+@app.get("/books/{book_id}/reviews", response_model=list[ExpandedReviewOut])
+def api_list_reviews_by_book(
+        book_id: int,
+        request: Request,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        stream: bool = False,
+        expand: frozenset[str] = Depends(review_expansions),
+        conn=Depends(get_read_connection),
+):
+    if wants_ndjson(request, stream):
+        return ndjson_response(reviews_bl.iter_reviews_by_book(conn, book_id, after=after))
+    validators = collection_validators(f"book-{book_id}-reviews", reviews_bl.get_book_reviews_version(conn, book_id))
+    if is_not_modified(request, validators):
+        return not_modified_response(validators)
+    reviews = reviews_bl.list_reviews_by_book(conn, book_id, limit=limit, after=after)
+    set_next_cursor(response, reviews, limit, "created_at", "id")
+    if expand:
+        reviews = reviews_bl.expand_reviews(conn, reviews, expand)
+    response.headers.update(validators)
+    return rows_response(reviews, response)
 
 
 # ------------------------------
 # Follow / Newsfeed Routes
 # ------------------------------
 @app.post("/follow/{followee_id}")
-def api_follow_user(followee_id: int, follower_id: int, conn=Depends(get_connection)):
-    return follows_bl.follow_user(conn, follower_id=follower_id, followee_id=followee_id)
+def api_follow_user(followee_id: int, follower_id: int, response: Response, conn=Depends(get_connection)):
+    result = follows_bl.follow_user(conn, follower_id=follower_id, followee_id=followee_id)
+    set_read_your_writes(response, conn)
+    return result
 
 
 @app.post("/unfollow/{followee_id}")
-def api_unfollow_user(followee_id: int, follower_id: int, conn=Depends(get_connection)):
+def api_unfollow_user(followee_id: int, follower_id: int, response: Response, conn=Depends(get_connection)):
     follows_bl.unfollow_user(conn, follower_id=follower_id, followee_id=followee_id)
+    set_read_your_writes(response, conn)
     return {"status": "ok"}
 
 
-@app.get("/users/{user_id}/newsfeed")
-def api_get_newsfeed(user_id: int, conn=Depends(get_connection)):
-    return follows_bl.get_newsfeed(conn, user_id)
+@app.get("/users/{user_id}/newsfeed", response_model=list[ExpandedReviewOut])
+def api_get_newsfeed(
+        user_id: int,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        expand: frozenset[str] = Depends(review_expansions),
+        conn=Depends(get_read_connection),
+):
+    feed = follows_bl.get_newsfeed(conn, user_id, limit=limit, after=after)
+    set_next_cursor(response, feed, limit, "created_at", "id")
+    if expand:
+        feed = reviews_bl.expand_reviews(conn, feed, expand)
+    return rows_response(feed, response)
+
+
+@app.get("/users/{user_id}/followers", response_model=list[UserOut])
+def api_list_followers(
+        user_id: int,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        conn=Depends(get_read_connection),
+):
+    users = follows_bl.list_followers(conn, user_id, limit=limit, after=after)
+    if users is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    set_next_cursor(response, users, limit, "id")
+    return rows_response(users, response)
+
+
+@app.get("/users/{user_id}/following", response_model=list[UserOut])
+def api_list_following(
+        user_id: int,
+        response: Response,
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        after: str | None = None,
+        conn=Depends(get_read_connection),
+):
+    users = follows_bl.list_following(conn, user_id, limit=limit, after=after)
+    if users is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    set_next_cursor(response, users, limit, "id")
+    return rows_response(users, response)
+
+
+@app.get("/users/{user_id}/follow-counts", response_model=FollowCountsOut)
+def api_get_follow_counts(user_id: int, conn=Depends(get_read_connection)):
+    counts = follows_bl.get_follow_counts(conn, user_id)
+    if counts is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return counts
+
+
+@app.get("/users/{user_id}/follows/{other_id}", response_model=RelationshipOut)
+def api_get_relationship(user_id: int, other_id: int, conn=Depends(get_read_connection)):
+    return follows_bl.get_relationship(conn, user_id, other_id)
+
+
+@app.get("/users/{user_id}/suggestions", response_model=list[SuggestedUserOut])
+def api_suggest_users(
+        user_id: int,
+        limit: int = Query(10, ge=1, le=100),
+        conn=Depends(get_read_connection),
+):
+    users = follows_bl.suggest_users(conn, user_id, limit=limit)
+    if users is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rows_response(users)
+
+
+@app.get("/users/{user_id}/recommendations", response_model=list[RecommendedBookOut])
+def api_get_recommendations(
+        user_id: int,
+        limit: int = Query(10, ge=1, le=100),
+        conn=Depends(get_read_connection),
+):
+    books = users_bl.get_recommendations(conn, user_id, limit=limit)
+    if books is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return rows_response(books)
+
+
+# ------------------------------
+# Health Routes
+# ------------------------------
+@app.get("/health/db-pool")
+def api_db_pool_stats():
+    return get_pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+def api_metrics():
+    return Response(render_metrics(get_pool_stats()), media_type=CONTENT_TYPE)
+
+
+@app.get("/health/replicas")
+def api_replica_stats():
+    return get_replica_stats()
+
+
+@app.get("/health/startup")
+def api_startup_stats():
+    return get_startup_stats()
+
+
+@app.get("/health/cache")
+def api_cache_stats():
+    return get_cache_stats()
+
+
+@app.get("/health/follow-graph")
+def api_follow_graph_stats():
+    return get_follow_graph_stats()
+
+
+@app.get("/health/statements")
+def api_statement_stats():
+    return get_statement_stats()
+
+
+# ------------------------------
+# Admin Routes
+# ------------------------------
+@app.get("/admin/slow-queries", dependencies=[Depends(require_admin)])
+def api_slow_queries():
+    return get_slow_queries()
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+def api_profile(
+        seconds: float = Query(10, gt=0, le=MAX_PROFILE_SECONDS),
+        top: int = Query(25, ge=1, le=200),
+):
+    try:
+        return sample_profile(seconds, top=top)
+    except ProfilerBusy as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
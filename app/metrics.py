@@ -0,0 +1,186 @@
+import threading
+import time
+from bisect import bisect_left
+
+# ------------------------------
+# Prometheus metrics
+# ------------------------------
+# A minimal in-process registry rendered in the Prometheus text format at
+# GET /metrics. Observing is a dict lookup, a bisect and a few increments
+# under a lock (sync routes and their queries run on threadpool threads).
+# Every uvicorn worker keeps its own registry, so scrape each worker (or run
+# one worker per container) rather than a shared port.
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY: list = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._series: dict[tuple, list] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def _new_series(self) -> list:
+        return [0]
+
+    def _get(self, labels: tuple) -> list:
+        series = self._series.get(labels)
+        if series is None:
+            with self._lock:
+                series = self._series.setdefault(labels, self._new_series())
+        return series
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type}"]
+        with self._lock:
+            series = [(labels, list(values)) for labels, values in self._series.items()]
+        for labels, values in series:
+            lines.extend(self._render_series(labels, values))
+        return lines
+
+    def _render_series(self, labels: tuple, values: list) -> list[str]:
+        return [f"{self.name}{_labels(self.labelnames, labels)} {values[0]}"]
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        series = self._get(labels)
+        with self._lock:
+            series[0] += amount
+
+
+class Gauge(_Metric):
+    type = "gauge"
+
+    def inc(self, *labels, amount: float = 1) -> None:
+        series = self._get(labels)
+        with self._lock:
+            series[0] += amount
+
+    def dec(self, *labels, amount: float = 1) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def set(self, value: float, *labels) -> None:
+        series = self._get(labels)
+        with self._lock:
+            series[0] = value
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets=LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def _new_series(self) -> list:
+        # One count per bucket, one for +Inf, then the sum
+        return [0] * (len(self.buckets) + 1) + [0.0]
+
+    def observe(self, value: float, *labels) -> None:
+        series = self._get(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series[index] += 1
+            series[-1] += value
+
+    def _render_series(self, labels: tuple, values: list) -> list[str]:
+        lines, cumulative = [], 0
+        for bound, count in zip((*self.buckets, "+Inf"), values[:-1]):
+            cumulative += count
+            le = f'le="{bound}"'
+            lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}")
+        lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {values[-1]}")
+        lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route"),
+)
+HTTP_RESPONSES = Counter(
+    "http_responses_total", "Responses by route template and status code.", ("method", "route", "status"),
+)
+HTTP_IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being served.")
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_duration_seconds",
+    "Statement execution time, by registered statement name or calling query function.",
+    ("query",),
+)
+DB_QUERY_ROWS = Counter("db_query_rows_total", "Rows returned or affected per query.", ("query",))
+DB_QUERY_ERRORS = Counter("db_query_errors_total", "Statements that raised, per query.", ("query",))
+DB_POOL_WAIT_SECONDS = Histogram("db_pool_wait_seconds", "Time to acquire a pooled connection.")
+
+
+def render_metrics(pool_stats: dict | None = None) -> str:
+    """
+    Every registered metric in the Prometheus text format, plus the pool's
+    counters (from get_pool_stats) as db_pool_* gauges.
+    """
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.render())
+    for key, value in (pool_stats or {}).items():
+        lines.append(f"# TYPE db_pool_{key} gauge")
+        lines.append(f"db_pool_{key} {value}")
+    return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request under its route template
+    (e.g. /users/{user_id}), which FastAPI leaves in scope["route"] once matched.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Unhandled exceptions never reach http.response.start and count as 500s
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            HTTP_IN_FLIGHT.dec()
+            route = scope.get("route")
+            template = getattr(route, "path", "unmatched")
+            method = scope["method"]
+            HTTP_REQUEST_SECONDS.observe(elapsed, method, template)
+            HTTP_RESPONSES.inc(method, template, status)
@@ -0,0 +1,16 @@
+import hmac
+
+from fastapi import Header, HTTPException
+
+from app.database.core import ADMIN_TOKEN
+
+
+def require_admin(x_admin_token: str | None = Header(None)) -> None:
+    """
+    Dependency guarding the /admin routes: the X-Admin-Token header must match
+    ADMIN_TOKEN. Without ADMIN_TOKEN configured the routes don't exist.
+    """
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
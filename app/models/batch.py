@@ -0,0 +1,38 @@
+from fastapi import HTTPException, Query
+
+from app.database.pagination import MAX_PAGE_SIZE
+
+# ------------------------------
+# Multi-get and expansions
+# ------------------------------
+# A client rendering a page of reviews needs their users and books. Instead of
+# a GET /users/{id} and a GET /books/{id} per review, it can ask for up to
+# MAX_PAGE_SIZE of them at once with ?ids=1,2,3, or have them embedded in the
+# page with ?expand=user,book. Both read through the entity caches and look up
+# the rest with one `id = ANY(...)` query.
+
+REVIEW_EXPANSIONS = ("user", "book")
+
+
+def requested_ids(
+        ids: str | None = Query(None, description="Comma-separated ids to get instead of a page"),
+) -> list[int] | None:
+    if ids is None:
+        return None
+    try:
+        values = [int(value) for value in ids.split(",") if value.strip()]
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers") from exc
+    if len(values) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_PAGE_SIZE} ids per request")
+    return values
+
+
+def review_expansions(
+        expand: str | None = Query(None, description="Referenced rows to embed: user, book or user,book"),
+) -> frozenset[str]:
+    names = {name.strip() for name in expand.split(",") if name.strip()} if expand else set()
+    unknown = names.difference(REVIEW_EXPANSIONS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown expansion: {', '.join(sorted(unknown))}")
+    return frozenset(names)
@@ -1,6 +1,51 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.fields import Text
 
 
 class BookCreate(BaseModel):
+    title: Text = Field(max_length=255)
+    author: Text = Field(max_length=255)
+
+
+class BookOut(BaseModel):
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
     title: str
     author: str
+    created_at: datetime
+
+
+class BookStatsOut(BaseModel):
+    book_id: int
+    review_count: int
+    # None until the book has a rated review
+    average_rating: float | None
+    # Review count per star, keyed "1" to "5"
+    ratings: dict[str, int]
+
+
+class BookSearchOut(BookOut):
+    rank: float
+    # The title with matched words wrapped in <mark></mark>
+    snippet: str
+
+
+class SimilarBookOut(BookOut):
+    # Cosine similarity of the two books' readers who liked them
+    score: float
+    common_readers: int
+
+
+class RecommendedBookOut(BookOut):
+    # Summed similarity to the reader's latest liked books
+    score: float
+
+
+class TopRatedBookOut(BookOut):
+    review_count: int
+    average_rating: float
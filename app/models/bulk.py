@@ -0,0 +1,129 @@
+import json
+import re
+
+from fastapi import HTTPException, Request
+from pydantic import BaseModel, ValidationError
+
+from app.database.core import BULK_MAX_BYTES, BULK_MAX_ROWS
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"[ \t\n\r]*")
+
+
+class BulkRowError(BaseModel):
+    index: int
+    detail: str | list
+
+
+class BulkResult(BaseModel):
+    inserted: int
+    # One entry per input row: the generated id, or None when the row was rejected
+    ids: list[int | None]
+    errors: list[BulkRowError]
+
+
+async def read_bulk_rows(request: Request) -> list:
+    """
+    Parse a bulk body: a JSON array, or NDJSON (one object per line) when
+    sent as application/x-ndjson. Rows are validated later, one by one.
+
+    Oversized batches are refused before they're parsed whole: on their
+    Content-Length, once BULK_MAX_BYTES have been read, or as soon as the
+    row after the BULK_MAX_ROWS-th one is parsed.
+    """
+    content_length = request.headers.get("content-length", "")
+    if content_length.isdigit() and int(content_length) > BULK_MAX_BYTES:
+        raise _too_many_bytes()
+    try:
+        if request.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+            return await _read_ndjson(request)
+        body = bytearray()
+        async for chunk in _body_chunks(request):
+            body += chunk
+        return _parse_array(body.decode())
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail="Malformed JSON body") from exc
+
+
+def _too_many_bytes() -> HTTPException:
+    return HTTPException(status_code=413, detail=f"At most {BULK_MAX_BYTES} bytes per request")
+
+
+def _add_row(rows: list, row) -> None:
+    rows.append(row)
+    if len(rows) > BULK_MAX_ROWS:
+        raise HTTPException(status_code=413, detail=f"At most {BULK_MAX_ROWS} rows per request")
+
+
+async def _body_chunks(request: Request):
+    size = 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > BULK_MAX_BYTES:
+            raise _too_many_bytes()
+        yield chunk
+
+
+async def _read_ndjson(request: Request) -> list:
+    # Lines are parsed as they arrive; `pending` holds the unfinished last one
+    rows, pending = [], bytearray()
+    async for chunk in _body_chunks(request):
+        pending += chunk
+        end = pending.rfind(b"\n")
+        if end < 0:
+            continue
+        for line in pending[:end].splitlines():
+            if line.strip():
+                _add_row(rows, json.loads(line))
+        del pending[:end + 1]
+    if pending.strip():
+        _add_row(rows, json.loads(pending))
+    return rows
+
+
+def _parse_array(text: str) -> list:
+    # One element at a time, so the row cap stops parsing early
+    index = _whitespace.match(text).end()
+    if not text.startswith("[", index):
+        json.loads(text)
+        raise HTTPException(status_code=400, detail="Expected a JSON array of objects")
+    rows = []
+    index = _whitespace.match(text, index + 1).end()
+    if text.startswith("]", index):
+        index += 1
+    else:
+        while True:
+            row, index = _decoder.raw_decode(text, index)
+            _add_row(rows, row)
+            index = _whitespace.match(text, index).end()
+            if text.startswith("]", index):
+                index += 1
+                break
+            if not text.startswith(",", index):
+                raise ValueError(f"Expected ',' or ']' at {index}")
+            index = _whitespace.match(text, index + 1).end()
+    if _whitespace.match(text, index).end() < len(text):
+        raise ValueError("Extra data after the array")
+    return rows
+
+
+def validate_rows(model: type[BaseModel], rows: list) -> tuple[list[tuple[int, BaseModel]], list[BulkRowError]]:
+    """
+    Split raw rows into (index, model) pairs and per-row errors.
+    """
+    valid, errors = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, model.model_validate(row)))
+        except ValidationError as exc:
+            errors.append(BulkRowError(index=index, detail=exc.errors(include_url=False, include_context=False)))
+    return valid, errors
+
+
+def bulk_result(total: int, loaded: list[tuple[int, BaseModel]], ids: list[int], errors: list[BulkRowError]) -> BulkResult:
+    aligned = [None] * total
+    for (index, _), new_id in zip(loaded, ids):
+        aligned[index] = new_id
+    return BulkResult(inserted=len(ids), ids=aligned, errors=sorted(errors, key=lambda e: e.index))
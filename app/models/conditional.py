@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+
+from app.database.core import HTTP_CACHE_MAX_AGE
+
+# ------------------------------
+# Conditional GET
+# ------------------------------
+# Read routes look up a cheap version for what they serve before running the
+# real query. When the client's If-None-Match / If-Modified-Since still
+# matches, they answer 304 without querying or serializing the rows. The
+# version is read first, so a write racing the page query can only make the
+# ETag older than the body (one extra 200 later), never a wrong 304.
+#
+# Collections get an ETag only. Their versions count commits, but no
+# timestamp on hand is taken at commit, so a Last-Modified could stay put
+# while a slow writer's rows become visible.
+
+CACHE_CONTROL = f"public, max-age={HTTP_CACHE_MAX_AGE}, must-revalidate"
+
+
+def _stamp(moment: datetime | None) -> int:
+    return int(moment.timestamp() * 1_000_000) if moment else 0
+
+
+def _validators(etag: str, modified_at: datetime | None) -> dict[str, str]:
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if modified_at:
+        headers["Last-Modified"] = format_datetime(modified_at.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def collection_validators(scope: str, version: dict | None) -> dict[str, str]:
+    """
+    Headers for a collection from its {"version"} row (None: never written).
+    The list routes also serve NDJSON off Accept, hence the Vary.
+    """
+    etag = f'W/"{scope}-{version["version"] if version else 0}"'
+    return {**_validators(etag, None), "Vary": "Accept"}
+
+
+def entity_validators(scope: str, row: dict) -> dict[str, str]:
+    """
+    Headers for a user or book row; those never change once inserted.
+    """
+    etag = f'W/"{scope}-{row["id"]}-{_stamp(row["created_at"])}"'
+    return _validators(etag, row["created_at"])
+
+
+def _opaque(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+
+def is_not_modified(request: Request, validators: dict[str, str]) -> bool:
+    """
+    RFC 9110 evaluation for GET: If-None-Match (weak comparison) wins;
+    If-Modified-Since is only looked at without it.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        etag = _opaque(validators["ETag"])
+        return any(_opaque(tag) == etag for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = validators.get("Last-Modified")
+    if not if_modified_since or not last_modified:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return parsedate_to_datetime(last_modified) <= since
+
+
+def not_modified_response(validators: dict[str, str]) -> Response:
+    return Response(status_code=304, headers=validators)
@@ -0,0 +1,34 @@
+from typing import AsyncIterable, Iterable
+
+import orjson
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+from app.models.bulk import NDJSON_MEDIA_TYPE
+
+
+def wants_ndjson(request: Request, stream: bool) -> bool:
+    """
+    A list route streams its whole result set as NDJSON when asked with
+    ?stream=1 or Accept: application/x-ndjson.
+    """
+    return stream or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
+
+def ndjson_line(row: dict) -> bytes:
+    return orjson.dumps(row) + b"\n"
+
+
+def ndjson_response(rows: Iterable[dict] | AsyncIterable[dict]) -> StreamingResponse:
+    """
+    Stream rows as they come off the server-side cursor; nothing is buffered.
+    """
+    if hasattr(rows, "__aiter__"):
+        async def body():
+            async for row in rows:
+                yield ndjson_line(row)
+    else:
+        def body():
+            for row in rows:
+                yield ndjson_line(row)
+    return StreamingResponse(body(), media_type=NDJSON_MEDIA_TYPE)
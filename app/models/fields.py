@@ -0,0 +1,15 @@
+from typing import Annotated
+
+from pydantic import AfterValidator
+
+
+def _reject_nul(value: str) -> str:
+    # PostgreSQL text values cannot hold NUL characters
+    if "\x00" in value:
+        raise ValueError("must not contain NUL characters")
+    return value
+
+
+# A string bound for a text column. Create models check it (and the column's
+# length) themselves, so a bad bulk row is reported instead of aborting the COPY.
+Text = Annotated[str, AfterValidator(_reject_nul)]
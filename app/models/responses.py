@@ -0,0 +1,24 @@
+import orjson
+from fastapi import Response
+from fastapi.responses import JSONResponse
+
+
+class RowsJSONResponse(JSONResponse):
+    """
+    JSON rendered by orjson straight from dict_row rows: ints, strings and
+    datetimes are encoded natively in one pass, with no jsonable_encoder walk.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+def rows_response(content, response: Response | None = None) -> RowsJSONResponse:
+    """
+    Fast path for read routes. Returning a Response makes FastAPI skip
+    response_model validation and jsonable_encoder; the route's
+    response_model then only documents the shape in OpenAPI.
+    Headers already set on the injected `response` (X-Next-Cursor) are kept.
+    """
+    headers = dict(response.headers) if response is not None else None
+    return RowsJSONResponse(content, headers=headers)
@@ -2,12 +2,16 @@ from datetime import datetime
 
 from pydantic import BaseModel, ConfigDict
 
+from app.models.books import BookOut
+from app.models.fields import Text
+from app.models.users import UserOut
+
 
 class ReviewCreate(BaseModel):
     user_id: int
     book_id: int
     rating: int
-    content: str
+    content: Text
 
 
 class ReviewOut(BaseModel):
@@ -21,3 +25,14 @@ class ReviewOut(BaseModel):
     content: str
     created_at: datetime
 
+
+class ExpandedReviewOut(ReviewOut):
+    # Embedded with ?expand=user,book; null if the row is gone
+    user: UserOut | None = None
+    book: BookOut | None = None
+
+
+class ReviewSearchOut(ReviewOut):
+    rank: float
+    # Best matching fragments of the content, matched words wrapped in <mark></mark>
+    snippet: str
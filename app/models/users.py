@@ -1,5 +1,34 @@
-from pydantic import BaseModel
+from datetime import datetime
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from app.models.fields import Text
 
 
 class UserCreate(BaseModel):
+    name: Text = Field(max_length=120)
+
+
+class UserOut(BaseModel):
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
     name: str
+    created_at: datetime
+
+
+class SuggestedUserOut(UserOut):
+    # How many of the people the user follows follow this one
+    mutual_count: int
+
+
+class FollowCountsOut(BaseModel):
+    followers: int
+    following: int
+
+
+class RelationshipOut(BaseModel):
+    following: bool
+    followed_by: bool
+    mutual: bool
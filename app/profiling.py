@@ -0,0 +1,82 @@
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+# ------------------------------
+# Sampling CPU profiler
+# ------------------------------
+# cProfile only sees the thread that enabled it, while live traffic runs on
+# the event loop and the threadpool. Instead, the calling thread (a threadpool
+# thread, never the event loop) samples every other thread's stack (sys._current_frames) every `interval` seconds for a fixed
+# window. A function's self samples count the stacks it was on top of, and its
+# cumulative samples the stacks it appeared in at all. Threads parked in the
+# modules below are idle and not counted. Stacks are read without stopping the
+# threads being sampled, so serving continues at near full speed.
+
+IDLE_MODULES = ("threading", "selectors", "queue", "concurrent.futures.thread", "asyncio.base_events", "asyncio.runners")
+# Upper bound on one capture, so a stray request can't hold the profiler for long
+MAX_PROFILE_SECONDS = 60
+
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    pass
+
+
+def _label(code) -> str:
+    path = Path(code.co_filename)
+    return f"{code.co_name} ({'/'.join(path.parts[-3:])}:{code.co_firstlineno})"
+
+
+def _is_idle(frame) -> bool:
+    return frame.f_globals.get("__name__", "") in IDLE_MODULES
+
+
+def _top(counts: Counter, busy: int, top: int) -> list[dict]:
+    return [
+        {"function": function, "samples": samples, "percent": round(100 * samples / busy, 1)}
+        for function, samples in counts.most_common(top)
+    ]
+
+
+def sample_profile(seconds: float, *, interval: float = 0.005, top: int = 25) -> dict:
+    """
+    Sample every other thread's stack for `seconds` and return the top
+    functions by self and cumulative samples. Blocks for the whole window;
+    raises ProfilerBusy if another profile is running.
+    """
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already being captured")
+    try:
+        own = threading.get_ident()
+        own_counts, cumulative_counts = Counter(), Counter()
+        samples = busy = 0
+        deadline = time.monotonic() + seconds
+        while time.monotonic() < deadline:
+            samples += 1
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own or _is_idle(frame):
+                    continue
+                busy += 1
+                own_counts[_label(frame.f_code)] += 1
+                seen = set()
+                while frame is not None:
+                    seen.add(_label(frame.f_code))
+                    frame = frame.f_back
+                cumulative_counts.update(seen)
+            time.sleep(interval)
+    finally:
+        _profile_lock.release()
+
+    return {
+        "seconds": seconds,
+        "interval_ms": interval * 1000,
+        "samples": samples,
+        # Thread-samples that caught a thread doing work; percentages are of these
+        "busy_samples": busy,
+        "top_self": _top(own_counts, busy or 1, top),
+        "top_cumulative": _top(cumulative_counts, busy or 1, top),
+    }
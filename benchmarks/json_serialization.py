@@ -0,0 +1,93 @@
+"""
+Before/after timings for the orjson fast path on read routes.
+
+Runs in-process, no database needed: pages shaped like GET /books and
+GET /users/{id}/newsfeed are served by two throwaway FastAPI routes, one
+returning the rows as before (jsonable_encoder + stdlib json) and one
+returning them through rows_response.
+
+    python -m benchmarks.json_serialization --rows 50 500 --repeat 300
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.models.books import BookOut
+from app.models.responses import rows_response
+from app.models.reviews import ReviewOut
+
+
+def book_rows(n: int) -> list[dict]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {"id": i, "title": f"Book title {i}", "author": f"Author {i % 97}", "created_at": start + timedelta(seconds=i)}
+        for i in range(1, n + 1)
+    ]
+
+
+def feed_rows(n: int) -> list[dict]:
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        {
+            "id": i,
+            "user_id": i % 1000,
+            "book_id": i % 5000,
+            "rating": i % 5 + 1,
+            "content": "A thoughtful review of moderate length. " * 4,
+            "created_at": start - timedelta(seconds=i, microseconds=i),
+        }
+        for i in range(1, n + 1)
+    ]
+
+
+def build_app(rows: list[dict], model) -> FastAPI:
+    app = FastAPI()
+
+    # The routes had no response_model before, so only jsonable_encoder ran
+    @app.get("/before")
+    def before():
+        return rows
+
+    @app.get("/after", response_model=list[model])
+    def after():
+        return rows_response(rows)
+
+    return app
+
+
+def time_route(client: TestClient, path: str, repeat: int) -> float:
+    client.get(path)  # warm-up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        client.get(path)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[50, 500], help="page sizes to measure")
+    parser.add_argument("--repeat", type=int, default=300, help="requests per measurement")
+    args = parser.parse_args()
+
+    results = []
+    for name, make_rows, model in [("books", book_rows, BookOut), ("newsfeed", feed_rows, ReviewOut)]:
+        for n in args.rows:
+            rows = make_rows(n)
+            client = TestClient(build_app(rows, model))
+            assert client.get("/before").json() == client.get("/after").json()
+            before = time_route(client, "/before", args.repeat)
+            after = time_route(client, "/after", args.repeat)
+            results.append({"endpoint": name, "rows": n, "before_ms": round(before, 3), "after_ms": round(after, 3), "speedup": round(before / after, 2)})
+
+    print(f"{'endpoint':<10}{'rows':>6}{'before ms':>12}{'after ms':>11}{'speedup':>9}")
+    for r in results:
+        print(f"{r['endpoint']:<10}{r['rows']:>6}{r['before_ms']:>12}{r['after_ms']:>11}{r['speedup']:>8}x")
+    print(json.dumps(results))
+
+
+if __name__ == "__main__":
+    main()
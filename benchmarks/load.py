@@ -0,0 +1,538 @@
+"""
+Concurrent load benchmark for the API routes.
+
+Starts the app with uvicorn against the Postgres in the DB_* settings
+(migrating the schema and topping up a small dataset through the bulk
+endpoints first), or targets a running server with --url. Then `concurrency`
+workers drive a weighted mix of routes for `duration` seconds. Reports
+throughput and p50/p95/p99 latency per route as JSON: by default
+benchmarks/results/<commit>-<app mode>-<mix>.json.
+
+    python -m benchmarks.load --mix read-heavy --concurrency 32 --duration 30
+    python -m benchmarks.load --app-mode async --baseline benchmarks/results/<before>.json
+    python -m benchmarks.load --generate 1000000   # replace the data with a generated dataset first
+    python -m benchmarks.load --mix feed --feed-strategy merge
+
+The load generator runs on the same machine as the server, so leave it some
+CPU: compare runs made with the same settings rather than reading absolute
+numbers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+import psycopg
+
+from app.database.core import DATABASE_URL
+from app.database.generate import WORDS, generate_dataset
+from app.database.migrations import bootstrap
+from app.database.pagination import encode_cursor
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Routes in each mix, by weight. /health, /metrics and /admin are left out.
+# Whole-table NDJSON exports only run in their own mix, so they don't swamp
+# the latencies of the others.
+MIXES = {
+    "read-heavy": {
+        "list_users": 4,
+        "get_user": 10,
+        "users_by_ids": 2,
+        "list_books": 6,
+        "get_book": 15,
+        "books_by_ids": 2,
+        "search_books": 4,
+        "top_rated": 4,
+        "book_stats": 6,
+        "similar_books": 2,
+        "reviews_by_book": 10,
+        "expanded_reviews_by_book": 4,
+        "reviews_by_user": 8,
+        "search_reviews": 1,
+        "newsfeed": 17,
+        "expanded_newsfeed": 4,
+        "followers": 2,
+        "suggestions": 1,
+        "recommendations": 1,
+        "add_review": 6,
+        "follow": 3,
+        "unfollow": 2,
+        "create_user": 2,
+        "create_book": 2,
+    },
+    "write-heavy": {
+        "get_user": 5,
+        "get_book": 5,
+        "reviews_by_book": 5,
+        "newsfeed": 10,
+        "add_review": 32,
+        "bulk_reviews": 2,
+        "follow": 15,
+        "unfollow": 10,
+        "create_user": 7,
+        "bulk_users": 1,
+        "create_book": 7,
+        "bulk_books": 1,
+    },
+    "feed": {
+        "newsfeed": 55,
+        "expanded_newsfeed": 15,
+        "get_user": 10,
+        "add_review": 10,
+        "follow": 5,
+        "unfollow": 5,
+    },
+    "export": {
+        "export_users": 1,
+        "export_books": 1,
+        "export_reviews_by_user": 10,
+        "export_reviews_by_book": 10,
+        "get_user": 39,
+        "get_book": 39,
+    },
+}
+
+# Rows per request to the bulk endpoints
+BULK_ROWS = 100
+
+# Rows the benchmark wants before it starts; missing ones are added through the bulk endpoints
+MIN_DATASET = {"users": 2_000, "books": 2_000, "reviews": 20_000, "follows_per_user": 5}
+
+
+class Ids:
+    """
+    Id ranges to draw from. Books and feed readers are skewed towards low ids,
+    so some rows are hot like popular books and active users are.
+    """
+
+    def __init__(self, max_user_id: int, max_book_id: int):
+        self.max_user_id = max_user_id
+        self.max_book_id = max_book_id
+
+    def user(self, rng: random.Random) -> int:
+        return rng.randint(1, self.max_user_id)
+
+    def active_user(self, rng: random.Random) -> int:
+        return 1 + int(self.max_user_id * rng.random() ** 2)
+
+    def book(self, rng: random.Random) -> int:
+        return 1 + int(self.max_book_id * rng.random() ** 3)
+
+    def other_user(self, rng: random.Random, user_id: int) -> int:
+        other = self.user(rng)
+        return other if other != user_id else other % self.max_user_id + 1
+
+
+def page_params(rng: random.Random, max_id: int) -> dict:
+    """A first page half the time, otherwise a page starting at a random id."""
+    params = {"limit": 50}
+    if rng.random() < 0.5:
+        params["after"] = encode_cursor(rng.randint(1, max_id))
+    return params
+
+
+# Each operation returns (route label, method, path, query params, JSON body)
+def list_users(rng, ids):
+    return "GET /users", "GET", "/users", page_params(rng, ids.max_user_id), None
+
+
+def get_user(rng, ids):
+    return "GET /users/{user_id}", "GET", f"/users/{ids.active_user(rng)}", None, None
+
+
+def users_by_ids(rng, ids):
+    user_ids = ",".join(str(ids.user(rng)) for _ in range(20))
+    return "GET /users?ids=", "GET", "/users", {"ids": user_ids}, None
+
+
+def export_users(rng, ids):
+    return "GET /users (NDJSON)", "GET", "/users", {"stream": 1}, None
+
+
+def create_user(rng, ids):
+    return "POST /users", "POST", "/users", None, {"name": f"bench user {rng.getrandbits(32)}"}
+
+
+def bulk_users(rng, ids):
+    rows = [create_user(rng, ids)[4] for _ in range(BULK_ROWS)]
+    return "POST /users/bulk", "POST", "/users/bulk", None, rows
+
+
+def list_books(rng, ids):
+    return "GET /books", "GET", "/books", page_params(rng, ids.max_book_id), None
+
+
+def get_book(rng, ids):
+    return "GET /books/{book_id}", "GET", f"/books/{ids.book(rng)}", None, None
+
+
+def books_by_ids(rng, ids):
+    book_ids = ",".join(str(ids.book(rng)) for _ in range(20))
+    return "GET /books?ids=", "GET", "/books", {"ids": book_ids}, None
+
+
+def export_books(rng, ids):
+    return "GET /books (NDJSON)", "GET", "/books", {"stream": 1}, None
+
+
+def search_books(rng, ids):
+    # Generated titles are "book <id>", the benchmark's own "bench book <n>"
+    return "GET /books/search", "GET", "/books/search", {"q": f"book {ids.book(rng)}", "limit": 20}, None
+
+
+def top_rated(rng, ids):
+    return "GET /books/top-rated", "GET", "/books/top-rated", {"limit": 50, "min_reviews": rng.choice([1, 5, 20])}, None
+
+
+def book_stats(rng, ids):
+    return "GET /books/{book_id}/stats", "GET", f"/books/{ids.book(rng)}/stats", None, None
+
+
+def similar_books(rng, ids):
+    return "GET /books/{book_id}/similar", "GET", f"/books/{ids.book(rng)}/similar", None, None
+
+
+def create_book(rng, ids):
+    n = rng.getrandbits(32)
+    return "POST /books", "POST", "/books", None, {"title": f"bench book {n}", "author": f"bench author {n % 997}"}
+
+
+def bulk_books(rng, ids):
+    rows = [create_book(rng, ids)[4] for _ in range(BULK_ROWS)]
+    return "POST /books/bulk", "POST", "/books/bulk", None, rows
+
+
+def reviews_by_book(rng, ids):
+    return "GET /books/{book_id}/reviews", "GET", f"/books/{ids.book(rng)}/reviews", {"limit": 20}, None
+
+
+def expanded_reviews_by_book(rng, ids):
+    route = "GET /books/{book_id}/reviews?expand="
+    return route, "GET", f"/books/{ids.book(rng)}/reviews", {"limit": 20, "expand": "user,book"}, None
+
+
+def export_reviews_by_book(rng, ids):
+    return "GET /books/{book_id}/reviews (NDJSON)", "GET", f"/books/{ids.book(rng)}/reviews", {"stream": 1}, None
+
+
+def reviews_by_user(rng, ids):
+    return "GET /users/{user_id}/reviews", "GET", f"/users/{ids.active_user(rng)}/reviews", {"limit": 20}, None
+
+
+def export_reviews_by_user(rng, ids):
+    return "GET /users/{user_id}/reviews (NDJSON)", "GET", f"/users/{ids.active_user(rng)}/reviews", {"stream": 1}, None
+
+
+def search_reviews(rng, ids):
+    # Generated reviews are drawn from WORDS: one or two of them, sometimes as alternatives
+    query = " OR ".join(rng.sample(WORDS, 2)) if rng.random() < 0.3 else " ".join(rng.sample(WORDS, rng.randint(1, 2)))
+    return "GET /reviews/search", "GET", "/reviews/search", {"q": query, "limit": 20}, None
+
+
+def add_review(rng, ids):
+    review = {
+        "user_id": ids.active_user(rng),
+        "book_id": ids.book(rng),
+        "rating": rng.choices([1, 2, 3, 4, 5], weights=[1, 2, 4, 6, 5])[0],
+        "content": "Benchmark review. " * rng.randint(1, 8),
+    }
+    return "POST /reviews", "POST", "/reviews", None, review
+
+
+def bulk_reviews(rng, ids):
+    rows = [add_review(rng, ids)[4] for _ in range(BULK_ROWS)]
+    return "POST /reviews/bulk", "POST", "/reviews/bulk", None, rows
+
+
+def follow(rng, ids):
+    follower = ids.active_user(rng)
+    followee = ids.other_user(rng, follower)
+    return "POST /follow/{followee_id}", "POST", f"/follow/{followee}", {"follower_id": follower}, None
+
+
+def unfollow(rng, ids):
+    follower = ids.active_user(rng)
+    followee = ids.other_user(rng, follower)
+    return "POST /unfollow/{followee_id}", "POST", f"/unfollow/{followee}", {"follower_id": follower}, None
+
+
+def followers(rng, ids):
+    return "GET /users/{user_id}/followers", "GET", f"/users/{ids.active_user(rng)}/followers", {"limit": 50}, None
+
+
+def suggestions(rng, ids):
+    return "GET /users/{user_id}/suggestions", "GET", f"/users/{ids.active_user(rng)}/suggestions", None, None
+
+
+def recommendations(rng, ids):
+    return "GET /users/{user_id}/recommendations", "GET", f"/users/{ids.active_user(rng)}/recommendations", None, None
+
+
+def newsfeed(rng, ids):
+    return "GET /users/{user_id}/newsfeed", "GET", f"/users/{ids.active_user(rng)}/newsfeed", {"limit": 20}, None
+
+
+def expanded_newsfeed(rng, ids):
+    route = "GET /users/{user_id}/newsfeed?expand="
+    return route, "GET", f"/users/{ids.active_user(rng)}/newsfeed", {"limit": 20, "expand": "user,book"}, None
+
+
+OPERATIONS = {
+    op.__name__: op
+    for op in [
+        list_users, get_user, users_by_ids, export_users, create_user, bulk_users,
+        list_books, get_book, books_by_ids, export_books, search_books, top_rated, book_stats, similar_books,
+        create_book, bulk_books, reviews_by_book, expanded_reviews_by_book, export_reviews_by_book,
+        reviews_by_user, export_reviews_by_user, search_reviews, add_review, bulk_reviews,
+        follow, unfollow, followers, suggestions, recommendations, newsfeed, expanded_newsfeed,
+    ]
+}
+
+
+# ------------------------------
+# Setup
+# ------------------------------
+def dataset_counts() -> dict:
+    with psycopg.connect(DATABASE_URL) as conn:
+        users, books, reviews, follows = conn.execute("""
+            SELECT (SELECT count(*) FROM users), (SELECT count(*) FROM books),
+                   (SELECT count(*) FROM reviews), (SELECT count(*) FROM followers)
+        """).fetchone()
+        max_user_id, max_book_id = conn.execute("SELECT (SELECT max(id) FROM users), (SELECT max(id) FROM books)").fetchone()
+    return {
+        "users": users,
+        "books": books,
+        "reviews": reviews,
+        "follows": follows,
+        "max_user_id": max_user_id or 0,
+        "max_book_id": max_book_id or 0,
+    }
+
+
+async def ensure_dataset(client: httpx.AsyncClient, rng: random.Random) -> dict:
+    """
+    Top the database up to MIN_DATASET through the API's own bulk endpoints
+    (follows have no bulk route and go through POST /follow).
+    """
+    counts = dataset_counts()
+    missing_users = MIN_DATASET["users"] - counts["users"]
+    if missing_users > 0:
+        rows = [{"name": f"bench user {i}"} for i in range(missing_users)]
+        (await client.post("/users/bulk", json=rows)).raise_for_status()
+    missing_books = MIN_DATASET["books"] - counts["books"]
+    if missing_books > 0:
+        rows = [{"title": f"bench book {i}", "author": f"bench author {i % 997}"} for i in range(missing_books)]
+        (await client.post("/books/bulk", json=rows)).raise_for_status()
+
+    counts = dataset_counts()
+    ids = Ids(counts["max_user_id"], counts["max_book_id"])
+    missing_reviews = MIN_DATASET["reviews"] - counts["reviews"]
+    if missing_reviews > 0:
+        rows = [add_review(rng, ids)[4] for _ in range(missing_reviews)]
+        (await client.post("/reviews/bulk", json=rows)).raise_for_status()
+    missing_follows = MIN_DATASET["follows_per_user"] * counts["users"] - counts["follows"]
+    if missing_follows > 0:
+        async def add_follows(n):
+            for _ in range(n):
+                _, _, path, params, _ = follow(rng, ids)
+                await client.post(path, params=params)
+        await asyncio.gather(*(add_follows(missing_follows // 16 + 1) for _ in range(16)))
+    return dataset_counts()
+
+
+def start_server(app_mode: str, port: int, workers: int, feed_strategy: str | None) -> subprocess.Popen:
+    module = "app.main_async:app" if app_mode == "async" else "app.main:app"
+    env = {**os.environ, "APP_MODE": app_mode}
+    if feed_strategy:
+        env["FEED_STRATEGY"] = feed_strategy
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", module, "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server: subprocess.Popen | None, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        if server and server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if (await client.get("/health/db-pool")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.monotonic() > deadline:
+            raise RuntimeError("server did not become ready")
+        await asyncio.sleep(0.2)
+
+
+# ------------------------------
+# Load
+# ------------------------------
+async def worker(client, rng, ids, mix, deadline, record_after, samples, errors):
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    while time.monotonic() < deadline:
+        route, method, path, params, body = OPERATIONS[rng.choices(names, weights)[0]](rng, ids)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, json=body)
+            failed = response.status_code >= 500
+        except httpx.HTTPError:
+            failed = True
+        elapsed = time.perf_counter() - started
+        if time.monotonic() < record_after:
+            continue
+        samples.setdefault(route, []).append(elapsed)
+        if failed:
+            errors[route] = errors.get(route, 0) + 1
+
+
+def summarize(samples: dict, errors: dict, seconds: float) -> dict:
+    endpoints = {}
+    for route, latencies in sorted(samples.items()):
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+        endpoints[route] = {
+            "requests": len(latencies),
+            "errors": errors.get(route, 0),
+            "rps": round(len(latencies) / seconds, 1),
+            "mean_ms": round(statistics.fmean(latencies) * 1000, 2),
+            "p50_ms": round(cuts[49] * 1000, 2),
+            "p95_ms": round(cuts[94] * 1000, 2),
+            "p99_ms": round(cuts[98] * 1000, 2),
+            "max_ms": round(max(latencies) * 1000, 2),
+        }
+    total = sum(len(latencies) for latencies in samples.values())
+    return {
+        "total": {
+            "requests": total,
+            "errors": sum(errors.values()),
+            "rps": round(total / seconds, 1),
+        },
+        "endpoints": endpoints,
+    }
+
+
+async def run(args) -> dict:
+    rng = random.Random(args.seed)
+    base_url = args.url or f"http://127.0.0.1:{args.port}"
+    server = None
+    if not args.url:
+        bootstrap()
+        if args.generate:
+            with psycopg.connect(DATABASE_URL) as conn:
+                generate_dataset(
+                    conn, users=max(args.generate // 10, 100), books=max(args.generate // 50, 100),
+                    reviews=args.generate, seed=args.seed, truncate=True,
+                )
+        server = start_server(args.app_mode, args.port, args.workers, args.feed_strategy)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30) as client:
+            await wait_until_ready(client, server)
+            dataset = await ensure_dataset(client, rng) if not args.url else dataset_counts()
+            ids = Ids(dataset["max_user_id"], dataset["max_book_id"])
+
+            samples, errors = {}, {}
+            record_after = time.monotonic() + args.warmup
+            deadline = record_after + args.duration
+            await asyncio.gather(*(
+                worker(client, random.Random(args.seed + i), ids, MIXES[args.mix], deadline, record_after, samples, errors)
+                for i in range(args.concurrency)
+            ))
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    return {
+        "commit": git_commit(),
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "settings": {
+            "app_mode": args.app_mode if not args.url else None,
+            "url": base_url,
+            "mix": args.mix,
+            "feed_strategy": args.feed_strategy if not args.url else None,
+            "concurrency": args.concurrency,
+            "duration_s": args.duration,
+            "warmup_s": args.warmup,
+            "workers": args.workers,
+            "seed": args.seed,
+        },
+        "dataset": dataset,
+        **summarize(samples, errors, args.duration),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+# ------------------------------
+# Reporting
+# ------------------------------
+def print_report(report: dict, baseline: dict | None = None) -> None:
+    header = f"{'route':<44}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'errors':>8}"
+    print(header + ("   vs baseline p50 / p99" if baseline else ""))
+    for route, stats in report["endpoints"].items():
+        line = f"{route:<44}{stats['rps']:>9}{stats['p50_ms']:>9}{stats['p95_ms']:>9}{stats['p99_ms']:>9}{stats['errors']:>8}"
+        before = (baseline or {}).get("endpoints", {}).get(route)
+        if before:
+            line += f"   {change(before['p50_ms'], stats['p50_ms'])} / {change(before['p99_ms'], stats['p99_ms'])}"
+        print(line)
+    total = report["total"]
+    print(f"{'total':<44}{total['rps']:>9}{'':>27}{total['errors']:>8}")
+
+
+def change(before: float, after: float) -> str:
+    return f"{(after - before) / before:+.0%}" if before else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mix", choices=sorted(MIXES), default="read-heavy")
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent client connections")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="seconds of load before measuring")
+    parser.add_argument("--app-mode", choices=["sync", "async"], default="sync")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--url", help="benchmark a running server instead of starting one")
+    parser.add_argument(
+        "--feed-strategy", choices=["timeline", "merge"],
+        help="FEED_STRATEGY of the started server (default: the environment's)",
+    )
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument(
+        "--generate", type=int, metavar="REVIEWS",
+        help="replace the data with a generated dataset of this many reviews (users/10, books/50) before starting",
+    )
+    parser.add_argument("--out", type=Path, help="report path (default: benchmarks/results/<commit>-<mode>-<mix>[-merge].json)")
+    parser.add_argument("--baseline", type=Path, help="earlier report to compare against")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    suffix = "-merge" if report["settings"]["feed_strategy"] == "merge" else ""
+    out = args.out or RESULTS_DIR / f"{report['commit']}-{args.app_mode}-{args.mix}{suffix}.json"
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2) + "\n")
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline else None
+    print_report(report, baseline)
+    print(f"\nwrote {out}")
+
+
+if __name__ == "__main__":
+    main()
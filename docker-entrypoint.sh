@@ -8,11 +8,14 @@ until pg_isready -h "$DB_HOST" -p "$DB_PORT" -U "$DB_USER"; do
 done
 echo "PostgreSQL is ready."
 
-# Apply all schema files
-for file in /app/app/database/schema/*.sql; do
-  echo "Running $file"
-  psql "postgresql://$DB_USER:$DB_PASSWORD@$DB_HOST:$DB_PORT/$DB_NAME" -f "$file"
-done
+# Apply new schema files and seed once, under an advisory lock, so every
+# worker started below finds the database ready after a single check
+python -m app.database.migrations
 
-# Start the FastAPI app
-exec uvicorn app.main:app --host 0.0.0.0 --port 8000
+# Start the FastAPI app (APP_MODE=async serves the AsyncConnection-based stack)
+if [ "${APP_MODE:-sync}" = "async" ]; then
+  APP_MODULE="app.main_async:app"
+else
+  APP_MODULE="app.main:app"
+fi
+exec uvicorn "$APP_MODULE" --host 0.0.0.0 --port 8000
@@ -0,0 +1,297 @@
+"""
+Query-plan regression suite: EXPLAINs every SQL statement against a generated
+dataset and fails on sequential scans or sorts over large relations, and on
+plan costs well above the recorded baselines.
+
+Needs a local Postgres (the DB_* settings, or PLAN_TEST_DATABASE_URL) where
+the user may create databases; skipped otherwise. Run with:
+    pytest tests/query_plans -v
+and re-record the baselines after an intended plan change with:
+    PLAN_BASELINES_UPDATE=1 pytest tests/query_plans
+"""
+import json
+import os
+from pathlib import Path
+
+import psycopg
+import pytest
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+
+from app.database.core import DATABASE_URL, FEED_BACKFILL_SIZE, FEED_FANOUT_MAX_FOLLOWERS
+from app.database.migrations import migrate
+from app.database.recommendations import compute_recommendations
+from app.database.queries import book_stats, books, follows, recommendations, reviews, search, timelines, users, versions  # noqa: F401  (fill the registry)
+from app.database.queries.follows import FEED_HEAD
+from app.database.statements import STATEMENTS, configure_connection
+
+BASELINES_PATH = Path(__file__).parent / "plan_baselines.json"
+
+PLAN_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL", DATABASE_URL)
+PLAN_TEST_DB_NAME = "goodreads_plans"
+# Multiplies the generated row counts below
+PLAN_TEST_SCALE = float(os.getenv("PLAN_TEST_SCALE", 1))
+PLAN_BASELINES_UPDATE = os.getenv("PLAN_BASELINES_UPDATE", "0") != "0"
+
+# Relations estimated above this many rows must not be seq scanned or sorted whole
+LARGE_RELATION_ROWS = 10_000
+# A plan may cost this much more than its baseline before the test fails
+COST_TOLERANCE = 1.5
+
+DATASET = {
+    "users": 20_000,
+    "books": 20_000,
+    "reviews": 100_000,
+    "follows_per_user": 5,
+    # Followers of user 1, pushing them past FEED_FANOUT_MAX_FOLLOWERS when it's at its default
+    "celebrity_followers": 12_000,
+}
+
+# Deterministic (setseed) so plan costs are comparable between runs. Ratings and
+# book popularity are skewed; timelines, follower_count and book_stats are then
+# backfilled by re-applying the schema files, and book_recommendations by the job.
+GENERATE_SQL = """
+SELECT setseed(0.42);
+
+INSERT INTO users (name)
+SELECT 'user ' || g FROM generate_series(1, %(users)s) g;
+
+INSERT INTO books (title, author)
+SELECT 'book ' || g, 'author ' || (g %% 997) FROM generate_series(1, %(books)s) g;
+
+INSERT INTO reviews (user_id, book_id, rating, content, created_at)
+SELECT 1 + floor(random() * %(users)s)::bigint,
+       1 + floor(power(random(), 3) * %(books)s)::bigint,
+       1 + floor(power(random(), 0.5) * 5)::int,
+       'review ' || g,
+       now() - random() * interval '365 days'
+FROM generate_series(1, %(reviews)s) g;
+
+INSERT INTO followers (follower_id, followee_id)
+SELECT follower_id, followee_id
+FROM (
+    SELECT u AS follower_id, 1 + floor(random() * %(users)s)::bigint AS followee_id
+    FROM generate_series(1, %(users)s) u, generate_series(1, %(follows_per_user)s)
+) pairs
+WHERE follower_id <> followee_id
+ON CONFLICT DO NOTHING;
+
+INSERT INTO followers (follower_id, followee_id)
+SELECT g, 1 FROM generate_series(2, %(celebrity_followers)s + 1) g
+ON CONFLICT DO NOTHING;
+"""
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture(scope="module")
+def plan_conn():
+    """Connection to a freshly generated, analyzed database; dropped afterwards"""
+    try:
+        admin = psycopg.connect(make_conninfo(PLAN_TEST_DATABASE_URL, dbname="postgres"), autocommit=True)
+    except psycopg.OperationalError as exc:
+        pytest.skip(f"no local Postgres for the query-plan suite: {exc}")
+    database = sql.Identifier(PLAN_TEST_DB_NAME)
+    admin.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(database))
+    admin.execute(sql.SQL("CREATE DATABASE {}").format(database))
+
+    conn = psycopg.connect(make_conninfo(PLAN_TEST_DATABASE_URL, dbname=PLAN_TEST_DB_NAME), autocommit=True)
+    try:
+        migrate(conn)
+        counts = {key: max(1, int(value * PLAN_TEST_SCALE)) for key, value in DATASET.items()}
+        # Client-side binding: several statements in one execute
+        psycopg.ClientCursor(conn).execute(GENERATE_SQL, counts)
+        migrate(conn, force=True)
+        # Sparse likes: count every co-read pair, so the table is large enough to plan against
+        compute_recommendations(conn, min_common=1)
+        # VACUUM too: index-only scan costs depend on the visibility map, which
+        # would otherwise be set or not depending on whether autovacuum got there first
+        conn.execute("VACUUM ANALYZE")
+        configure_connection(conn)
+        yield conn
+    finally:
+        conn.close()
+        admin.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(database))
+        admin.close()
+
+
+@pytest.fixture(scope="module")
+def large_relations(plan_conn) -> set[str]:
+    rows = plan_conn.execute(
+        "SELECT relname FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace AND reltuples >= %s",
+        (LARGE_RELATION_ROWS,),
+    ).fetchall()
+    return {name for (name,) in rows}
+
+
+@pytest.fixture(scope="module")
+def plan_params(plan_conn) -> dict[str, tuple[str, dict | tuple]]:
+    """
+    (sql, params) per statement: the registry plus the unregistered statements
+    of the bulk and timeline paths (not the seed's: they run once, on an empty
+    database). Ids are picked from the dataset: the busiest reader, the most
+    reviewed book, a mid-table keyset cursor.
+    """
+    reader, followee = plan_conn.execute("""
+        SELECT f.follower_id, (SELECT max(id) FROM users)
+        FROM followers f GROUP BY f.follower_id ORDER BY count(*) DESC LIMIT 1
+    """).fetchone()
+    book_id, = plan_conn.execute("SELECT book_id FROM book_stats ORDER BY review_count DESC LIMIT 1").fetchone()
+    review_id, created_at = plan_conn.execute("""
+        SELECT id, created_at FROM reviews WHERE user_id = %s ORDER BY created_at DESC, id DESC OFFSET 2 LIMIT 1
+    """, (reader,)).fetchone()
+    mid_user, mid_book = plan_conn.execute("SELECT (SELECT max(id) / 2 FROM users), (SELECT max(id) / 2 FROM books)").fetchone()
+    ids = list(range(mid_user, mid_user + 100))
+
+    feed = {
+        "user_id": reader,
+        "limit": 50,
+        "after_created_at": FEED_HEAD[0],
+        "after_id": FEED_HEAD[1],
+        "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+    }
+    registered = {
+        "get_user": {"user_id": reader},
+        "get_users": {"user_ids": ids},
+        "list_users": {"limit": 50},
+        "list_users_after": {"limit": 50, "after_id": mid_user},
+        "insert_user": {"name": "plan"},
+        "existing_user_ids": {"ids": ids},
+        "get_book": {"book_id": book_id},
+        "get_books": {"book_ids": ids},
+        "list_books": {"limit": 50},
+        "list_books_after": {"limit": 50, "after_id": mid_book},
+        "insert_book": {"title": "plan", "author": "plan"},
+        "existing_book_ids": {"ids": ids},
+        "get_book_stats": {"book_id": book_id},
+        "list_top_rated": {"min_reviews": 1, "limit": 50},
+        "list_top_rated_after": {"min_reviews": 1, "limit": 50, "after_rating": 4.0, "after_count": 5, "after_id": mid_book},
+        "get_table_version": {"table_name": "users"},
+        "get_book_reviews_version": {"book_id": book_id},
+        "follow_user": {
+            "follower_id": reader,
+            "followee_id": followee,
+            "backfill_size": FEED_BACKFILL_SIZE,
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        },
+        "unfollow_user": {"follower_id": reader, "followee_id": followee, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS},
+        "get_newsfeed": feed,
+        "get_newsfeed_merge": feed,
+        "insert_review": {
+            "user_id": reader,
+            "book_id": book_id,
+            "rating": 4,
+            "content": "plan",
+            "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS,
+        },
+        "get_review": {"review_id": review_id},
+        "list_reviews_by_user": {"user_id": reader, "limit": 50},
+        "list_reviews_by_user_after": {"user_id": reader, "limit": 50, "after_created_at": created_at, "after_id": review_id},
+        "list_reviews_by_book": {"book_id": book_id, "limit": 50},
+        "list_reviews_by_book_after": {"book_id": book_id, "limit": 50, "after_created_at": created_at, "after_id": review_id},
+        "get_similar_books": {"book_id": book_id, "limit": 10},
+        "get_user_recommendations": {
+            "user_id": reader,
+            "liked_rating": recommendations.LIKED_RATING,
+            "history": recommendations.RECOMMENDATION_HISTORY,
+            "limit": 10,
+        },
+        "search_books": search.search_params("book 777", 50, None),
+        "search_books_fuzzy": search.search_params("author 77", 50, None),
+        "search_reviews": search.search_params("review 777", 50, None),
+    }
+    statements = {name: (statement.sql, registered.get(name)) for name, statement in STATEMENTS.items()}
+    # Postgres builds without contrib have no pg_trgm, and no fuzzy author search
+    [[trigram]] = plan_conn.execute(search.HAS_TRIGRAM_SQL).fetchall()
+    if not trigram:
+        del statements["search_books_fuzzy"]
+    statements.update({
+        "fan_out_review": (timelines.FAN_OUT_REVIEW_SQL, {"review_ids": ids, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}),
+        "backfill_timeline": (timelines.BACKFILL_TIMELINE_SQL, registered["follow_user"]),
+        "add_reviews_to_book_stats": (book_stats.ADD_REVIEWS_TO_BOOK_STATS_SQL, {"review_ids": ids}),
+    })
+    return statements
+
+
+@pytest.fixture(scope="module")
+def baselines() -> dict[str, float]:
+    """Recorded total costs; rewritten at the end of the module with PLAN_BASELINES_UPDATE=1"""
+    recorded = json.loads(BASELINES_PATH.read_text()) if BASELINES_PATH.exists() else {}
+    costs = dict(recorded)
+    yield costs
+    if PLAN_BASELINES_UPDATE:
+        BASELINES_PATH.write_text(json.dumps(dict(sorted(costs.items())), indent=2) + "\n")
+
+
+# ------------------------------
+# Plan helpers
+# ------------------------------
+def explain(conn, statement: str, params) -> dict:
+    [[plan]] = conn.execute(f"EXPLAIN (FORMAT JSON) {statement}", params).fetchone()
+    return plan["Plan"]
+
+
+def walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from walk(child)
+
+
+def violations(plan: dict, large: set[str]) -> list[str]:
+    found = []
+    for node in walk(plan):
+        if node["Node Type"] == "Seq Scan" and node["Relation Name"] in large:
+            found.append(f"Seq Scan on {node['Relation Name']}")
+        if node["Node Type"] in ("Sort", "Incremental Sort") and node["Plan Rows"] >= LARGE_RELATION_ROWS:
+            found.append(f"{node['Node Type']} of ~{node['Plan Rows']} rows by {node['Sort Key']}")
+    return found
+
+
+ALL_STATEMENTS = sorted(STATEMENTS) + [
+    "fan_out_review",
+    "backfill_timeline",
+    "add_reviews_to_book_stats",
+]
+
+
+# ------------------------------
+# Plan Tests
+# ------------------------------
+class TestQueryPlans:
+
+    def test_every_registered_statement_has_params(self, plan_params):
+        """Test new registered statements can't slip past the suite"""
+        missing = [name for name, (_, params) in plan_params.items() if params is None]
+
+        assert missing == []
+
+    def test_dataset_is_large(self, large_relations):
+        """Test the generated tables are big enough for the planner to care"""
+        assert {"users", "books", "reviews", "followers", "timelines", "book_stats", "book_recommendations"} <= large_relations
+
+    @pytest.mark.parametrize("name", ALL_STATEMENTS)
+    def test_no_full_scans(self, name, plan_conn, plan_params, large_relations):
+        """Test the statement is planned without seq scans or sorts over large relations"""
+        if name not in plan_params:
+            pytest.skip(f"{name} isn't used on this database")
+        statement, params = plan_params[name]
+
+        plan = explain(plan_conn, statement, params)
+
+        assert violations(plan, large_relations) == [], json.dumps(plan, indent=2)
+
+    @pytest.mark.parametrize("name", ALL_STATEMENTS)
+    def test_cost_within_baseline(self, name, plan_conn, plan_params, baselines):
+        """Test the plan's estimated cost hasn't regressed past its baseline"""
+        if name not in plan_params:
+            pytest.skip(f"{name} isn't used on this database")
+        statement, params = plan_params[name]
+
+        cost = explain(plan_conn, statement, params)["Total Cost"]
+
+        if PLAN_BASELINES_UPDATE:
+            baselines[name] = round(cost, 2)
+            return
+        assert name in baselines, f"No baseline for {name}; record one with PLAN_BASELINES_UPDATE=1"
+        assert cost <= baselines[name] * COST_TOLERANCE
@@ -0,0 +1,46 @@
+"""
+Shared fixtures for the few unit tests that need a real Postgres
+"""
+import os
+
+import psycopg
+import pytest
+from psycopg import sql
+from psycopg.conninfo import make_conninfo
+from psycopg.rows import dict_row
+from app.database.core import DATABASE_URL
+from app.database.migrations import migrate
+
+# Same server settings as the query-plan suite; its own scratch database
+UNIT_TEST_DATABASE_URL = os.getenv("PLAN_TEST_DATABASE_URL", DATABASE_URL)
+UNIT_TEST_DB_NAME = "goodreads_unit_tests"
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture(scope="session")
+def scratch_db_url():
+    """Conninfo of a freshly migrated, empty database; dropped afterwards"""
+    try:
+        admin = psycopg.connect(make_conninfo(UNIT_TEST_DATABASE_URL, dbname="postgres", connect_timeout=3), autocommit=True)
+    except psycopg.OperationalError as exc:
+        pytest.skip(f"no local Postgres: {exc}")
+    database = sql.Identifier(UNIT_TEST_DB_NAME)
+    admin.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(database))
+    admin.execute(sql.SQL("CREATE DATABASE {}").format(database))
+    url = make_conninfo(UNIT_TEST_DATABASE_URL, dbname=UNIT_TEST_DB_NAME)
+    try:
+        with psycopg.connect(url, autocommit=True) as conn:
+            migrate(conn)
+        yield url
+    finally:
+        admin.execute(sql.SQL("DROP DATABASE IF EXISTS {} WITH (FORCE)").format(database))
+        admin.close()
+
+
+@pytest.fixture
+def db_conn(scratch_db_url):
+    """Connection to the scratch database, configured like a pooled one"""
+    with psycopg.connect(scratch_db_url, row_factory=dict_row) as conn:
+        yield conn
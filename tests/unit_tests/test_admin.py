@@ -0,0 +1,140 @@
+"""
+Unit tests for the slow-query log and the admin profiling routes
+"""
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.database import statements
+from app.database.statements import get_slow_queries, params_shape, record_query
+from app.profiling import ProfilerBusy, _profile_lock, sample_profile
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database and an admin token"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    with patch("app.models.admin.ADMIN_TOKEN", "s3cret"):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+ADMIN = {"X-Admin-Token": "s3cret"}
+
+
+@pytest.fixture
+def slow_log():
+    """Empty slow-query log with a 50ms threshold"""
+    statements._slow_queries.clear()
+    with patch("app.database.statements.SLOW_QUERY_MS", 50):
+        yield
+    statements._slow_queries.clear()
+
+
+def busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(range(1000))
+
+
+# ------------------------------
+# Slow-Query Log Tests
+# ------------------------------
+class TestSlowQueryLog:
+
+    def test_params_shape_hides_values(self):
+        """Test parameters are reduced to types and list lengths"""
+        assert params_shape({"review_ids": [1, 2, 3], "user_id": 7}) == {"review_ids": "list[3]", "user_id": "int"}
+        assert params_shape(("Alice", "Alice")) == ["str", "str"]
+        assert params_shape(None) is None
+
+    def test_only_slow_statements_are_kept(self, slow_log):
+        """Test statements under the threshold aren't logged, slower ones are, newest first"""
+        now = time.perf_counter()
+        record_query("get_user", now - 0.001, 1, {"user_id": 1})
+        record_query("get_newsfeed", now - 0.2, 20, {"user_id": 1, "limit": 20})
+        record_query("list_top_rated", now - 0.3, 10, None)
+
+        logged = get_slow_queries()
+
+        assert [entry["query"] for entry in logged] == ["list_top_rated", "get_newsfeed"]
+        assert logged[1]["rows"] == 20
+        assert logged[1]["params"] == {"user_id": "int", "limit": "int"}
+        assert logged[1]["duration_ms"] >= 200
+
+
+# ------------------------------
+# Profiler Tests
+# ------------------------------
+class TestSampleProfile:
+
+    def test_busy_thread_shows_up(self):
+        """Test a thread burning CPU dominates the self samples"""
+        stop = threading.Event()
+        worker = threading.Thread(target=busy_loop, args=(stop,))
+        worker.start()
+        try:
+            profile = sample_profile(0.3, interval=0.002, top=5)
+        finally:
+            stop.set()
+            worker.join()
+
+        assert profile["busy_samples"] > 0
+        assert any("busy_loop" in row["function"] for row in profile["top_cumulative"])
+
+    def test_one_capture_at_a_time(self):
+        """Test a second capture is refused while one is running"""
+        with _profile_lock:
+            with pytest.raises(ProfilerBusy):
+                sample_profile(0.01)
+
+
+# ------------------------------
+# Admin Route Tests
+# ------------------------------
+class TestAdminRoutes:
+
+    def test_disabled_without_token(self):
+        """Test the admin routes don't exist unless ADMIN_TOKEN is set"""
+        response = TestClient(app).get("/admin/slow-queries", headers=ADMIN)
+
+        assert response.status_code == 404
+
+    def test_wrong_token(self, client):
+        """Test a wrong or missing token is refused"""
+        assert client.get("/admin/slow-queries", headers={"X-Admin-Token": "nope"}).status_code == 403
+        assert client.post("/admin/profile?seconds=1").status_code == 403
+
+    def test_slow_queries(self, client, slow_log):
+        """Test the slow-query log is served to admins"""
+        record_query("get_newsfeed", time.perf_counter() - 0.2, 20)
+
+        response = client.get("/admin/slow-queries", headers=ADMIN)
+
+        assert response.status_code == 200
+        assert response.json()[0]["query"] == "get_newsfeed"
+
+    @patch("app.main.sample_profile")
+    def test_profile(self, mock_profile, client):
+        """Test the profile window and size are passed through and bounded"""
+        mock_profile.return_value = {"samples": 1}
+
+        assert client.post("/admin/profile?seconds=2&top=10", headers=ADMIN).json() == {"samples": 1}
+        mock_profile.assert_called_once_with(2, top=10)
+        assert client.post("/admin/profile?seconds=600", headers=ADMIN).status_code == 422
+
+    @patch("app.main.sample_profile", side_effect=ProfilerBusy("busy"))
+    def test_profile_busy(self, _, client):
+        """Test a concurrent capture is answered with 409"""
+        assert client.post("/admin/profile?seconds=1", headers=ADMIN).status_code == 409
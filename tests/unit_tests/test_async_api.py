@@ -0,0 +1,151 @@
+"""
+Unit tests for the async API stack (app.main_async)
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import AsyncMock, Mock, patch
+from app.main_async import app
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Collections with no version row yet, so conditional GETs never short-circuit"""
+    with patch('app.bizlogic_async.users.get_users_version', new_callable=AsyncMock, return_value=None), \
+            patch('app.bizlogic_async.books.get_books_version', new_callable=AsyncMock, return_value=None), \
+            patch('app.bizlogic_async.reviews.get_book_reviews_version', new_callable=AsyncMock, return_value=None):
+        yield
+
+
+@pytest.fixture
+def sample_user():
+    """Sample user data"""
+    return {"id": 1, "name": "Alice", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+
+@pytest.fixture
+def sample_book():
+    """Sample book data"""
+    return {"id": 1, "title": "Test Book", "author": "Test Author", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+async def get_mock_async_connection():
+    """Override for async database connection dependency"""
+    conn = Mock()
+    conn.commit = AsyncMock()
+    conn.rollback = AsyncMock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_async_connection
+    app.dependency_overrides[get_async_connection] = get_mock_async_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Async Endpoint Tests
+# ------------------------------
+class TestAsyncEndpoints:
+
+    @patch('app.bizlogic_async.users.users_queries.list_users', new_callable=AsyncMock)
+    def test_list_users_success(self, mock_list_users, client, sample_user):
+        """Test GET /users returns list of users"""
+        mock_list_users.return_value = [sample_user]
+
+        response = client.get("/users")
+
+        assert response.status_code == 200
+        assert response.json()[0]["name"] == "Alice"
+        mock_list_users.assert_awaited_once()
+
+    @patch('app.bizlogic_async.users.users_queries.get_user', new_callable=AsyncMock)
+    def test_get_user_not_found(self, mock_get_user, client):
+        """Test GET /users/{user_id} returns 404 when user not found"""
+        mock_get_user.return_value = None
+
+        response = client.get("/users/999")
+
+        assert response.status_code == 404
+        assert response.json()["detail"] == "User not found"
+
+    @patch('app.bizlogic_async.books.get_book', new_callable=AsyncMock)
+    def test_get_book_success(self, mock_get_book, client, sample_book):
+        """Test GET /books/{book_id} returns book"""
+        mock_get_book.return_value = sample_book
+
+        response = client.get("/books/1")
+
+        assert response.status_code == 200
+        assert response.json()["title"] == "Test Book"
+
+    @patch('app.bizlogic_async.reviews.reviews_queries.insert_review', new_callable=AsyncMock)
+    def test_add_review_success(self, mock_insert, client):
+        """Test POST /reviews inserts the review without separate existence checks"""
+        mock_insert.return_value = {"id": 1, "user_id": 1, "book_id": 1, "rating": 5, "content": "Great book!"}
+
+        response = client.post("/reviews", json={
+            "user_id": 1,
+            "book_id": 1,
+            "rating": 5,
+            "content": "Great book!"
+        })
+
+        assert response.status_code == 200
+        assert response.json()["rating"] == 5
+        mock_insert.assert_awaited_once()
+
+    @patch('app.bizlogic_async.follows.get_newsfeed', new_callable=AsyncMock)
+    def test_get_newsfeed(self, mock_newsfeed, client):
+        """Test GET /users/{user_id}/newsfeed returns feed"""
+        mock_newsfeed.return_value = [{"id": 1, "user_id": 2, "book_id": 1, "rating": 5, "content": "Loved it!"}]
+
+        response = client.get("/users/1/newsfeed")
+
+        assert response.status_code == 200
+        assert response.json()[0]["content"] == "Loved it!"
+
+    @patch('app.bizlogic_async.reviews.users_queries.get_users', new_callable=AsyncMock)
+    @patch('app.bizlogic_async.follows.get_newsfeed', new_callable=AsyncMock)
+    def test_get_newsfeed_expanded(self, mock_newsfeed, mock_get_users, client, sample_user):
+        """Test ?expand=user embeds each review's author, loaded in one batch"""
+        mock_newsfeed.return_value = [{"id": 1, "user_id": 1, "book_id": 1, "rating": 5, "content": "Loved it!"}]
+        mock_get_users.return_value = [sample_user]
+
+        response = client.get("/users/2/newsfeed?expand=user")
+
+        assert response.json()[0]["user"]["name"] == "Alice"
+        mock_get_users.assert_awaited_once()
+
+    @patch('app.bizlogic_async.users.users_queries.get_users', new_callable=AsyncMock)
+    def test_get_users_by_ids(self, mock_get_users, client, sample_user):
+        """Test GET /users?ids= returns the rows of those ids"""
+        mock_get_users.return_value = [sample_user]
+
+        response = client.get("/users?ids=1,2")
+
+        assert response.json()[0]["id"] == 1
+        assert mock_get_users.call_args.kwargs == {"user_ids": [1, 2]}
+
+    @patch('app.bizlogic_async.follows.unfollow_user', new_callable=AsyncMock)
+    def test_unfollow_user_success(self, mock_unfollow, client):
+        """Test POST /unfollow/{followee_id} removes follow relationship"""
+        response = client.post("/unfollow/2?follower_id=1")
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "ok"
+        mock_unfollow.assert_awaited_once()
@@ -0,0 +1,132 @@
+"""
+Unit tests for multi-get routes and review expansions
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def review():
+    """Review row as the list queries return it"""
+    return {
+        "id": 7,
+        "user_id": 1,
+        "book_id": 2,
+        "rating": 5,
+        "content": "Great read",
+        "created_at": "2024-01-01T00:00:00",
+    }
+
+
+def user(user_id):
+    return {"id": user_id, "name": f"user {user_id}", "created_at": "2024-01-01T00:00:00"}
+
+
+def book(book_id):
+    return {"id": book_id, "title": f"book {book_id}", "author": "author", "created_at": "2024-01-01T00:00:00"}
+
+
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Multi-get Tests
+# ------------------------------
+class TestMultiGet:
+
+    @patch('app.bizlogic.users.get_users_query')
+    def test_get_users_by_ids(self, mock_get_users, client):
+        """Test GET /users?ids= returns the rows of those ids, not a page"""
+        mock_get_users.return_value = [user(3), user(1)]
+
+        response = client.get("/users?ids=3,1,404")
+
+        assert response.status_code == 200
+        assert response.json() == [user(3), user(1)]
+        assert mock_get_users.call_args.kwargs == {"user_ids": [3, 1, 404]}
+        assert "X-Next-Cursor" not in response.headers
+
+    @patch('app.bizlogic.books.books_queries.get_books')
+    def test_get_books_by_ids(self, mock_get_books, client):
+        """Test GET /books?ids= returns the rows of those ids"""
+        mock_get_books.return_value = [book(2)]
+
+        response = client.get("/books?ids=2")
+
+        assert response.status_code == 200
+        assert response.json() == [book(2)]
+
+    def test_invalid_ids(self, client):
+        """Test ids must be integers, at most a page of them"""
+        assert client.get("/users?ids=1,x").status_code == 400
+        assert client.get("/books", params={"ids": ",".join(map(str, range(501)))}).status_code == 400
+
+
+# ------------------------------
+# Expansion Tests
+# ------------------------------
+class TestReviewExpansions:
+
+    @patch('app.bizlogic.reviews.books_queries.get_books')
+    @patch('app.bizlogic.reviews.users_queries.get_users')
+    @patch('app.bizlogic.reviews.reviews_queries.list_reviews_by_user')
+    def test_expand_user_and_book(self, mock_list, mock_get_users, mock_get_books, client, review):
+        """Test ?expand=user,book embeds both rows, each kind loaded in one batch"""
+        mock_list.return_value = [review, review | {"id": 6, "book_id": 3}]
+        mock_get_users.return_value = [user(1)]
+        mock_get_books.return_value = [book(2)]
+
+        response = client.get("/users/1/reviews?expand=user,book")
+
+        assert response.status_code == 200
+        first, second = response.json()
+        assert first["user"] == user(1) and first["book"] == book(2)
+        assert second["book"] is None
+        assert mock_get_users.call_args.kwargs == {"user_ids": [1, 1]}
+        assert mock_get_books.call_args.kwargs == {"book_ids": [2, 3]}
+
+    @patch('app.bizlogic.reviews.books_queries.get_books')
+    @patch('app.bizlogic.reviews.users_queries.get_users')
+    @patch('app.bizlogic.follows.follows_queries.get_newsfeed')
+    def test_expand_newsfeed_user_only(self, mock_feed, mock_get_users, mock_get_books, client, review):
+        """Test only the asked-for rows are loaded"""
+        mock_feed.return_value = [review]
+        mock_get_users.return_value = [user(1)]
+
+        response = client.get("/users/9/newsfeed?expand=user")
+
+        assert response.json() == [review | {"user": user(1)}]
+        mock_get_books.assert_not_called()
+
+    @patch('app.bizlogic.reviews.users_queries.get_users')
+    @patch('app.bizlogic.reviews.reviews_queries.list_reviews_by_user')
+    def test_no_expansion_by_default(self, mock_list, mock_get_users, client, review):
+        """Test plain pages are unchanged"""
+        mock_list.return_value = [review]
+
+        assert client.get("/users/1/reviews").json() == [review]
+        mock_get_users.assert_not_called()
+
+    def test_unknown_expansion(self, client):
+        """Test an unknown expansion is rejected"""
+        response = client.get("/users/1/newsfeed?expand=user,author")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Unknown expansion: author"
@@ -0,0 +1,154 @@
+"""
+Unit tests for book rating aggregates and the top-rated leaderboard
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.database.cache import books_cache
+from app.database.pagination import encode_cursor
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def sample_stats():
+    """Aggregate row as GET_BOOK_STATS_SQL returns it"""
+    return {"book_id": 1, "review_count": 2, "average_rating": 4.5, "ratings": {"1": 0, "2": 0, "3": 0, "4": 1, "5": 1}}
+
+
+@pytest.fixture
+def top_rated_book():
+    """Leaderboard row"""
+    return {"id": 3, "title": "T", "author": "A", "created_at": "2024-01-01T00:00:00", "review_count": 7, "average_rating": 4.25}
+
+
+@pytest.fixture(autouse=True)
+def clear_books_cache():
+    books_cache.clear()
+    yield
+    books_cache.clear()
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    conn = Mock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Stats Endpoint Tests
+# ------------------------------
+class TestBookStatsEndpoint:
+
+    @patch('app.bizlogic.books.book_stats_queries.get_book_stats')
+    def test_get_book_stats(self, mock_stats, client, sample_stats):
+        """Test GET /books/{id}/stats returns the aggregate row"""
+        mock_stats.return_value = sample_stats
+
+        response = client.get("/books/1/stats")
+
+        assert response.status_code == 200
+        assert response.json() == sample_stats
+
+    @patch('app.bizlogic.books.books_queries.get_book')
+    @patch('app.bizlogic.books.book_stats_queries.get_book_stats')
+    def test_book_without_reviews(self, mock_stats, mock_get_book, client):
+        """Test a book with no reviews yet gets zeroed stats"""
+        mock_stats.return_value = None
+        mock_get_book.return_value = {"id": 2}
+
+        response = client.get("/books/2/stats")
+
+        assert response.json()["review_count"] == 0
+        assert response.json()["average_rating"] is None
+
+    @patch('app.bizlogic.books.books_queries.get_book')
+    @patch('app.bizlogic.books.book_stats_queries.get_book_stats')
+    def test_unknown_book(self, mock_stats, mock_get_book, client):
+        """Test stats of a missing book are a 404"""
+        mock_stats.return_value = None
+        mock_get_book.return_value = None
+
+        response = client.get("/books/999/stats")
+
+        assert response.status_code == 404
+
+
+# ------------------------------
+# Leaderboard Tests
+# ------------------------------
+class TestTopRated:
+
+    @patch('app.bizlogic.books.book_stats_queries.list_top_rated')
+    def test_route_is_not_shadowed_by_book_id(self, mock_list, client, top_rated_book):
+        """Test /books/top-rated isn't parsed as /books/{book_id}"""
+        mock_list.return_value = [top_rated_book]
+
+        response = client.get("/books/top-rated?limit=1&min_reviews=5")
+
+        assert response.status_code == 200
+        assert response.json()[0]["average_rating"] == 4.25
+        mock_list.assert_called_once_with(mock_list.call_args.args[0], limit=1, min_reviews=5, after=None)
+
+    @patch('app.bizlogic.books.book_stats_queries.list_top_rated')
+    def test_cursor_round_trip(self, mock_list, client, top_rated_book):
+        """Test the next-page cursor carries (average_rating, review_count, id)"""
+        mock_list.return_value = [top_rated_book]
+
+        cursor = client.get("/books/top-rated?limit=1").headers["X-Next-Cursor"]
+        client.get("/books/top-rated", params={"limit": 1, "after": cursor})
+
+        assert cursor == encode_cursor(4.25, 7, 3)
+        assert mock_list.call_args.kwargs["after"] == (4.25, 7, 3)
+
+    def test_invalid_cursor(self, client):
+        """Test a malformed cursor is a 400"""
+        response = client.get("/books/top-rated?after=garbage")
+
+        assert response.status_code == 400
+
+
+# ------------------------------
+# Write Path Tests
+# ------------------------------
+class TestIncrementalMaintenance:
+
+    def test_insert_review_updates_stats_in_same_statement(self):
+        """Test the review insert bumps book_stats without an extra round trip"""
+        from app.database.queries.reviews import INSERT_REVIEW_SQL
+
+        assert "INSERT INTO book_stats" in INSERT_REVIEW_SQL
+        assert "ON CONFLICT (book_id) DO UPDATE" in INSERT_REVIEW_SQL
+
+    @patch('app.database.queries.reviews.execute_pipelined')
+    def test_copy_reviews_folds_into_stats(self, mock_pipelined):
+        """Test bulk-loaded reviews are added to the aggregates in the committing batch"""
+        from app.database.queries.book_stats import ADD_REVIEWS_TO_BOOK_STATS_SQL
+        from app.database.queries.reviews import copy_reviews
+
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.fetchall.return_value = [{"id": 10}, {"id": 11}]
+
+        copy_reviews(conn, reviews=[(1, 1, 5, "a"), (1, 2, 4, "b")])
+
+        (_, batch), _ = mock_pipelined.call_args
+        assert (ADD_REVIEWS_TO_BOOK_STATS_SQL, {"review_ids": [10, 11]}) in batch
@@ -2,6 +2,8 @@
 Unit tests for the Book endpoints and business logic
 Run with: pytest tests/test_books.py -v
 """
+from datetime import datetime, timezone
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
@@ -11,10 +13,19 @@ from app.main import app
 # ------------------------------
 # Fixtures
 # ------------------------------
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Collections with no version row yet, so conditional GETs never short-circuit"""
+    with patch('app.bizlogic.users.get_users_version', return_value=None), \
+            patch('app.bizlogic.books.get_books_version', return_value=None), \
+            patch('app.bizlogic.reviews.get_book_reviews_version', return_value=None):
+        yield
+
+
 @pytest.fixture
 def sample_book():
     """Sample book data"""
-    return {"id": 1, "title": "Test Book", "author": "Test Author", "created_at": "2024-01-01T00:00:00"}
+    return {"id": 1, "title": "Test Book", "author": "Test Author", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
 
 
 # ------------------------------
@@ -0,0 +1,213 @@
+"""
+Unit tests for the COPY-backed bulk ingest endpoints
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    conn = Mock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Bulk Endpoint Tests
+# ------------------------------
+class TestBulkEndpoints:
+
+    @patch('app.bizlogic.users.copy_users_query')
+    def test_bulk_users_reports_invalid_rows(self, mock_copy, client):
+        """Test invalid rows are reported and valid ones keep their position"""
+        mock_copy.return_value = [10, 11]
+
+        response = client.post("/users/bulk", json=[{"name": "A"}, {"invalid": "field"}, {"name": "B"}])
+
+        assert response.status_code == 200
+        body = response.json()
+        assert body["inserted"] == 2
+        assert body["ids"] == [10, None, 11]
+        assert body["errors"][0]["index"] == 1
+        mock_copy.assert_called_once()
+        assert mock_copy.call_args.kwargs == {"names": ["A", "B"]}
+
+    @patch('app.bizlogic.books.books_queries.copy_books')
+    def test_bulk_books_accepts_ndjson(self, mock_copy, client):
+        """Test NDJSON bodies are parsed line by line"""
+        mock_copy.return_value = [1, 2]
+        body = b'{"title": "T1", "author": "A1"}\n{"title": "T2", "author": "A2"}\n'
+
+        response = client.post("/books/bulk", content=body, headers={"Content-Type": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert response.json()["ids"] == [1, 2]
+        assert mock_copy.call_args.kwargs == {"books": [("T1", "A1"), ("T2", "A2")]}
+
+    @patch('app.bizlogic.reviews.reviews_queries.copy_reviews')
+    @patch('app.bizlogic.reviews.reviews_queries.existing_review_refs')
+    def test_bulk_reviews_checks_references(self, mock_refs, mock_copy, client):
+        """Test unknown users/books and bad ratings are rejected per row"""
+        mock_refs.return_value = ({1}, {1})
+        mock_copy.return_value = [100]
+
+        response = client.post("/reviews/bulk", json=[
+            {"user_id": 1, "book_id": 1, "rating": 5, "content": "ok"},
+            {"user_id": 2, "book_id": 1, "rating": 5, "content": "no user"},
+            {"user_id": 1, "book_id": 3, "rating": 5, "content": "no book"},
+            {"user_id": 1, "book_id": 1, "rating": 0, "content": "bad rating"},
+        ])
+
+        body = response.json()
+        assert body["ids"] == [100, None, None, None]
+        assert [e["detail"] for e in body["errors"]] == [
+            "User 2 does not exist",
+            "Book 3 does not exist",
+            "Rating must be between 1 and 5",
+        ]
+        assert mock_copy.call_args.kwargs == {"reviews": [(1, 1, 5, "ok")]}
+
+    @patch('app.bizlogic.users.copy_users_query')
+    def test_bulk_users_reports_oversized_name(self, mock_copy, client):
+        """Test a name longer than users.name is a row error, not a failed COPY"""
+        mock_copy.return_value = [10, 11]
+
+        response = client.post("/users/bulk", json=[{"name": "A"}, {"name": "x" * 121}, {"name": "x" * 120}])
+
+        assert response.status_code == 200
+        assert response.json()["ids"] == [10, None, 11]
+        assert [e["index"] for e in response.json()["errors"]] == [1]
+        assert mock_copy.call_args.kwargs == {"names": ["A", "x" * 120]}
+
+    @patch('app.bizlogic.books.books_queries.copy_books')
+    def test_bulk_books_reports_oversized_and_nul_rows(self, mock_copy, client):
+        """Test oversized titles/authors and NUL characters are row errors"""
+        mock_copy.return_value = [1]
+
+        response = client.post("/books/bulk", json=[
+            {"title": "T" * 256, "author": "A"},
+            {"title": "T", "author": "A"},
+            {"title": "T", "author": "A\x00"},
+        ])
+
+        assert response.status_code == 200
+        assert response.json()["ids"] == [None, 1, None]
+        assert [e["index"] for e in response.json()["errors"]] == [0, 2]
+        assert mock_copy.call_args.kwargs == {"books": [("T", "A")]}
+
+    @patch('app.bizlogic.reviews.reviews_queries.copy_reviews')
+    @patch('app.bizlogic.reviews.reviews_queries.existing_review_refs')
+    def test_bulk_reviews_reports_nul_content(self, mock_refs, mock_copy, client):
+        """Test review content with a NUL character is a row error"""
+        mock_refs.return_value = ({1}, {1})
+        mock_copy.return_value = [100]
+
+        response = client.post("/reviews/bulk", json=[
+            {"user_id": 1, "book_id": 1, "rating": 5, "content": "bad\x00"},
+            {"user_id": 1, "book_id": 1, "rating": 5, "content": "ok"},
+        ])
+
+        assert response.status_code == 200
+        assert response.json()["ids"] == [None, 100]
+        assert [e["index"] for e in response.json()["errors"]] == [0]
+        assert mock_copy.call_args.kwargs == {"reviews": [(1, 1, 5, "ok")]}
+
+    @patch('app.bizlogic.users.copy_users_query')
+    def test_bulk_with_no_valid_rows_skips_copy(self, mock_copy, client):
+        """Test nothing is loaded when every row is invalid"""
+        response = client.post("/users/bulk", json=[{}])
+
+        assert response.json()["inserted"] == 0
+        mock_copy.assert_not_called()
+
+    def test_bulk_malformed_body(self, client):
+        """Test a body that is not JSON is a 400"""
+        response = client.post("/users/bulk", content=b"{not json")
+
+        assert response.status_code == 400
+
+    def test_bulk_requires_array(self, client):
+        """Test a single object is not accepted as a bulk body"""
+        response = client.post("/users/bulk", json={"name": "A"})
+
+        assert response.status_code == 400
+
+    @patch('app.models.bulk.BULK_MAX_ROWS', 1)
+    def test_bulk_row_limit(self, client):
+        """Test oversized batches are refused"""
+        response = client.post("/users/bulk", json=[{"name": "A"}, {"name": "B"}])
+
+        assert response.status_code == 413
+
+    @patch('app.models.bulk.BULK_MAX_ROWS', 1)
+    def test_bulk_row_limit_stops_parsing(self, client):
+        """Test the row cap is hit before the rest of the body is parsed, in both formats"""
+        array = client.post("/users/bulk", content=b'[{"name": "A"}, {"name": "B"}, not json')
+        ndjson = client.post(
+            "/users/bulk", content=b'{"name": "A"}\n{"name": "B"}\nnot json\n',
+            headers={"Content-Type": "application/x-ndjson"},
+        )
+
+        assert array.status_code == 413
+        assert ndjson.status_code == 413
+
+    @patch('app.models.bulk.BULK_MAX_BYTES', 10)
+    def test_bulk_byte_limit_from_content_length(self, client):
+        """Test a body announced as too large is refused without being read"""
+        with patch('app.models.bulk._body_chunks') as mock_chunks:
+            response = client.post("/users/bulk", json=[{"name": "A long enough name"}])
+
+        assert response.status_code == 413
+        mock_chunks.assert_not_called()
+
+    @patch('app.models.bulk.BULK_MAX_BYTES', 10)
+    def test_bulk_byte_limit_while_streaming(self, client):
+        """Test a chunked body without a Content-Length is refused once it grows past the limit"""
+        chunks = iter([b'{"name": "A"}\n', b'{"name": "B"}\n'])
+
+        response = client.post("/users/bulk", content=chunks, headers={"Content-Type": "application/x-ndjson"})
+
+        assert response.status_code == 413
+
+    @patch('app.bizlogic.books.books_queries.copy_books')
+    def test_bulk_ndjson_lines_split_across_chunks(self, mock_copy, client):
+        """Test NDJSON lines are reassembled when a chunk ends mid-line"""
+        mock_copy.return_value = [1, 2]
+        chunks = iter([b'{"title": "T1", "au', b'thor": "A1"}\r\n{"title": "T2",', b' "author": "A2"}'])
+
+        response = client.post("/books/bulk", content=chunks, headers={"Content-Type": "application/x-ndjson"})
+
+        assert response.status_code == 200
+        assert mock_copy.call_args.kwargs == {"books": [("T1", "A1"), ("T2", "A2")]}
+
+    @pytest.mark.parametrize("body", [b"[", b"[]]", b'[{"name": "A"},]', b'[{"name": "A"} {"name": "B"}]', b"[] []"])
+    def test_bulk_malformed_arrays(self, client, body):
+        """Test arrays cut short, with a trailing comma, a missing comma or extra data are a 400"""
+        assert client.post("/users/bulk", content=body).status_code == 400
+
+    @patch('app.bizlogic.users.copy_users_query')
+    def test_bulk_empty_and_spaced_arrays(self, mock_copy, client):
+        """Test whitespace anywhere between the elements is accepted"""
+        mock_copy.return_value = [1, 2]
+
+        assert client.post("/users/bulk", content=b" [ ] ").json()["inserted"] == 0
+        response = client.post("/users/bulk", content=b'\n[ {"name": "A"} ,\n\t{"name": "B"} ]\n')
+
+        assert response.json()["ids"] == [1, 2]
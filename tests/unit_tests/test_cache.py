@@ -0,0 +1,143 @@
+"""
+Unit tests for the in-process user/book cache
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from app.database.cache import EntityCache, MISSING, users_cache, books_cache
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def cache():
+    """Small cache for LRU/TTL behaviour"""
+    return EntityCache("test", max_size=2, ttl=60, negative_ttl=5)
+
+
+@pytest.fixture(autouse=True)
+def clear_entity_caches():
+    """Keep the module-level caches from leaking between tests"""
+    users_cache.clear()
+    books_cache.clear()
+    yield
+    users_cache.clear()
+    books_cache.clear()
+
+
+@pytest.fixture
+def mock_conn():
+    """Mock connection whose cursor() works as a context manager"""
+    return MagicMock()
+
+
+def cursor_of(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+
+# ------------------------------
+# EntityCache Tests
+# ------------------------------
+class TestEntityCache:
+
+    def test_miss_then_hit(self, cache):
+        """Test values are returned after being set and counted"""
+        assert cache.get(1) is MISSING
+        cache.set(1, {"id": 1})
+
+        assert cache.get(1) == {"id": 1}
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_returns_copies(self, cache):
+        """Test callers cannot mutate the cached row"""
+        cache.set(1, {"id": 1})
+        cache.get(1)["id"] = 99
+
+        assert cache.get(1) == {"id": 1}
+
+    def test_evicts_least_recently_used(self, cache):
+        """Test the cache stays bounded and keeps recently read keys"""
+        cache.set(1, {"id": 1})
+        cache.set(2, {"id": 2})
+        cache.get(1)
+        cache.set(3, {"id": 3})
+
+        assert cache.get(2) is MISSING
+        assert cache.get(1) == {"id": 1}
+        assert cache.stats()["size"] == 2
+
+    @patch('app.database.cache.time.monotonic')
+    def test_negative_entries_expire_sooner(self, mock_monotonic, cache):
+        """Test cached 404s use the shorter negative TTL"""
+        mock_monotonic.return_value = 0
+        cache.set(1, {"id": 1})
+        cache.set(2, None)
+
+        mock_monotonic.return_value = 10
+        assert cache.get(1) == {"id": 1}
+        assert cache.get(2) is MISSING
+
+    def test_disabled_cache_never_hits(self):
+        """Test the switch turns the cache into a pass-through"""
+        cache = EntityCache("off", max_size=2, ttl=60, negative_ttl=5, enabled=False)
+        cache.set(1, {"id": 1})
+
+        assert cache.get(1) is MISSING
+
+    def test_invalidate(self, cache):
+        """Test explicit invalidation drops the entry"""
+        cache.set(1, {"id": 1})
+        cache.invalidate(1)
+
+        assert cache.get(1) is MISSING
+
+
+# ------------------------------
+# Read-through Query Tests
+# ------------------------------
+class TestCachedQueries:
+
+    def test_get_user_reads_through_once(self, mock_conn):
+        """Test a second lookup is served without a query"""
+        from app.database.queries.users import get_user
+
+        cursor_of(mock_conn).fetchone.return_value = {"id": 1, "name": "Alice"}
+
+        assert get_user(mock_conn, user_id=1)["name"] == "Alice"
+        assert get_user(mock_conn, user_id=1)["name"] == "Alice"
+        cursor_of(mock_conn).execute.assert_called_once()
+
+    def test_insert_book_populates_cache(self, mock_conn):
+        """Test a freshly inserted book is served from the cache"""
+        from app.database.queries.books import get_book, insert_book
+
+        cursor_of(mock_conn).fetchall.return_value = [{"id": 5, "title": "T", "author": "A"}]
+        insert_book(mock_conn, title="T", author="A")
+
+        assert get_book(mock_conn, book_id=5)["title"] == "T"
+        cursor_of(mock_conn).execute.assert_called_once()
+
+    def test_missing_user_is_negatively_cached(self, mock_conn):
+        """Test a miss is remembered"""
+        from app.database.queries.users import get_user
+
+        cursor_of(mock_conn).fetchone.return_value = None
+
+        for _ in range(2):
+            assert get_user(mock_conn, user_id=42) is None
+
+        cursor_of(mock_conn).execute.assert_called_once()
+
+    def test_get_users_looks_up_only_misses(self, mock_conn):
+        """Test a multi-get reads cached rows from the cache and the rest with one query"""
+        from app.database.queries.users import get_users
+
+        users_cache.set(1, {"id": 1, "name": "Alice"})
+        cursor_of(mock_conn).fetchall.return_value = [{"id": 2, "name": "Bob"}]
+
+        assert [u["id"] for u in get_users(mock_conn, user_ids=[2, 1, 3, 2])] == [2, 1, 2]
+        assert cursor_of(mock_conn).execute.call_args.args[1] == {"user_ids": [2, 3]}
+
+        get_users(mock_conn, user_ids=[1, 2, 3])
+        cursor_of(mock_conn).execute.assert_called_once()
@@ -0,0 +1,199 @@
+"""
+Unit tests for ETag / Last-Modified conditional GETs
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from starlette.requests import Request
+from app.main import app
+from app.models.conditional import collection_validators, entity_validators, is_not_modified
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def version():
+    """A collection version row"""
+    return {"version": 7}
+
+
+@pytest.fixture
+def book():
+    """A books row"""
+    return {"id": 5, "title": "T", "author": "A", "created_at": datetime(2024, 3, 1, 12, 30, 15, 250000, tzinfo=timezone.utc)}
+
+
+def request_with(**headers) -> Request:
+    raw = [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()]
+    return Request({"type": "http", "headers": raw})
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Validator Tests
+# ------------------------------
+class TestValidators:
+
+    def test_collection_headers(self, version):
+        """Test a version row becomes an ETag and caching headers, without Last-Modified"""
+        headers = collection_validators("users", version)
+
+        assert headers["ETag"] == 'W/"users-7"'
+        assert "Last-Modified" not in headers
+        assert headers["Cache-Control"].startswith("public, max-age=")
+        assert headers["Vary"] == "Accept"
+
+    def test_unwritten_collection(self):
+        """Test a missing version row still gets a stable ETag"""
+        headers = collection_validators("book-3-reviews", None)
+
+        assert headers["ETag"] == 'W/"book-3-reviews-0"'
+
+    def test_entity_headers(self, book):
+        """Test entity validators come from the row's id and created_at"""
+        headers = entity_validators("book", book)
+
+        assert headers["ETag"] == 'W/"book-5-1709296215250000"'
+        assert headers["Last-Modified"] == "Fri, 01 Mar 2024 12:30:15 GMT"
+        assert "Vary" not in headers
+
+
+# ------------------------------
+# Precondition Tests
+# ------------------------------
+class TestIsNotModified:
+
+    @pytest.mark.parametrize("if_none_match", [
+        'W/"users-7"',
+        '"users-7"',
+        '"other", W/"users-7"',
+        "*",
+    ])
+    def test_if_none_match_hits(self, version, if_none_match):
+        """Test matching tags (weak comparison, lists, *) are not modified"""
+        validators = collection_validators("users", version)
+
+        assert is_not_modified(request_with(if_none_match=if_none_match), validators)
+
+    def test_if_none_match_miss(self, version):
+        """Test a stale tag is modified"""
+        validators = collection_validators("users", version)
+
+        assert not is_not_modified(request_with(if_none_match='W/"users-6-1"'), validators)
+
+    def test_if_modified_since(self, book):
+        """Test If-Modified-Since compares at whole-second precision"""
+        validators = entity_validators("book", book)
+
+        assert is_not_modified(request_with(if_modified_since="Fri, 01 Mar 2024 12:30:15 GMT"), validators)
+        assert not is_not_modified(request_with(if_modified_since="Fri, 01 Mar 2024 12:30:14 GMT"), validators)
+
+    def test_if_none_match_takes_precedence(self, book):
+        """Test If-Modified-Since is ignored when If-None-Match is present"""
+        validators = entity_validators("book", book)
+        request = request_with(if_none_match='W/"stale"', if_modified_since="Sat, 01 Mar 2025 00:00:00 GMT")
+
+        assert not is_not_modified(request, validators)
+
+    def test_malformed_if_modified_since(self, book):
+        """Test an unparseable date is treated as absent"""
+        validators = entity_validators("book", book)
+
+        assert not is_not_modified(request_with(if_modified_since="yesterday"), validators)
+
+
+# ------------------------------
+# Route Tests
+# ------------------------------
+class TestConditionalRoutes:
+
+    @patch('app.bizlogic.users.list_users_query')
+    @patch('app.bizlogic.users.get_users_version')
+    def test_unchanged_collection_is_304(self, mock_version, mock_list, client, version):
+        """Test a matching ETag skips the page query and the body"""
+        mock_version.return_value = version
+
+        response = client.get("/users", headers={"If-None-Match": 'W/"users-7"'})
+
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["ETag"] == 'W/"users-7"'
+        mock_list.assert_not_called()
+
+    @patch('app.bizlogic.books.books_queries.list_books')
+    @patch('app.bizlogic.books.get_books_version')
+    def test_changed_collection_is_200_with_validators(self, mock_version, mock_list, client, version, book):
+        """Test a stale ETag gets the page plus a fresh ETag"""
+        mock_version.return_value = version
+        mock_list.return_value = [book]
+
+        response = client.get("/books", headers={"If-None-Match": 'W/"books-6"'})
+
+        assert response.status_code == 200
+        assert response.headers["ETag"] == 'W/"books-7"'
+        assert "Last-Modified" not in response.headers
+
+    @patch('app.bizlogic.reviews.reviews_queries.list_reviews_by_book')
+    @patch('app.bizlogic.reviews.get_book_reviews_version')
+    def test_book_reviews_versioned_per_book(self, mock_version, mock_list, client, version):
+        """Test a book's review list is validated against that book's version"""
+        mock_version.return_value = version
+
+        response = client.get("/books/3/reviews", headers={"If-None-Match": 'W/"book-3-reviews-7"'})
+
+        assert response.status_code == 304
+        assert mock_version.call_args.args[1] == 3
+        mock_list.assert_not_called()
+
+    @patch('app.bizlogic.users.list_users_query')
+    @patch('app.bizlogic.users.get_users_version')
+    def test_collection_ignores_if_modified_since(self, mock_version, mock_list, client, version):
+        """Test a collection is never a 304 on a date, which can't track late commits"""
+        mock_version.return_value = version
+        mock_list.return_value = []
+
+        response = client.get("/users", headers={"If-Modified-Since": "Sat, 01 Mar 2100 00:00:00 GMT"})
+
+        assert response.status_code == 200
+
+    @patch('app.bizlogic.books.get_books_version')
+    def test_stream_skips_validators(self, mock_version, client):
+        """Test NDJSON exports are never answered with a 304"""
+        with patch('app.bizlogic.books.books_queries.iter_books', return_value=iter([])):
+            response = client.get("/books?stream=1", headers={"If-None-Match": "*"})
+
+        assert response.status_code == 200
+        mock_version.assert_not_called()
+
+    @patch('app.bizlogic.books.get_book')
+    def test_unchanged_entity_is_304(self, mock_get_book, client, book):
+        """Test an entity route answers 304 for its current ETag"""
+        mock_get_book.return_value = book
+
+        etag = client.get("/books/5").headers["ETag"]
+        response = client.get("/books/5", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
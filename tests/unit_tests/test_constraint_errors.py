@@ -0,0 +1,106 @@
+"""
+Unit tests for mapping constraint violations on the write paths to 400s
+"""
+import pytest
+from fastapi import HTTPException
+from psycopg.errors import CheckViolation, ForeignKeyViolation, UniqueViolation
+from unittest.mock import MagicMock, patch
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+def violation(exc_class, constraint_name):
+    """Build a psycopg error carrying the given constraint name"""
+    exc = exc_class("constraint violated")
+    diag = MagicMock()
+    diag.constraint_name = constraint_name
+    return exc, diag
+
+
+@pytest.fixture
+def failing_conn():
+    """Mock connection whose next execute() raises the configured error"""
+    return MagicMock()
+
+
+def raise_on_execute(conn, exc_class, constraint_name):
+    exc, diag = violation(exc_class, constraint_name)
+    conn.cursor.return_value.__enter__.return_value.execute.side_effect = exc
+    return patch.object(exc_class, "diag", diag)
+
+
+# ------------------------------
+# Review Write Path Tests
+# ------------------------------
+class TestReviewConstraintErrors:
+
+    @pytest.mark.parametrize("constraint, detail", [
+        ("reviews_user_id_fkey", "User 1 does not exist"),
+        ("reviews_book_id_fkey", "Book 2 does not exist"),
+    ])
+    def test_missing_reference_is_400(self, failing_conn, constraint, detail):
+        """Test foreign key violations keep the existing 400 messages"""
+        from app.database.queries.reviews import insert_review
+
+        with raise_on_execute(failing_conn, ForeignKeyViolation, constraint):
+            with pytest.raises(HTTPException) as exc:
+                insert_review(failing_conn, user_id=1, book_id=2, rating=5, content="x")
+
+        assert exc.value.status_code == 400
+        assert exc.value.detail == detail
+        failing_conn.rollback.assert_called_once()
+
+    def test_rating_out_of_range_is_400(self, failing_conn):
+        """Test the rating CHECK constraint surfaces as a 400"""
+        from app.database.queries.reviews import insert_review
+
+        with raise_on_execute(failing_conn, CheckViolation, "reviews_rating_check"):
+            with pytest.raises(HTTPException) as exc:
+                insert_review(failing_conn, user_id=1, book_id=2, rating=9, content="x")
+
+        assert exc.value.detail == "Rating must be between 1 and 5"
+
+
+# ------------------------------
+# Follow Write Path Tests
+# ------------------------------
+class TestFollowConstraintErrors:
+
+    def test_unknown_followee_is_400(self, failing_conn):
+        """Test following a missing user is a 400"""
+        from app.database.queries.follows import follow_user
+
+        with raise_on_execute(failing_conn, ForeignKeyViolation, "followers_followee_id_fkey"):
+            with pytest.raises(HTTPException) as exc:
+                follow_user(failing_conn, follower_id=1, followee_id=99)
+
+        assert exc.value.detail == "User 99 does not exist"
+
+    def test_self_follow_is_400(self, failing_conn):
+        """Test the self-follow CHECK constraint surfaces as a 400"""
+        from app.database.queries.follows import follow_user
+
+        with raise_on_execute(failing_conn, CheckViolation, "chk_not_self_follow"):
+            with pytest.raises(HTTPException) as exc:
+                follow_user(failing_conn, follower_id=1, followee_id=1)
+
+        assert exc.value.detail == "Users cannot follow themselves"
+
+    def test_unknown_constraint_is_reraised(self, failing_conn):
+        """Test violations we don't know about are not swallowed"""
+        from app.database.queries.follows import follow_user
+
+        with raise_on_execute(failing_conn, CheckViolation, "some_other_check"):
+            with pytest.raises(CheckViolation):
+                follow_user(failing_conn, follower_id=1, followee_id=2)
+
+    def test_other_errors_are_untouched(self, failing_conn):
+        """Test only FK/CHECK violations are mapped"""
+        from app.database.queries.follows import follow_user
+
+        with raise_on_execute(failing_conn, UniqueViolation, "uq_follow"):
+            with pytest.raises(UniqueViolation):
+                follow_user(failing_conn, follower_id=1, followee_id=2)
+
+        failing_conn.rollback.assert_not_called()
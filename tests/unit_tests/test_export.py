@@ -0,0 +1,100 @@
+"""
+Unit tests for streaming NDJSON exports over server-side cursors
+"""
+import json
+from datetime import datetime, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    conn = Mock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Streaming Endpoint Tests
+# ------------------------------
+class TestNdjsonEndpoints:
+
+    @patch('app.bizlogic.users.iter_users_query')
+    def test_stream_query_param(self, mock_iter, client):
+        """Test ?stream=1 returns one JSON object per line"""
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_iter.return_value = iter([{"id": 1, "name": "Alice", "created_at": created_at}, {"id": 2, "name": "Bob", "created_at": created_at}])
+
+        response = client.get("/users?stream=1")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["name"] for line in lines] == ["Alice", "Bob"]
+        assert lines[0]["created_at"] == "2024-01-01T00:00:00+00:00"
+
+    @patch('app.bizlogic.books.books_queries.iter_books')
+    @patch('app.bizlogic.books.books_queries.list_books')
+    def test_accept_header_selects_stream(self, mock_list, mock_iter, client):
+        """Test Accept: application/x-ndjson streams instead of paginating"""
+        mock_iter.return_value = iter([{"id": 1, "title": "T", "author": "A"}])
+
+        response = client.get("/books", headers={"Accept": "application/x-ndjson"})
+
+        assert response.text == '{"id":1,"title":"T","author":"A"}\n'
+        mock_list.assert_not_called()
+
+    @patch('app.bizlogic.reviews.reviews_queries.iter_reviews_by_book')
+    def test_stream_resumes_after_cursor(self, mock_iter, client):
+        """Test a pagination cursor can be used to resume an export"""
+        from app.database.pagination import encode_cursor
+
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_iter.return_value = iter([])
+
+        client.get("/books/3/reviews", params={"stream": "1", "after": encode_cursor(created_at, 9)})
+
+        assert mock_iter.call_args.kwargs == {"book_id": 3, "after": (created_at, 9)}
+
+    def test_stream_invalid_cursor(self, client):
+        """Test a bad cursor fails before the stream starts"""
+        response = client.get("/users/1/reviews?stream=1&after=garbage")
+
+        assert response.status_code == 400
+
+
+# ------------------------------
+# Server-side Cursor Tests
+# ------------------------------
+class TestServerSideCursor:
+
+    def test_iter_users_uses_named_cursor(self):
+        """Test exports use a named (server-side) cursor with the configured itersize"""
+        from app.database.queries.users import iter_users, LIST_USERS_SQL
+
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.__iter__.return_value = iter([{"id": 1}])
+
+        assert list(iter_users(conn, itersize=250)) == [{"id": 1}]
+        assert conn.cursor.call_args.args == ("export_users",)
+        assert cur.itersize == 250
+        cur.execute.assert_called_once_with(LIST_USERS_SQL, {"limit": None})
@@ -0,0 +1,308 @@
+"""
+Unit tests for the in-process follow graph and its endpoints
+"""
+import asyncio
+import threading
+import time
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.database.follow_graph import FollowGraph
+from app.database.id_pairs import packed_pairs_sql, unpack_pairs
+from app.database.pagination import encode_cursor
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+# (follower, followee): 1 and 2 follow each other, 1 and 2 follow 3 and 4,
+# 3 follows 5, 4 follows 5 and 6
+EDGES = [(1, 2), (2, 1), (1, 3), (1, 4), (2, 3), (2, 4), (3, 5), (4, 5), (4, 6)]
+
+
+def load_edges(edges=EDGES):
+    pairs = np.array(edges, np.int64).reshape(-1, 2)
+    return lambda: (pairs[:, 0], pairs[:, 1])
+
+
+@pytest.fixture
+def graph():
+    """Graph loaded with EDGES"""
+    graph = FollowGraph(max_age=60, compact_size=100)
+    graph.reload(load_edges())
+    return graph
+
+
+def user(user_id):
+    return {"id": user_id, "name": f"user {user_id}", "created_at": "2024-01-01T00:00:00"}
+
+
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client(graph):
+    """Create test client with mocked database, serving `graph`"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    with patch('app.bizlogic.follows.follows_queries.get_follow_graph', return_value=graph), \
+            patch('app.bizlogic.follows.users_queries.get_users', side_effect=lambda conn, user_ids: [user(i) for i in user_ids]), \
+            patch('app.bizlogic.follows.users_queries.get_user', side_effect=lambda conn, user_id: user(user_id) if user_id < 100 else None):
+        yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Graph Tests
+# ------------------------------
+class TestFollowGraph:
+
+    def test_unpack_pairs(self):
+        """Test packed big-endian pairs become two int64 columns"""
+        chunks = [np.array([1, 2, 3, 4], ">i8").tobytes(), np.array([5, 6], ">i8").tobytes()]
+
+        firsts, seconds = unpack_pairs(chunks)
+
+        assert firsts.tolist() == [1, 3, 5]
+        assert seconds.tolist() == [2, 4, 6]
+        assert "FROM (SELECT a, b FROM t) AS selected" in packed_pairs_sql("SELECT a, b FROM t;")
+
+    def test_lists_are_paginated_by_id(self, graph):
+        """Test followers and followees come sorted, after the cursor id"""
+        assert graph.following(1, limit=10) == [2, 3, 4]
+        assert graph.following(1, limit=2, after_id=2) == [3, 4]
+        assert graph.followers(5, limit=10) == [3, 4]
+        assert graph.followers(99, limit=10) == []
+
+    def test_counts_and_follows(self, graph):
+        """Test counts and follow checks in both directions"""
+        assert graph.counts(4) == {"followers": 2, "following": 2}
+        assert graph.follows(1, 2) and graph.follows(2, 1)
+        assert graph.follows(1, 3) and not graph.follows(3, 1)
+        assert not graph.follows(99, 1)
+
+    def test_local_changes(self, graph):
+        """Test this worker's follows and unfollows show up before any reload"""
+        graph.follow(5, 1)
+        graph.follow(200, 1)
+        graph.unfollow(1, 3)
+        graph.unfollow(1, 3)
+
+        assert graph.followers(1, limit=10) == [2, 5, 200]
+        assert graph.following(1, limit=10) == [2, 4]
+        assert graph.counts(3) == {"followers": 1, "following": 1}
+        assert graph.follows(200, 1) and not graph.follows(1, 3)
+        assert graph.stats()["edges"] == len(EDGES) + 1
+
+    def test_compaction_keeps_the_graph(self, graph):
+        """Test merging the changes into the arrays answers the same"""
+        graph.follow(5, 1)
+        graph.unfollow(1, 3)
+        graph.follow(200, 1)
+        assert graph.stats()["pending_changes"] == 3
+
+        graph.compact()
+
+        assert graph.stats()["pending_changes"] == 0
+        assert graph.followers(1, limit=10) == [2, 5, 200]
+        assert graph.following(1, limit=10) == [2, 4]
+        assert graph.stats()["edges"] == len(EDGES) + 1
+        assert (graph.loads, graph.compactions) == (1, 1)
+
+    def test_changes_during_a_compaction_are_replayed(self, graph):
+        """Test a follow made while the new arrays are built is kept once they're swapped in"""
+        graph.follow(5, 1)
+        merged_edges = graph._merged_edges
+
+        def merge(*args):
+            graph.follow(6, 1)
+            graph.unfollow(5, 1)
+            return merged_edges(*args)
+
+        with patch.object(graph, "_merged_edges", side_effect=merge):
+            graph.compact()
+
+        assert graph.followers(1, limit=10) == [2, 6]
+        assert graph.stats()["pending_changes"] == 2
+
+    def test_follows_leave_compaction_to_the_background(self, graph):
+        """Test reaching compact_size only signals the reload thread, which compacts off the request"""
+        graph.compact_size = 2
+        graph._compaction_due = Mock()
+        graph.follow(5, 1)
+        graph._compaction_due.assert_not_called()
+
+        graph.follow(6, 1)
+
+        graph._compaction_due.assert_called_once()
+        assert graph.stats()["pending_changes"] == 2
+
+    def test_background_compaction(self):
+        """Test the reload thread compacts as soon as enough changes are pending"""
+        graph = FollowGraph(max_age=60, compact_size=2)
+        graph.start(load_edges())
+        try:
+            graph.follow(5, 1)
+            graph.follow(6, 1)
+            for _ in range(500):
+                if graph.compactions:
+                    break
+                time.sleep(0.01)
+        finally:
+            graph.stop()
+
+        assert (graph.loads, graph.compactions) == (1, 1)
+        assert graph.stats()["pending_changes"] == 0
+        assert graph.followers(1, limit=10) == [2, 5, 6]
+
+    def test_suggestions_are_friends_of_friends(self, graph):
+        """Test suggestions rank users by how many followees follow them, skipping known ones"""
+        assert graph.suggestions(1, limit=10) == [{"id": 5, "mutual_count": 2}, {"id": 6, "mutual_count": 1}]
+        assert graph.suggestions(1, limit=1) == [{"id": 5, "mutual_count": 2}]
+
+        graph.follow(1, 5)
+        graph.unfollow(4, 6)
+        graph.follow(3, 7)
+        assert graph.suggestions(1, limit=10) == [{"id": 7, "mutual_count": 1}]
+
+    def test_changes_during_a_load_are_replayed(self):
+        """Test a follow made while the snapshot is read isn't lost when it's swapped in"""
+        graph = FollowGraph(max_age=60, compact_size=100)
+
+        def load():
+            graph.follow(6, 1)
+            return load_edges()()
+
+        graph.reload(load)
+
+        assert graph.follows(6, 1)
+        assert graph.counts(1)["followers"] == 2
+
+    def test_reload_replaces_the_snapshot(self, graph):
+        """Test a reload drops what it replays and serves the new edges"""
+        graph.follow(5, 1)
+        graph.reload(load_edges([(7, 8)]))
+
+        assert graph.loads == 2
+        assert graph.following(1, limit=10) == []
+        assert graph.following(7, limit=10) == [8]
+
+    def test_background_reloads(self):
+        """Test start() loads before returning, then reloads in a thread until stop()"""
+        graph = FollowGraph(max_age=0.01, compact_size=100)
+        reloaded = threading.Event()
+
+        def load():
+            if graph.loads >= 2:
+                reloaded.set()
+            return load_edges()()
+
+        graph.start(load)
+        try:
+            assert graph.loaded
+            assert reloaded.wait(5)
+        finally:
+            graph.stop()
+        assert graph.loads >= 2
+
+    def test_failed_reload_keeps_the_snapshot(self, graph):
+        """Test a background reload that fails is counted and the old graph kept"""
+        graph.max_age = 0
+
+        def load():
+            graph._stop.set()
+            raise OSError("connection lost")
+
+        graph._reload_every_max_age(load)
+
+        assert graph.stats()["failed_loads"] == 1
+        assert graph.following(1, limit=10) == [2, 3, 4]
+
+    def test_background_reloads_async(self):
+        """Test the async app's reload task keeps the graph fresh until cancelled"""
+        graph = FollowGraph(max_age=0.01, compact_size=100)
+
+        async def load():
+            return load_edges()()
+
+        async def run():
+            await graph.start_async(load)
+            assert graph.loaded
+            while graph.loads < 2:
+                await asyncio.sleep(0.01)
+            await graph.stop_async()
+
+        asyncio.run(asyncio.wait_for(run(), 5))
+        assert graph.loads >= 2
+
+    def test_background_compaction_async(self):
+        """Test the async app's reload task compacts as soon as enough changes are pending"""
+        graph = FollowGraph(max_age=60, compact_size=2)
+
+        async def load():
+            return load_edges()()
+
+        async def run():
+            await graph.start_async(load)
+            graph.follow(5, 1)
+            graph.follow(6, 1)
+            while not graph.compactions:
+                await asyncio.sleep(0.01)
+            await graph.stop_async()
+
+        asyncio.run(asyncio.wait_for(run(), 5))
+        assert (graph.loads, graph.compactions) == (1, 1)
+        assert graph.followers(1, limit=10) == [2, 5, 6]
+
+
+# ------------------------------
+# Follow Graph Endpoint Tests
+# ------------------------------
+class TestFollowGraphEndpoints:
+
+    def test_list_followers_and_following(self, client):
+        """Test GET /users/{id}/followers and /following return users a page at a time"""
+        response = client.get("/users/1/following?limit=2")
+
+        assert response.status_code == 200
+        assert response.json() == [user(2), user(3)]
+        assert response.headers["X-Next-Cursor"] == encode_cursor(3)
+        assert [u["id"] for u in client.get("/users/5/followers").json()] == [3, 4]
+
+    def test_unknown_user(self, client):
+        """Test users without edges are a 404 only when they don't exist"""
+        assert client.get("/users/999/followers").status_code == 404
+        assert client.get("/users/999/follow-counts").status_code == 404
+        assert client.get("/users/999/suggestions").status_code == 404
+        assert client.get("/users/50/followers").json() == []
+        assert client.get("/users/50/follow-counts").json() == {"followers": 0, "following": 0}
+
+    def test_relationship_and_counts(self, client):
+        """Test follow checks and counts"""
+        assert client.get("/users/1/follows/2").json() == {"following": True, "followed_by": True, "mutual": True}
+        assert client.get("/users/3/follows/1").json() == {"following": False, "followed_by": True, "mutual": False}
+        assert client.get("/users/1/follow-counts").json() == {"followers": 1, "following": 3}
+
+    def test_graph_not_loaded_yet(self):
+        """Test the follow routes answer 503 until the first load is done, without loading"""
+        from app.database.core import get_connection
+        app.dependency_overrides[get_connection] = get_mock_connection
+        try:
+            with patch('app.database.queries.follows.follow_graph', FollowGraph(max_age=60, compact_size=100)):
+                response = TestClient(app).get("/users/1/followers")
+        finally:
+            app.dependency_overrides.clear()
+
+        assert response.status_code == 503
+
+    def test_suggestions(self, client):
+        """Test GET /users/{id}/suggestions returns users with their mutual count"""
+        response = client.get("/users/2/suggestions?limit=1")
+
+        assert response.status_code == 200
+        assert response.json() == [user(5) | {"mutual_count": 2}]
@@ -0,0 +1,103 @@
+"""
+Unit tests for the synthetic dataset generator
+"""
+import random
+from collections import Counter
+
+import pytest
+from unittest.mock import MagicMock, Mock
+from app.database.generate import (
+    _drop_keys,
+    _follow_lines,
+    _review_lines,
+    generate_dataset,
+)
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def reviews():
+    """Parsed rows of a small generated review set"""
+    lines = _review_lines(random.Random("7-reviews"), users=1000, books=200, reviews=20_000, days=30)
+    return [line.rstrip("\n").split("\t") for line in lines]
+
+
+@pytest.fixture
+def follows():
+    """(follower, followee) pairs of a small generated graph"""
+    lines = _follow_lines(random.Random("7-followers"), users=2000, follows_per_user=10)
+    return [tuple(int(v) for v in line.split("\t")[:2]) for line in lines]
+
+
+# ------------------------------
+# Row Generator Tests
+# ------------------------------
+class TestRows:
+
+    def test_deterministic_by_seed(self):
+        """Test the same seed gives the same rows and another seed does not"""
+        def sample(seed):
+            return list(_review_lines(random.Random(seed), users=50, books=20, reviews=500, days=5))
+
+        assert sample("1") == sample("1")
+        assert sample("1") != sample("2")
+
+    def test_review_rows(self, reviews):
+        """Test review rows are well-formed COPY lines with increasing ids and timestamps"""
+        assert all(len(row) == 6 for row in reviews)
+        assert [int(row[0]) for row in reviews] == list(range(1, 20_001))
+        assert all(1 <= int(row[3]) <= 5 for row in reviews)
+        assert all(a[5] <= b[5] for a, b in zip(reviews, reviews[1:]))
+
+    def test_book_popularity_is_skewed(self, reviews):
+        """Test a few books take a large share of the reviews"""
+        per_book = Counter(row[2] for row in reviews).most_common()
+
+        assert sum(n for _, n in per_book[:10]) > len(reviews) * 0.25
+
+    def test_follow_graph(self, follows):
+        """Test edges are unique, never self-follows, and in-degrees follow a heavy tail"""
+        assert len(set(follows)) == len(follows)
+        assert all(follower != followee for follower, followee in follows)
+
+        in_degrees = sorted(Counter(followee for _, followee in follows).values(), reverse=True)
+        assert in_degrees[0] > 50 * (len(follows) / 2000)
+
+
+# ------------------------------
+# Load Tests
+# ------------------------------
+class TestGenerateDataset:
+
+    def test_refuses_non_empty_tables(self):
+        """Test existing data is never mixed with generated ids"""
+        conn = MagicMock()
+        cur = conn.cursor.return_value.__enter__.return_value
+        cur.execute.return_value.fetchone.return_value = (True,)
+
+        with pytest.raises(ValueError):
+            generate_dataset(conn, users=10, books=10, reviews=10)
+        conn.commit.assert_not_called()
+
+    def test_drop_keys_rebuild_order(self):
+        """Test keys are rebuilt before indexes and foreign keys after both"""
+        cur = Mock()
+        cur.execute.return_value.fetchall.side_effect = [
+            [
+                ("reviews", "reviews_pkey", "p", "PRIMARY KEY (id)"),
+                ("timelines", "timelines_review_id_fkey", "f", "FOREIGN KEY (review_id) REFERENCES reviews(id)"),
+            ],
+            [("idx_reviews_user", "CREATE INDEX idx_reviews_user ON public.reviews USING btree (user_id)")],
+        ]
+
+        rebuild = _drop_keys(cur)
+
+        dropped = [c.args[0] for c in cur.execute.call_args_list[2:]]
+        assert dropped[0] == 'ALTER TABLE timelines DROP CONSTRAINT "timelines_review_id_fkey"'
+        assert rebuild == [
+            'ALTER TABLE reviews ADD CONSTRAINT "reviews_pkey" PRIMARY KEY (id)',
+            "CREATE INDEX idx_reviews_user ON public.reviews USING btree (user_id)",
+            'ALTER TABLE timelines ADD CONSTRAINT "timelines_review_id_fkey" FOREIGN KEY (review_id) REFERENCES reviews(id)',
+        ]
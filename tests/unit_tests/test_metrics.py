@@ -0,0 +1,156 @@
+"""
+Unit tests for the Prometheus metrics registry, middleware and query timing
+"""
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.metrics import (
+    DB_QUERY_ROWS,
+    DB_QUERY_SECONDS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_RESPONSES,
+    Histogram,
+    REGISTRY,
+    render_metrics,
+)
+from app.database.pipeline import execute_pipelined
+from app.database.statements import _query_name, execute
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def histogram():
+    """A throwaway histogram, unregistered again afterwards"""
+    metric = Histogram("test_seconds", "Test histogram.", ("route",), buckets=(0.1, 1))
+    yield metric
+    REGISTRY.remove(metric)
+
+
+def count(metric, *labels) -> int:
+    series = metric._series.get(labels)
+    if series is None:
+        return 0
+    return sum(series[:-1]) if isinstance(metric, Histogram) else series[0]
+
+
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Registry Tests
+# ------------------------------
+class TestRegistry:
+
+    def test_histogram_renders_cumulative_buckets(self, histogram):
+        """Test buckets are cumulative and +Inf, _sum and _count agree"""
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value, "/users")
+
+        text = render_metrics()
+
+        assert 'test_seconds_bucket{route="/users",le="0.1"} 2' in text
+        assert 'test_seconds_bucket{route="/users",le="1"} 3' in text
+        assert 'test_seconds_bucket{route="/users",le="+Inf"} 4' in text
+        assert 'test_seconds_sum{route="/users"} 3.65' in text
+        assert 'test_seconds_count{route="/users"} 4' in text
+
+    def test_label_values_are_escaped(self, histogram):
+        """Test quotes and backslashes can't break the exposition format"""
+        histogram.observe(0.2, 'a"b\\c')
+
+        assert 'route="a\\"b\\\\c"' in render_metrics()
+
+    def test_pool_stats_become_gauges(self):
+        """Test pool counters are rendered as db_pool_* gauges"""
+        assert "db_pool_requests_waiting 3" in render_metrics({"requests_waiting": 3})
+
+
+# ------------------------------
+# Middleware Tests
+# ------------------------------
+class TestMiddleware:
+
+    @patch('app.bizlogic.users.get_user')
+    def test_requests_labelled_by_route_template(self, mock_get_user, client):
+        """Test requests are timed under the route template with their status"""
+        mock_get_user.return_value = None
+        before = count(HTTP_REQUEST_SECONDS, "GET", "/users/{user_id}")
+        not_found = count(HTTP_RESPONSES, "GET", "/users/{user_id}", 404)
+
+        client.get("/users/41")
+        client.get("/users/42")
+
+        assert count(HTTP_REQUEST_SECONDS, "GET", "/users/{user_id}") == before + 2
+        assert count(HTTP_RESPONSES, "GET", "/users/{user_id}", 404) == not_found + 2
+
+    def test_unmatched_paths_share_one_label(self, client):
+        """Test unknown paths can't create a series each"""
+        before = count(HTTP_RESPONSES, "GET", "unmatched", 404)
+
+        client.get("/no/such/path")
+
+        assert count(HTTP_RESPONSES, "GET", "unmatched", 404) == before + 1
+
+    @patch('app.main.get_pool_stats', return_value={"pool_size": 2})
+    def test_metrics_endpoint(self, _, client):
+        """Test /metrics serves the text format"""
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain")
+        assert "# TYPE http_request_duration_seconds histogram" in response.text
+        assert "db_pool_pool_size 2" in response.text
+
+
+# ------------------------------
+# Query Timing Tests
+# ------------------------------
+class TestQueryTiming:
+
+    def test_registered_statement_uses_its_name(self):
+        """Test registered SQL is labelled with its registry name"""
+        from app.database.queries.users import GET_USER_SQL
+
+        assert _query_name(GET_USER_SQL, sys._getframe(0)) == "get_user"
+
+    def test_unregistered_sql_uses_the_query_function(self):
+        """Test other SQL is labelled with the function that ran it, through execute()"""
+        class Cursor:
+            def execute(self, sql, params):
+                return _query_name(sql, sys._getframe(1))
+
+        def fan_out_reviews():
+            return execute(Cursor(), "SELECT 1")
+
+        assert fan_out_reviews() == "fan_out_reviews"
+
+    def test_pipelined_batch_timed_under_caller(self):
+        """Test a pipelined batch is observed once, under the function that sent it"""
+        conn = MagicMock()
+        conn.cursor.return_value.__enter__.return_value.fetchall.return_value = [{"id": 1}]
+        before = count(DB_QUERY_SECONDS, "insert_widget")
+
+        def insert_widget():
+            return execute_pipelined(conn, [("INSERT 1", None), ("INSERT 2", None)])
+
+        insert_widget()
+
+        assert count(DB_QUERY_SECONDS, "insert_widget") == before + 1
+        assert count(DB_QUERY_ROWS, "insert_widget") >= 2
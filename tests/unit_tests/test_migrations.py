@@ -0,0 +1,122 @@
+"""
+Unit tests for schema migrations and the startup bootstrap
+"""
+import pytest
+from unittest.mock import MagicMock, patch
+from app.database import migrations
+from app.database.migrations import (
+    LOCK_SQL,
+    RECORD_MIGRATION_SQL,
+    SCHEMA_DIR,
+    SEED_MARKER,
+    UNLOCK_SQL,
+    bootstrap,
+    migrate,
+)
+
+SCHEMA_FILES = sorted(SCHEMA_DIR.glob("*.sql"))
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def conn():
+    """Mocked autocommit connection returned by psycopg.connect"""
+    conn = MagicMock()
+    with patch("app.database.migrations.psycopg.connect") as mock_connect:
+        mock_connect.return_value.__enter__.return_value = conn
+        yield conn
+
+
+@pytest.fixture
+def up_to_date() -> dict[str, str]:
+    """schema_migrations of a migrated, seeded database"""
+    applied = {path.name: migrations._checksum(path) for path in SCHEMA_FILES}
+    applied[SEED_MARKER] = ""
+    return applied
+
+
+def executed(conn) -> list:
+    return [c.args[0] for c in conn.execute.call_args_list]
+
+
+def recorded(conn) -> list[str]:
+    return [c.args[1]["name"] for c in conn.execute.call_args_list if c.args[0] == RECORD_MIGRATION_SQL]
+
+
+# ------------------------------
+# Bootstrap Tests
+# ------------------------------
+class TestBootstrap:
+
+    @patch("app.database.seed.seed_data")
+    def test_ready_database_is_one_query(self, mock_seed, conn, up_to_date):
+        """Test an up-to-date database takes no lock and runs nothing"""
+        with patch.object(migrations, "_applied", return_value=up_to_date) as mock_applied:
+            stats = bootstrap()
+
+        mock_applied.assert_called_once_with(conn)
+        conn.execute.assert_not_called()
+        mock_seed.assert_not_called()
+        assert stats["migrations_applied"] == [] and stats["seeded"] is False
+
+    @patch("app.database.seed.seed_data")
+    def test_fresh_database(self, mock_seed, conn):
+        """Test every file is applied and the seed recorded, all under the lock"""
+        with patch.object(migrations, "_applied", return_value={}):
+            stats = bootstrap()
+
+        assert stats["migrations_applied"] == [path.name for path in SCHEMA_FILES]
+        assert stats["seeded"] is True
+        mock_seed.assert_called_once_with(conn)
+        assert recorded(conn) == [path.name for path in SCHEMA_FILES] + [SEED_MARKER]
+        assert executed(conn)[0] == LOCK_SQL
+        assert executed(conn)[-1] == UNLOCK_SQL
+
+    @patch("app.database.seed.seed_data")
+    def test_lost_race(self, mock_seed, conn, up_to_date):
+        """Test a process that waited on the lock rechecks and does nothing"""
+        with patch.object(migrations, "_applied", side_effect=[{}, up_to_date]):
+            stats = bootstrap()
+
+        assert stats["migrations_applied"] == []
+        mock_seed.assert_not_called()
+        assert recorded(conn) == []
+
+    @patch("app.database.seed.seed_data")
+    def test_changed_file_is_reapplied(self, mock_seed, conn, up_to_date):
+        """Test an edited schema file runs again and nothing else does"""
+        up_to_date[SCHEMA_FILES[0].name] = "stale"
+        with patch.object(migrations, "_applied", return_value=up_to_date):
+            stats = bootstrap()
+
+        assert stats["migrations_applied"] == [SCHEMA_FILES[0].name]
+        mock_seed.assert_not_called()
+
+    @patch("app.database.seed.seed_data")
+    def test_unlocks_on_failure(self, mock_seed, conn, up_to_date):
+        """Test the advisory lock is released when seeding fails"""
+        del up_to_date[SEED_MARKER]
+        mock_seed.side_effect = RuntimeError("boom")
+        with patch.object(migrations, "_applied", return_value=up_to_date):
+            with pytest.raises(RuntimeError):
+                bootstrap()
+
+        assert executed(conn)[-1] == UNLOCK_SQL
+        assert SEED_MARKER not in recorded(conn)
+
+
+# ------------------------------
+# Migrate Tests
+# ------------------------------
+class TestMigrate:
+
+    def test_force_reapplies_everything(self, up_to_date):
+        """Test force re-runs every file, e.g. to backfill after a bulk load"""
+        conn = MagicMock()
+        with patch.object(migrations, "_applied", return_value=up_to_date):
+            applied = migrate(conn, force=True)
+
+        assert applied == [path.name for path in SCHEMA_FILES]
+        assert executed(conn)[0] == LOCK_SQL and executed(conn)[-1] == UNLOCK_SQL
@@ -0,0 +1,125 @@
+"""
+Unit tests for keyset (cursor) pagination
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.database.pagination import decode_cursor, encode_cursor, next_cursor
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    conn = Mock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Collections with no version row yet, so conditional GETs never short-circuit"""
+    with patch('app.bizlogic.users.get_users_version', return_value=None), \
+            patch('app.bizlogic.books.get_books_version', return_value=None), \
+            patch('app.bizlogic.reviews.get_book_reviews_version', return_value=None):
+        yield
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Cursor Encoding Tests
+# ------------------------------
+class TestCursorEncoding:
+
+    def test_round_trip_id(self):
+        """Test an id cursor decodes back to the same id"""
+        assert decode_cursor(encode_cursor(42), int) == (42,)
+
+    def test_round_trip_created_at_and_id(self):
+        """Test a (created_at, id) cursor keeps the timezone-aware timestamp"""
+        created_at = datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc)
+
+        assert decode_cursor(encode_cursor(created_at, 7), datetime, int) == (created_at, 7)
+
+    @pytest.mark.parametrize("token", ["not-a-cursor", encode_cursor(1, 2), encode_cursor("x")])
+    def test_invalid_cursor_is_rejected(self, token):
+        """Test malformed or mismatched cursors raise a 400"""
+        with pytest.raises(HTTPException) as exc:
+            decode_cursor(token, int)
+
+        assert exc.value.status_code == 400
+
+    def test_next_cursor_only_for_full_pages(self):
+        """Test a short page means there is no next page"""
+        rows = [{"id": 1}, {"id": 2}]
+
+        assert next_cursor(rows, 3, "id") is None
+        assert decode_cursor(next_cursor(rows, 2, "id"), int) == (2,)
+
+
+# ------------------------------
+# Paginated Endpoint Tests
+# ------------------------------
+class TestPaginatedEndpoints:
+
+    @patch('app.bizlogic.books.books_queries.list_books')
+    def test_list_books_sets_next_cursor(self, mock_list_books, client):
+        """Test GET /books returns X-Next-Cursor when the page is full"""
+        mock_list_books.return_value = [{"id": 1, "title": "A"}, {"id": 2, "title": "B"}]
+
+        response = client.get("/books?limit=2")
+
+        assert response.status_code == 200
+        assert decode_cursor(response.headers["X-Next-Cursor"], int) == (2,)
+        assert mock_list_books.call_args.kwargs == {"limit": 2, "after_id": None}
+
+    @patch('app.bizlogic.books.books_queries.list_books')
+    def test_list_books_passes_decoded_cursor(self, mock_list_books, client):
+        """Test the after token is decoded before reaching the query layer"""
+        mock_list_books.return_value = []
+
+        response = client.get(f"/books?limit=2&after={encode_cursor(2)}")
+
+        assert response.status_code == 200
+        assert "X-Next-Cursor" not in response.headers
+        assert mock_list_books.call_args.kwargs == {"limit": 2, "after_id": 2}
+
+    @patch('app.bizlogic.reviews.reviews_queries.list_reviews_by_book')
+    def test_list_reviews_by_book_cursor(self, mock_list_reviews, client):
+        """Test review pages are keyed on (created_at, id)"""
+        created_at = datetime(2024, 1, 1, tzinfo=timezone.utc)
+        mock_list_reviews.return_value = [{"id": 9, "created_at": created_at}]
+
+        response = client.get("/books/1/reviews?limit=1")
+
+        assert response.status_code == 200
+        assert decode_cursor(response.headers["X-Next-Cursor"], datetime, int) == (created_at, 9)
+
+    def test_invalid_cursor_returns_400(self, client):
+        """Test a garbage cursor is a client error"""
+        response = client.get("/users/1/newsfeed?after=garbage")
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "Invalid cursor"
+
+    def test_limit_is_bounded(self, client):
+        """Test page size above the maximum is rejected"""
+        response = client.get("/users?limit=100000")
+
+        assert response.status_code == 422
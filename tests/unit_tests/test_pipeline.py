@@ -0,0 +1,159 @@
+"""
+Unit tests for pipelined write batches
+"""
+import asyncio
+import tempfile
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock, call
+from psycopg import pq
+from app.database.core import FEED_BACKFILL_SIZE, FEED_FANOUT_MAX_FOLLOWERS
+from app.database.pipeline import execute_pipelined, execute_pipelined_async
+from app.database.queries.follows import FOLLOW_USER_SQL, follow_user
+from app.database.queries.reviews import INSERT_REVIEW_SQL, insert_review
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def idle_conn():
+    """Mock connection with no transaction open"""
+    conn = MagicMock()
+    conn.info.transaction_status = pq.TransactionStatus.IDLE
+    return conn
+
+
+@pytest.fixture
+def busy_conn():
+    """Mock connection inside an open transaction"""
+    conn = MagicMock()
+    conn.info.transaction_status = pq.TransactionStatus.INTRANS
+    return conn
+
+
+@pytest.fixture
+def rows(db_conn):
+    """Three users and a book in the scratch database"""
+    user_ids = [row["id"] for row in db_conn.execute("INSERT INTO users (name) SELECT 'pipeline ' || g FROM generate_series(1, 3) g RETURNING id")]
+    book_id = db_conn.execute("INSERT INTO books (title, author) VALUES ('T', 'A') RETURNING id").fetchone()["id"]
+    db_conn.commit()
+    return user_ids, book_id
+
+
+def cursor_of(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+
+def round_trips(conn, write) -> int:
+    """Run write() and count the ReadyForQuery messages it waited for in the protocol trace"""
+    with tempfile.TemporaryFile("w+") as trace:
+        conn.pgconn.trace(trace.fileno())
+        conn.pgconn.set_trace_flags(pq.Trace.SUPPRESS_TIMESTAMPS)
+        try:
+            write()
+        finally:
+            conn.pgconn.untrace()
+        trace.seek(0)
+        return sum(line.split("\t")[2].strip() == "ReadyForQuery" for line in trace if line.startswith("B\t"))
+
+
+def sequential(conn, sql, params):
+    """The write without a pipeline: BEGIN, the statement and COMMIT, each waiting for its reply"""
+    conn.execute(sql, params).fetchall()
+    conn.commit()
+
+
+# ------------------------------
+# Sync Tests
+# ------------------------------
+class TestExecutePipelined:
+
+    def test_batch_runs_inside_one_pipeline(self, idle_conn):
+        """Test every statement is queued before the pipeline syncs"""
+        cur = cursor_of(idle_conn)
+        cur.fetchall.return_value = [{"id": 1}]
+
+        results = execute_pipelined(idle_conn, [("SELECT 1", None), ("SELECT 2", {"x": 1})])
+
+        idle_conn.pipeline.assert_called_once()
+        assert [c.args[0] for c in cur.execute.call_args_list] == ["SELECT 1", "SELECT 2"]
+        assert results == [[{"id": 1}], [{"id": 1}]]
+
+    def test_idle_connection_commits_implicitly(self, idle_conn):
+        """Test an idle connection uses autocommit for the batch and restores it"""
+        execute_pipelined(idle_conn, [("SELECT 1", None)])
+
+        idle_conn.commit.assert_not_called()
+        assert idle_conn.autocommit is False
+
+    def test_autocommit_restored_on_error(self, idle_conn):
+        """Test a failing statement still leaves the connection transactional"""
+        cursor_of(idle_conn).execute.side_effect = RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            execute_pipelined(idle_conn, [("SELECT 1", None)])
+
+        assert idle_conn.autocommit is False
+
+    def test_open_transaction_is_committed(self, busy_conn):
+        """Test a batch joining an open transaction queues the COMMIT with it"""
+        execute_pipelined(busy_conn, [("SELECT 1", None)])
+
+        busy_conn.commit.assert_called_once()
+
+    def test_statements_without_rows(self, idle_conn):
+        """Test statements with no result set come back as empty lists"""
+        cursor_of(idle_conn).description = None
+
+        assert execute_pipelined(idle_conn, [("DELETE FROM t", None)]) == [[]]
+
+
+# ------------------------------
+# Async Tests
+# ------------------------------
+class TestExecutePipelinedAsync:
+
+    def test_idle_connection_toggles_autocommit(self):
+        """Test the async batch switches autocommit on and back off"""
+        conn = MagicMock()
+        conn.info.transaction_status = pq.TransactionStatus.IDLE
+        conn.set_autocommit = AsyncMock()
+        cur = conn.cursor.return_value.__aenter__.return_value
+        cur.execute = AsyncMock()
+        cur.fetchall = AsyncMock(return_value=[{"id": 1}])
+
+        results = asyncio.run(execute_pipelined_async(conn, [("SELECT 1", None)]))
+
+        assert results == [[{"id": 1}]]
+        assert conn.set_autocommit.await_args_list == [call(True), call(False)]
+
+
+# ------------------------------
+# Round Trip Tests
+# ------------------------------
+class TestRoundTrips:
+
+    def test_insert_review(self, db_conn, rows):
+        """Test posting a review takes fewer round trips pipelined than statement by statement"""
+        [user_id, _, _], book_id = rows
+        params = {"user_id": user_id, "book_id": book_id, "rating": 5, "content": "c", "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}
+
+        pipelined = round_trips(db_conn, lambda: insert_review(db_conn, user_id=user_id, book_id=book_id, rating=5, content="c"))
+        unpipelined = round_trips(db_conn, lambda: sequential(db_conn, INSERT_REVIEW_SQL, params))
+
+        assert pipelined < unpipelined
+        assert (pipelined, unpipelined) == (1, 3)
+        assert db_conn.execute("SELECT count(*) AS n FROM reviews WHERE user_id = %s", (user_id,)).fetchone()["n"] == 2
+
+    def test_follow_user(self, db_conn, rows):
+        """Test following a user takes fewer round trips pipelined than statement by statement"""
+        [followee_id, first, second], _ = rows
+        params = {"followee_id": followee_id, "follower_id": second, "backfill_size": FEED_BACKFILL_SIZE, "fanout_max_followers": FEED_FANOUT_MAX_FOLLOWERS}
+
+        pipelined = round_trips(db_conn, lambda: follow_user(db_conn, follower_id=first, followee_id=followee_id))
+        unpipelined = round_trips(db_conn, lambda: sequential(db_conn, FOLLOW_USER_SQL, params))
+
+        assert pipelined < unpipelined
+        assert (pipelined, unpipelined) == (1, 3)
+        assert db_conn.execute("SELECT follower_count FROM users WHERE id = %s", (followee_id,)).fetchone()["follower_count"] == 2
@@ -0,0 +1,62 @@
+"""
+Unit tests for the pooled connection provider
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def client():
+    """Create test client (the pool is never opened)"""
+    yield TestClient(app)
+
+
+# ------------------------------
+# Connection Provider Tests
+# ------------------------------
+class TestGetConnection:
+
+    @patch('app.database.core.pool')
+    def test_get_connection_borrows_from_pool(self, mock_pool):
+        """Test that get_connection yields a pooled connection and returns it"""
+        from app.database.core import get_connection
+
+        conn = Mock()
+        pooled = MagicMock()
+        pooled.__enter__.return_value = conn
+        mock_pool.connection.return_value = pooled
+
+        gen = get_connection()
+        assert next(gen) is conn
+        with pytest.raises(StopIteration):
+            next(gen)
+
+        mock_pool.connection.assert_called_once_with()
+        pooled.__exit__.assert_called_once()
+
+    def test_pool_is_not_opened_on_import(self):
+        """Test that importing the app does not connect to the database"""
+        from app.database.core import pool
+
+        assert pool.closed
+
+
+# ------------------------------
+# Pool Stats Endpoint Tests
+# ------------------------------
+class TestPoolStatsEndpoint:
+
+    @patch('app.main.get_pool_stats')
+    def test_pool_stats(self, mock_stats, client):
+        """Test GET /health/db-pool exposes the pool counters"""
+        mock_stats.return_value = {"pool_min": 2, "pool_max": 10, "pool_size": 2, "pool_available": 2}
+
+        response = client.get("/health/db-pool")
+
+        assert response.status_code == 200
+        assert response.json()["pool_max"] == 10
@@ -0,0 +1,163 @@
+"""
+Unit tests for the offline book recommendations job and its endpoints
+"""
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.database.recommendations import (
+    RECOMMENDATION_TUPLE,
+    book_ranges,
+    likes_matrix,
+    recommendation_tuples,
+    top_neighbours,
+)
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def likes():
+    """
+    (user_ids, book_ids) of liked reviews. Books 10 and 20 share readers 1, 2
+    and 3, books 20 and 30 readers 3 and 5, books 10 and 30 reader 3; user 2
+    liked book 10 twice.
+    """
+    users = np.array([1, 1, 2, 2, 2, 3, 3, 3, 4, 5, 5])
+    books = np.array([10, 20, 10, 10, 20, 10, 20, 30, 30, 20, 30])
+    return users, books
+
+
+@pytest.fixture
+def similar_book():
+    """Similar book row as GET_SIMILAR_BOOKS_SQL returns it"""
+    return {
+        "id": 20,
+        "title": "Tender Is the Night",
+        "author": "F. Scott Fitzgerald",
+        "created_at": "2024-01-01T00:00:00",
+        "score": 0.75,
+        "common_readers": 3,
+    }
+
+
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+def neighbours_of(likes, *, top_k=20, min_common=1):
+    """Run the job's math on `likes` in one range, with book ids in place of columns"""
+    matrix, book_ids = likes_matrix(*likes)
+    by_book = matrix.T.tocsr()
+    books, ranks, neighbours, scores, common = top_neighbours(
+        by_book @ matrix, 0, np.diff(by_book.indptr), top_k=top_k, min_common=min_common,
+    )
+    return list(zip(book_ids[books].tolist(), ranks.tolist(), book_ids[neighbours].tolist(), scores.tolist(), common.tolist()))
+
+
+# ------------------------------
+# Job Tests
+# ------------------------------
+class TestRecommendationsJob:
+
+    def test_likes_matrix_counts_a_book_once(self, likes):
+        """Test a reader who liked a book twice is one reader of it"""
+        matrix, book_ids = likes_matrix(*likes)
+
+        assert book_ids.tolist() == [10, 20, 30]
+        assert matrix.toarray().tolist() == [[1, 1, 0], [1, 1, 0], [1, 1, 1], [0, 0, 1], [0, 1, 1]]
+
+    def test_cosine_neighbours_best_first(self, likes):
+        """Test neighbours are ranked by the cosine of their reader sets"""
+        found = neighbours_of(likes)
+
+        assert [row[:3] for row in found] == [(10, 1, 20), (10, 2, 30), (20, 1, 10), (20, 2, 30), (30, 1, 20), (30, 2, 10)]
+        assert found[0][3:] == (pytest.approx(3 / np.sqrt(3 * 4)), 3)
+        assert found[1][3:] == (pytest.approx(1 / np.sqrt(3 * 3)), 1)
+
+    def test_min_common_and_top_k(self, likes):
+        """Test pairs with too few common readers are dropped, and at most top_k kept per book"""
+        assert [row[:3] for row in neighbours_of(likes, min_common=2)] == [(10, 1, 20), (20, 1, 10), (20, 2, 30), (30, 1, 20)]
+        assert [row[:3] for row in neighbours_of(likes, top_k=1)] == [(10, 1, 20), (20, 1, 10), (30, 1, 20)]
+
+    def test_book_ranges_bound_the_pairs(self):
+        """Test ranges stay within max_pairs, and a book above it gets one of its own"""
+        bound = np.array([3, 3, 3, 10, 1, 1])
+
+        assert list(book_ranges(bound, 6)) == [(0, 2), (2, 3), (3, 4), (4, 6)]
+
+    def test_recommendation_tuples_round_trip(self):
+        """Test rows are encoded as binary COPY tuples of book_recommendations"""
+        columns = np.array([0]), np.array([1]), np.array([1]), np.array([0.5], np.float32), np.array([4])
+
+        tuples = np.frombuffer(recommendation_tuples(np.array([10, 20]), *columns), RECOMMENDATION_TUPLE)
+
+        assert tuples["fields"].tolist() == [5]
+        assert (tuples["book_id"][0], tuples["rank"][0], tuples["similar_book_id"][0]) == (10, 1, 20)
+        assert (tuples["score"][0], tuples["common_readers"][0]) == (0.5, 4)
+
+
+# ------------------------------
+# Recommendation Endpoint Tests
+# ------------------------------
+class TestRecommendationEndpoints:
+
+    @patch('app.bizlogic.books.recommendations_queries.get_similar_books')
+    def test_get_similar_books(self, mock_similar, client, similar_book):
+        """Test GET /books/{id}/similar returns the book's neighbours"""
+        mock_similar.return_value = [similar_book]
+
+        response = client.get("/books/10/similar?limit=5")
+
+        assert response.status_code == 200
+        assert response.json() == [similar_book]
+        assert mock_similar.call_args.kwargs == {"book_id": 10, "limit": 5}
+
+    @patch('app.bizlogic.books.books_queries.get_book')
+    @patch('app.bizlogic.books.recommendations_queries.get_similar_books')
+    def test_similar_books_of_unknown_book(self, mock_similar, mock_get_book, client):
+        """Test an unknown book is a 404, while a known one without neighbours is an empty list"""
+        mock_similar.return_value = []
+        mock_get_book.return_value = None
+        assert client.get("/books/999/similar").status_code == 404
+
+        mock_get_book.return_value = {"id": 999}
+        response = client.get("/books/999/similar")
+        assert response.status_code == 200
+        assert response.json() == []
+
+    @patch('app.bizlogic.users.get_user_query')
+    @patch('app.bizlogic.users.get_user_recommendations')
+    def test_get_recommendations(self, mock_recommendations, mock_get_user, client, similar_book):
+        """Test GET /users/{id}/recommendations returns scored books, and 404s for unknown users"""
+        recommended = {key: value for key, value in similar_book.items() if key != "common_readers"}
+        mock_recommendations.return_value = [recommended]
+
+        response = client.get("/users/1/recommendations")
+
+        assert response.status_code == 200
+        assert response.json() == [recommended]
+        assert mock_recommendations.call_args.kwargs == {"user_id": 1, "limit": 10}
+        mock_get_user.assert_not_called()
+
+        mock_recommendations.return_value = []
+        mock_get_user.return_value = None
+        assert client.get("/users/2/recommendations").status_code == 404
+
+    def test_limit_bounds(self, client):
+        """Test the limit is validated"""
+        assert client.get("/books/1/similar?limit=0").status_code == 422
+        assert client.get("/users/1/recommendations?limit=101").status_code == 422
@@ -0,0 +1,126 @@
+"""
+Unit tests for read-replica routing and read-your-writes tokens
+"""
+import itertools
+
+import pytest
+from fastapi import Response
+from unittest.mock import MagicMock, patch
+from app.database import replicas
+from app.database.replicas import (
+    LSN_COOKIE,
+    LSN_HEADER,
+    _get_replica_connection,
+    get_replica_stats,
+    parse_lsn,
+    set_read_your_writes,
+)
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+def mock_pool(replay_lsn: str | None = None) -> MagicMock:
+    """A pool whose connection reports `replay_lsn` as its replay position"""
+    pool = MagicMock()
+    conn = pool.connection.return_value.__enter__.return_value
+    conn.execute.return_value.fetchone.return_value = {"lsn": replay_lsn}
+    return pool
+
+
+def mock_request(token: str | None = None) -> MagicMock:
+    request = MagicMock()
+    request.headers = {LSN_HEADER: token} if token else {}
+    request.cookies = {}
+    return request
+
+
+@pytest.fixture
+def one_replica():
+    """A single configured replica, with fresh routing state"""
+    replica = mock_pool("0/3000000")
+    with patch.multiple(
+        replicas,
+        DB_REPLICA_URLS=["postgresql://replica"],
+        replica_pools=[replica],
+        _next_replica=itertools.cycle([0]),
+        _replayed=[0],
+        _stats={"replica_reads": [0], "primary_fallbacks": 0, "lsn_checks": 0},
+    ):
+        yield replica
+
+
+def borrow(request):
+    """Run the dependency like FastAPI does and return the connection it yields"""
+    dependency = _get_replica_connection(request)
+    conn = next(dependency)
+    dependency.close()
+    return conn
+
+
+# ------------------------------
+# Routing Tests
+# ------------------------------
+class TestReplicaRouting:
+
+    def test_parse_lsn(self):
+        """Test LSNs compare as positions, and garbage is ignored"""
+        assert parse_lsn("0/3000000") == 0x3000000
+        assert parse_lsn("1/0") > parse_lsn("0/FFFFFFFF")
+        assert parse_lsn("not-an-lsn") is None
+        assert parse_lsn(None) is None
+
+    def test_reads_without_token_use_the_replica(self, one_replica):
+        """Test a read with no token goes straight to the replica, unchecked"""
+        conn = borrow(mock_request())
+
+        assert conn is one_replica.connection.return_value.__enter__.return_value
+        conn.execute.assert_not_called()
+        assert get_replica_stats()["replica_reads"] == [1]
+
+    @patch('app.database.replicas.get_connection')
+    def test_lagging_replica_falls_back_to_primary(self, mock_get_connection, one_replica):
+        """Test a token ahead of the replica's replay position is served by the primary"""
+        primary = MagicMock()
+        mock_get_connection.return_value = iter([primary])
+
+        assert borrow(mock_request("0/4000000")) is primary
+        assert get_replica_stats()["primary_fallbacks"] == 1
+
+    def test_caught_up_replica_is_remembered(self, one_replica):
+        """Test the replay position is cached, so older tokens need no further check"""
+        borrow(mock_request("0/2000000"))
+        borrow(mock_request("0/2800000"))
+
+        replica_conn = one_replica.connection.return_value.__enter__.return_value
+        assert replica_conn.execute.call_count == 1
+        assert get_replica_stats()["replayed_lsn"] == ["0/3000000"]
+        assert get_replica_stats()["replica_reads"] == [2]
+
+
+# ------------------------------
+# Token Tests
+# ------------------------------
+class TestReadYourWrites:
+
+    def test_write_issues_token(self, one_replica):
+        """Test a write hands out the primary's WAL position as cookie and header"""
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = {"lsn": "0/5000000"}
+        response = Response()
+
+        set_read_your_writes(response, conn)
+
+        assert response.headers[LSN_HEADER] == "0/5000000"
+        assert response.headers["set-cookie"].startswith(f'{LSN_COOKIE}="0/5000000"')
+        assert "HttpOnly" in response.headers["set-cookie"]
+
+    def test_no_token_without_replicas(self):
+        """Test nothing is queried or set when no replicas are configured"""
+        conn = MagicMock()
+        response = Response()
+
+        set_read_your_writes(response, conn)
+
+        conn.execute.assert_not_called()
+        assert LSN_HEADER not in response.headers
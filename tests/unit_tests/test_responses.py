@@ -0,0 +1,104 @@
+"""
+Unit tests for the orjson fast path on read routes
+"""
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import Response
+from fastapi.testclient import TestClient
+from unittest.mock import Mock, patch
+from app.main import app
+from app.models.responses import rows_response
+
+
+# ------------------------------
+# Override database dependency
+# ------------------------------
+def get_mock_connection():
+    """Override for database connection dependency"""
+    conn = Mock()
+    yield conn
+
+
+# ------------------------------
+# Test Client Setup
+# ------------------------------
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Collections with no version row yet, so conditional GETs never short-circuit"""
+    with patch('app.bizlogic.users.get_users_version', return_value=None), \
+            patch('app.bizlogic.books.get_books_version', return_value=None), \
+            patch('app.bizlogic.reviews.get_book_reviews_version', return_value=None):
+        yield
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def feed_row():
+    """A review row as dict_row returns it"""
+    return {
+        "id": 7, "user_id": 2, "book_id": 3, "rating": 5, "content": "Great",
+        "created_at": datetime(2024, 1, 1, 12, 30, tzinfo=timezone.utc),
+    }
+
+
+# ------------------------------
+# rows_response Tests
+# ------------------------------
+class TestRowsResponse:
+
+    def test_encodes_datetimes_like_isoformat(self, feed_row):
+        """Test datetimes render exactly as jsonable_encoder rendered them"""
+        body = rows_response([feed_row]).body
+
+        assert b'"created_at":"2024-01-01T12:30:00+00:00"' in body
+
+    def test_keeps_headers_of_injected_response(self):
+        """Test headers set on the route's Response parameter survive"""
+        response = Response()
+        response.headers["X-Next-Cursor"] = "abc"
+
+        assert rows_response([], response).headers["X-Next-Cursor"] == "abc"
+
+
+# ------------------------------
+# Route Tests
+# ------------------------------
+class TestFastPathRoutes:
+
+    @patch('fastapi.routing.jsonable_encoder')
+    @patch('app.bizlogic.follows.follows_queries.get_newsfeed')
+    def test_newsfeed_skips_jsonable_encoder(self, mock_feed, mock_encoder, client, feed_row):
+        """Test feed rows are serialized without the jsonable_encoder pass"""
+        mock_feed.return_value = [feed_row]
+
+        response = client.get("/users/2/newsfeed")
+
+        assert response.status_code == 200
+        assert response.json()[0]["created_at"] == "2024-01-01T12:30:00+00:00"
+        mock_encoder.assert_not_called()
+
+    @patch('app.bizlogic.books.books_queries.list_books')
+    def test_list_books_keeps_next_cursor(self, mock_list, client):
+        """Test a full page still carries X-Next-Cursor on the fast path"""
+        mock_list.return_value = [{"id": 1, "title": "T", "author": "A", "created_at": None}]
+
+        response = client.get("/books?limit=1")
+
+        assert "X-Next-Cursor" in response.headers
+
+    def test_openapi_documents_output_models(self, client):
+        """Test response_model still describes the rows in the schema"""
+        schema = client.get("/openapi.json").json()
+        ok = schema["paths"]["/books/{book_id}"]["get"]["responses"]["200"]
+
+        assert ok["content"]["application/json"]["schema"] == {"$ref": "#/components/schemas/BookOut"}
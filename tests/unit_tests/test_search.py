@@ -0,0 +1,113 @@
+"""
+Unit tests for full-text search over books and reviews
+"""
+import pytest
+from fastapi.testclient import TestClient
+from unittest.mock import MagicMock, Mock, patch
+from app.main import app
+from app.database.pagination import encode_cursor
+from app.database.queries import search
+from app.database.queries.search import (
+    FIRST_PAGE,
+    SEARCH_BOOKS_FUZZY_SQL,
+    SEARCH_BOOKS_SQL,
+    search_books,
+    search_params,
+)
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def book_hit():
+    """Search row as SEARCH_BOOKS_SQL returns it"""
+    return {
+        "id": 3,
+        "title": "The Great Gatsby",
+        "author": "F. Scott Fitzgerald",
+        "created_at": "2024-01-01T00:00:00",
+        "rank": 0.6079270839691162,
+        "snippet": "The <mark>Great</mark> Gatsby",
+    }
+
+
+@pytest.fixture
+def trigram():
+    """Forget whether the database has pg_trgm"""
+    with patch.object(search, "_trigram", None):
+        yield
+
+
+def get_mock_connection():
+    """Override for database connection dependency"""
+    yield Mock()
+
+
+@pytest.fixture
+def client():
+    """Create test client with mocked database"""
+    from app.database.core import get_connection
+    app.dependency_overrides[get_connection] = get_mock_connection
+    client = TestClient(app)
+    yield client
+    app.dependency_overrides.clear()
+
+
+# ------------------------------
+# Query Tests
+# ------------------------------
+class TestSearchQueries:
+
+    def test_first_page_sorts_before_every_match(self):
+        """Test the first page's cursor is above any rank and id"""
+        params = search_params("gatsby", 20, None)
+
+        assert (params["after_rank"], params["after_id"]) == FIRST_PAGE
+        assert search_params("gatsby", 20, (0.5, 7))["after_rank"] == 0.5
+
+    @pytest.mark.parametrize("installed, expected", [(True, SEARCH_BOOKS_FUZZY_SQL), (False, SEARCH_BOOKS_SQL)])
+    def test_fuzzy_authors_only_with_pg_trgm(self, trigram, installed, expected):
+        """Test book search matches misspelled authors only when pg_trgm is installed, checked once"""
+        conn = MagicMock()
+        conn.execute.return_value.fetchone.return_value = {"installed": installed}
+        cur = conn.cursor.return_value.__enter__.return_value
+
+        search_books(conn, q="fitzgerlad")
+        search_books(conn, q="fitzgerlad")
+
+        conn.execute.assert_called_once()
+        assert cur.execute.call_args.args[0] == expected
+
+
+# ------------------------------
+# Search Endpoint Tests
+# ------------------------------
+class TestSearchEndpoints:
+
+    @patch('app.bizlogic.books.search_queries.search_books')
+    def test_search_books(self, mock_search, client, book_hit):
+        """Test GET /books/search returns ranked hits and the next page's cursor"""
+        mock_search.return_value = [book_hit]
+
+        response = client.get("/books/search?q=great&limit=1")
+
+        assert response.status_code == 200
+        assert response.json() == [book_hit]
+        assert response.headers["X-Next-Cursor"] == encode_cursor(book_hit["rank"], 3)
+        assert mock_search.call_args.kwargs == {"q": "great", "limit": 1, "after": None}
+
+    @patch('app.bizlogic.reviews.search_queries.search_reviews')
+    def test_search_reviews_after_cursor(self, mock_search, client):
+        """Test the cursor is decoded to (rank, id)"""
+        mock_search.return_value = []
+
+        response = client.get("/reviews/search", params={"q": "whales", "after": encode_cursor(0.25, 9)})
+
+        assert response.status_code == 200
+        assert mock_search.call_args.kwargs["after"] == (0.25, 9)
+
+    def test_query_required(self, client):
+        """Test an empty or missing query is rejected"""
+        assert client.get("/books/search").status_code == 422
+        assert client.get("/reviews/search?q=").status_code == 422
@@ -0,0 +1,109 @@
+"""
+Unit tests for the prepared statement registry
+"""
+import re
+
+import pytest
+from unittest.mock import MagicMock, patch
+from app.database import statements
+from app.database.queries import books, follows, reviews  # noqa: F401  (fill the registry)
+from app.database.queries import users as users_queries
+from app.database.statements import STATEMENTS, execute, register, configure_connection
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def mock_conn():
+    """Mock connection whose cursor() works as a context manager"""
+    return MagicMock()
+
+
+def cursor_of(conn):
+    return conn.cursor.return_value.__enter__.return_value
+
+
+# ------------------------------
+# Registry Tests
+# ------------------------------
+class TestRegistry:
+
+    def test_query_modules_register_hot_statements(self):
+        """Test the hot lookups are registered and warmed"""
+        for name in ("get_user", "get_book", "list_reviews_by_book", "get_newsfeed"):
+            assert STATEMENTS[name].warm is not None
+
+    def test_warm_params_cover_every_placeholder(self):
+        """Test warm params bind every named parameter of their statement"""
+        for statement in STATEMENTS.values():
+            if statement.warm is not None:
+                assert set(re.findall(r"%\((\w+)\)s", statement.sql)) <= set(statement.warm), statement.name
+
+    def test_register_same_name_different_sql(self):
+        """Test a name can't be reused for another statement"""
+        with pytest.raises(ValueError):
+            register("get_user", "SELECT 1")
+
+
+# ------------------------------
+# execute() Tests
+# ------------------------------
+class TestExecute:
+
+    def test_registered_statement_runs_prepared(self, mock_conn):
+        """Test registered SQL is prepared and counted"""
+        cur = cursor_of(mock_conn)
+        before = STATEMENTS["get_user"].executions
+
+        users_queries.users_cache.clear()
+        users_queries.get_user(mock_conn, user_id=1)
+
+        cur.execute.assert_called_once_with(users_queries.GET_USER_SQL, {"user_id": 1}, prepare=True)
+        assert STATEMENTS["get_user"].executions == before + 1
+
+    def test_unregistered_sql_runs_as_is(self):
+        """Test ad-hoc SQL keeps psycopg's default prepare behaviour"""
+        cur = MagicMock()
+
+        execute(cur, "SELECT 1", None)
+
+        cur.execute.assert_called_once_with("SELECT 1", None)
+
+    @patch.object(statements, 'PREPARED_STATEMENTS', False)
+    def test_disabled(self):
+        """Test PREPARED_STATEMENTS=0 turns the registry into a pass-through"""
+        cur = MagicMock()
+
+        execute(cur, users_queries.GET_USER_SQL, {"user_id": 1})
+
+        cur.execute.assert_called_once_with(users_queries.GET_USER_SQL, {"user_id": 1})
+
+
+# ------------------------------
+# Connection Warm-up Tests
+# ------------------------------
+class TestConfigureConnection:
+
+    def test_prepares_warmable_statements(self, mock_conn):
+        """Test a new pooled connection prepares every statement with warm params"""
+        configure_connection(mock_conn)
+
+        warmed = [c.args[0] for c in cursor_of(mock_conn).execute.call_args_list]
+        assert warmed == [s.sql for s in STATEMENTS.values() if s.warm is not None]
+        assert all(c.kwargs == {"prepare": True} for c in cursor_of(mock_conn).execute.call_args_list)
+        mock_conn.commit.assert_called_once()
+
+    def test_binds_ints_as_int8(self, mock_conn):
+        """Test ints get one parameter type whatever their value"""
+        configure_connection(mock_conn)
+
+        registered = [c.args[0] for c in mock_conn.adapters.register_dumper.call_args_list]
+        assert registered == [int, int]
+
+    @patch.object(statements, 'PREPARED_STATEMENTS', False)
+    def test_disabled(self, mock_conn):
+        """Test nothing is prepared when the registry is off"""
+        configure_connection(mock_conn)
+
+        mock_conn.cursor.assert_not_called()
@@ -0,0 +1,134 @@
+"""
+Unit tests for the fan-out-on-write newsfeed timelines
+"""
+from datetime import datetime, timezone
+
+import pytest
+from unittest.mock import MagicMock, patch
+
+
+# ------------------------------
+# Fixtures
+# ------------------------------
+@pytest.fixture
+def mock_conn():
+    """Mock connection whose cursor() works as a context manager"""
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.rowcount = 0
+    return conn
+
+
+def executed_sql(conn):
+    cur = conn.cursor.return_value.__enter__.return_value
+    return [c.args[0] for c in cur.execute.call_args_list]
+
+
+# ------------------------------
+# Write Path Tests
+# ------------------------------
+class TestTimelineWrites:
+
+    def test_insert_review_fans_out_in_one_statement(self, mock_conn):
+        """Test a new review and its timeline fan-out are a single round trip"""
+        from app.database.queries.reviews import insert_review, INSERT_REVIEW_SQL
+
+        cur = mock_conn.cursor.return_value.__enter__.return_value
+        cur.fetchall.return_value = [{"id": 7, "user_id": 1}]
+
+        insert_review(mock_conn, user_id=1, book_id=1, rating=5, content="Great")
+
+        assert executed_sql(mock_conn) == [INSERT_REVIEW_SQL]
+        assert "INSERT INTO timelines" in INSERT_REVIEW_SQL
+        mock_conn.commit.assert_called_once()
+
+    def test_follow_backfills_in_one_statement(self, mock_conn):
+        """Test a new follow and its timeline backfill are a single round trip"""
+        from app.database.queries.follows import follow_user, FOLLOW_USER_SQL
+
+        cur = mock_conn.cursor.return_value.__enter__.return_value
+        cur.fetchall.return_value = [{"follower_id": 1, "followee_id": 2}]
+
+        assert follow_user(mock_conn, follower_id=1, followee_id=2)["followee_id"] == 2
+        assert executed_sql(mock_conn) == [FOLLOW_USER_SQL]
+        assert "INSERT INTO timelines" in FOLLOW_USER_SQL
+        mock_conn.commit.assert_called_once()
+
+    def test_unfollow_trims_in_one_statement(self, mock_conn):
+        """Test unfollowing removes the edge and the timeline entries together"""
+        from app.database.queries.follows import unfollow_user, UNFOLLOW_USER_SQL
+
+        unfollow_user(mock_conn, follower_id=1, followee_id=2)
+
+        assert executed_sql(mock_conn) == [UNFOLLOW_USER_SQL]
+        assert "DELETE FROM timelines" in UNFOLLOW_USER_SQL
+
+
+# ------------------------------
+# Read Path Tests
+# ------------------------------
+class TestTimelineReads:
+
+    def test_first_page_starts_at_feed_head(self, mock_conn):
+        """Test the first page uses the FEED_HEAD sentinel as its cursor"""
+        from app.database.queries.follows import get_newsfeed, FEED_HEAD
+
+        get_newsfeed(mock_conn, user_id=1, limit=10)
+
+        params = mock_conn.cursor.return_value.__enter__.return_value.execute.call_args.args[1]
+        assert (params["after_created_at"], params["after_id"]) == FEED_HEAD
+        assert params["limit"] == 10
+
+    def test_next_page_uses_cursor(self, mock_conn):
+        """Test later pages continue strictly after the cursor"""
+        from app.database.queries.follows import get_newsfeed
+
+        after = (datetime(2024, 1, 1, tzinfo=timezone.utc), 5)
+        get_newsfeed(mock_conn, user_id=1, limit=10, after=after)
+
+        params = mock_conn.cursor.return_value.__enter__.return_value.execute.call_args.args[1]
+        assert (params["after_created_at"], params["after_id"]) == after
+
+    @patch('app.database.queries.follows.FEED_STRATEGY', "merge")
+    def test_merge_strategy_reads_without_timelines(self, mock_conn):
+        """Test FEED_STRATEGY=merge uses the bounded k-way merge query"""
+        from app.database.queries.follows import get_newsfeed, GET_NEWSFEED_MERGE_SQL
+
+        get_newsfeed(mock_conn, user_id=1, limit=10)
+
+        assert executed_sql(mock_conn) == [GET_NEWSFEED_MERGE_SQL]
+
+    def test_merge_query_bounds_each_author(self):
+        """Test every author's contribution is limited before the final merge"""
+        from app.database.queries.follows import GET_NEWSFEED_MERGE_SQL
+
+        assert "CROSS JOIN LATERAL" in GET_NEWSFEED_MERGE_SQL
+        assert GET_NEWSFEED_MERGE_SQL.count("LIMIT %(limit)s") == 2
+        assert "UNION ALL" in GET_NEWSFEED_MERGE_SQL
+
+
+# ------------------------------
+# Fan-out Threshold Tests (Postgres)
+# ------------------------------
+class TestFanOutThreshold:
+
+    @patch('app.database.queries.follows.FEED_FANOUT_MAX_FOLLOWERS', 2)
+    @patch('app.database.queries.reviews.FEED_FANOUT_MAX_FOLLOWERS', 2)
+    def test_reviews_from_above_the_threshold_stay_in_feeds(self, db_conn):
+        """Test an author dropping back under the threshold keeps their unpushed reviews in feeds"""
+        from app.database.queries.follows import follow_user, get_newsfeed, unfollow_user
+        from app.database.queries.reviews import insert_review
+
+        author, reader, other, third = [
+            row["id"] for row in db_conn.execute("INSERT INTO users (name) SELECT 'fan-out ' || g FROM generate_series(1, 4) g RETURNING id")
+        ]
+        book_id = db_conn.execute("INSERT INTO books (title, author) VALUES ('T', 'A') RETURNING id").fetchone()["id"]
+        db_conn.commit()
+        for follower_id in (reader, other, third):
+            follow_user(db_conn, follower_id=follower_id, followee_id=author)
+
+        review = insert_review(db_conn, user_id=author, book_id=book_id, rating=5, content="while popular")
+        unfollow_user(db_conn, follower_id=third, followee_id=author)
+
+        assert db_conn.execute("SELECT count(*) AS n FROM timelines WHERE review_id = %s", (review["id"],)).fetchone()["n"] == 1
+        assert [r["id"] for r in get_newsfeed(db_conn, user_id=reader, limit=10)] == [review["id"]]
@@ -1,6 +1,8 @@
 """
 Unit tests for the Goodreads Clone API
 """
+from datetime import datetime, timezone
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import Mock, patch
@@ -10,6 +12,15 @@ from app.main import app
 # ------------------------------
 # Fixtures
 # ------------------------------
+@pytest.fixture(autouse=True)
+def unversioned():
+    """Collections with no version row yet, so conditional GETs never short-circuit"""
+    with patch('app.bizlogic.users.get_users_version', return_value=None), \
+            patch('app.bizlogic.books.get_books_version', return_value=None), \
+            patch('app.bizlogic.reviews.get_book_reviews_version', return_value=None):
+        yield
+
+
 @pytest.fixture
 def mock_db_connection():
     """Mock database connection"""
@@ -23,13 +34,13 @@ def mock_db_connection():
 @pytest.fixture
 def sample_user():
     """Sample user data"""
-    return {"id": 1, "name": "Alice", "created_at": "2024-01-01T00:00:00"}
+    return {"id": 1, "name": "Alice", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
 
 
 @pytest.fixture
 def sample_book():
     """Sample book data"""
-    return {"id": 1, "title": "Test Book", "author": "Test Author", "created_at": "2024-01-01T00:00:00"}
+    return {"id": 1, "title": "Test Book", "author": "Test Author", "created_at": datetime(2024, 1, 1, tzinfo=timezone.utc)}
 
 
 # ------------------------------
@@ -318,4 +329,4 @@ class TestUserBusinessLogic:
 
         assert len(result) == 2
         assert result[0]["name"] == "Alice"
-        mock_list_query.assert_called_once_with(mock_conn)
\ No newline at end of file
+        mock_list_query.assert_called_once_with(mock_conn, limit=50, after_id=None)
\ No newline at end of file